@@ -0,0 +1,430 @@
+# app/backup.py
+"""
+Online backups of a tracker database.
+
+Snapshots are taken with the SQLite backup API (Connection.backup), which
+copies a consistent image of the database while it stays in use: a limited
+number of pages is copied per step and the copy pauses between steps so
+writers get the lock. If a writer changes the database mid-copy, SQLite
+restarts the copy, so the result is always a single point in time.
+
+Each snapshot is checked with PRAGMA integrity_check before it is kept,
+optionally gzip-compressed, and older snapshots beyond `keep` are rotated
+out. restore_snapshot verifies a snapshot and copies it back into the live
+database, also through the backup API, after taking a safety snapshot of
+the current state.
+
+A database with an archive (app.db.archive_sessions) is snapshotted
+together with it: <name>-<stamp>.db[.gz] gets a companion
+<name>-<stamp>.archive.db[.gz], and verify, restore and rotation treat
+the two as one snapshot.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.db import default_archive_path
+
+# Pages copied per backup step, and the pause after each step that lets writers in
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_PAUSE = 0.005
+
+# Restarts (caused by concurrent writes) tolerated before the copy finishes in one step
+BACKUP_MAX_RESTARTS = 3
+
+# Snapshots kept per database by default
+BACKUP_KEEP = 7
+
+# Default interval for scheduled backups
+BACKUP_INTERVAL_HOURS = 24.0
+
+_SNAPSHOT_RE = re.compile(
+    r"^(?P<stem>.+)-(?P<stamp>\d{8}-\d{6})(?:-(?P<label>[a-z-]+))?\.db(?P<gz>\.gz)?$")
+
+
+class BackupError(Exception):
+    """A snapshot could not be taken, verified or restored."""
+
+
+def default_backup_dir(db_path: Path) -> Path:
+    """backups/ next to the database file"""
+    return Path(db_path).resolve().parent / "backups"
+
+
+def archive_snapshot_path(snapshot: Path) -> Path:
+    """The companion file holding the archive database of a snapshot"""
+    snapshot = Path(snapshot)
+    name = snapshot.name
+    suffix = ".db.gz" if name.endswith(".db.gz") else ".db"
+    return snapshot.with_name(f"{name[:-len(suffix)]}.archive{suffix}")
+
+
+def create_snapshot(db_path: Path, backup_dir: Optional[Path] = None, keep: int = BACKUP_KEEP,
+                    compress: bool = True, label: Optional[str] = None,
+                    pages: int = BACKUP_PAGES_PER_STEP, pause: float = BACKUP_STEP_PAUSE,
+                    progress: Optional[Callable[[int, int], None]] = None) -> Path:
+    """
+    Take a verified snapshot of db_path (and of its archive database, if
+    it has one) and return its path.
+
+    progress(copied_pages, total_pages) is called after every step, for
+    each database file in turn. Snapshots of the same database beyond the
+    newest `keep` are deleted afterwards (keep=0 keeps everything). label
+    tags the file name, e.g. 'pre-restore'.
+    """
+    db_path = Path(db_path)
+    if not db_path.exists():
+        raise BackupError(f"Database not found: {db_path}")
+    backup_dir = Path(backup_dir or default_backup_dir(db_path))
+    backup_dir.mkdir(parents=True, exist_ok=True)
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"{db_path.stem}-{stamp}{'-' + label if label else ''}.db"
+    final = backup_dir / (name + (".gz" if compress else ""))
+    archive, archive_final = default_archive_path(db_path), archive_snapshot_path(final)
+    for path in (final, archive_final):
+        if path.exists():
+            raise BackupError(f"Snapshot already exists: {path}")
+
+    # The main database first: a session archived between the two copies
+    # is then in both (which all_sessions tolerates), never in neither
+    _write_snapshot(db_path, final, compress, pages, pause, progress)
+    if archive.exists():
+        try:
+            _write_snapshot(archive, archive_final, compress, pages, pause, progress)
+        except BaseException:
+            final.unlink()
+            raise
+
+    if keep:
+        rotate_snapshots(db_path, backup_dir, keep)
+    return final
+
+
+def _write_snapshot(source: Path, final: Path, compress: bool, pages: int, pause: float,
+                    progress: Optional[Callable[[int, int], None]]):
+    """Copy source to final (name.db or name.db.gz), checked and compressed through .part files"""
+    name = final.name[:-3] if compress else final.name
+    part = final.with_name(name + ".part")
+    try:
+        _copy_database(source, part, pages, pause, progress, standalone=True)
+        check = _integrity_check(part)
+        if check != "ok":
+            raise BackupError(f"Snapshot failed integrity check: {check}")
+        if compress:
+            gz_part = final.with_name(name + ".gz.part")
+            with open(part, "rb") as src, gzip.open(gz_part, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            part.unlink()
+            part = gz_part
+        os.replace(part, final)
+    finally:
+        for leftover in (final.with_name(name + ".part"), final.with_name(name + ".gz.part")):
+            if leftover.exists():
+                leftover.unlink()
+
+
+def list_snapshots(db_path: Path, backup_dir: Optional[Path] = None) -> List[Dict]:
+    """
+    Snapshots of db_path, newest first: path, created, label, compressed,
+    size, archive (path or None)
+    """
+    db_path = Path(db_path)
+    backup_dir = Path(backup_dir or default_backup_dir(db_path))
+    if not backup_dir.is_dir():
+        return []
+    snapshots = []
+    for path in backup_dir.iterdir():
+        match = _SNAPSHOT_RE.match(path.name)
+        if not match or match['stem'] != db_path.stem:
+            continue
+        archive = archive_snapshot_path(path)
+        snapshots.append({
+            'path': path,
+            'created': datetime.strptime(match['stamp'], "%Y%m%d-%H%M%S"),
+            'label': match['label'],
+            'compressed': bool(match['gz']),
+            'size': path.stat().st_size,
+            'archive': archive if archive.exists() else None,
+        })
+    return sorted(snapshots, key=lambda s: (s['created'], s['path'].name), reverse=True)
+
+
+def rotate_snapshots(db_path: Path, backup_dir: Optional[Path] = None,
+                     keep: int = BACKUP_KEEP) -> List[Path]:
+    """Delete all but the newest `keep` unlabelled snapshots; labelled ones are left alone"""
+    regular = [s for s in list_snapshots(db_path, backup_dir) if not s['label']]
+    removed = []
+    for snapshot in regular[keep:]:
+        snapshot['path'].unlink()
+        if snapshot['archive']:
+            snapshot['archive'].unlink()
+        removed.append(snapshot['path'])
+    return removed
+
+
+def verify_snapshot(snapshot: Path) -> Dict:
+    """
+    Check a snapshot and its archive companion, if any: decompresses them if
+    needed and runs PRAGMA integrity_check. Returns ok, integrity (the
+    check's message), tables, sessions and archived (sessions in the
+    archive, None without one).
+    """
+    snapshot = Path(snapshot)
+    report = _verify_file(snapshot)
+    report['archived'] = None
+    archive = archive_snapshot_path(snapshot)
+    if report['ok'] and archive.exists():
+        archived = _verify_file(archive)
+        if not archived['ok']:
+            return {**archived, 'integrity': f"archive: {archived['integrity']}", 'archived': None}
+        report['archived'] = archived['sessions']
+    return report
+
+
+def _verify_file(snapshot: Path) -> Dict:
+    with _opened_snapshot(snapshot) as path:
+        integrity = _integrity_check(path)
+        if integrity != "ok":
+            return {'ok': False, 'integrity': integrity, 'tables': None, 'sessions': None}
+        con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            tables = {row[0] for row in
+                      con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            sessions = None
+            if 'sessions' in tables:
+                sessions = con.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        finally:
+            con.close()
+    return {'ok': True, 'integrity': integrity, 'tables': len(tables), 'sessions': sessions}
+
+
+def restore_snapshot(snapshot: Path, db_path: Path, backup_dir: Optional[Path] = None,
+                     pages: int = BACKUP_PAGES_PER_STEP,
+                     progress: Optional[Callable[[int, int], None]] = None) -> Optional[Path]:
+    """
+    Replace the contents of db_path with a verified snapshot.
+
+    The current database is snapshotted first (label 'pre-restore') and that
+    path is returned (None if db_path did not exist yet). The copy goes through
+    the backup API, so connections other processes hold see the restored data
+    on their next transaction instead of a file swapped under them.
+
+    The archive database is restored from the snapshot's companion, or
+    emptied when the snapshot has none (it was taken before anything was
+    archived). Archived copies of sessions that are hot in the restored
+    database are dropped by the next app.db.init_db or archive run.
+    """
+    snapshot, db_path = Path(snapshot), Path(db_path)
+    if snapshot.name.endswith((".archive.db", ".archive.db.gz")):
+        raise BackupError(
+            f"{snapshot.name} is the archive part of a snapshot; restore the snapshot itself")
+    report = verify_snapshot(snapshot)
+    if not report['ok']:
+        raise BackupError(f"Refusing to restore {snapshot.name}: {report['integrity']}")
+
+    safety = None
+    if db_path.exists():
+        safety = create_snapshot(db_path, backup_dir, keep=0, label="pre-restore", pages=pages)
+    with _opened_snapshot(snapshot) as path:
+        # No pause: a restore should finish, not share the lock
+        _copy_database(path, db_path, pages, 0.0, progress)
+
+    archive, archive_snapshot = default_archive_path(db_path), archive_snapshot_path(snapshot)
+    if archive_snapshot.exists():
+        with _opened_snapshot(archive_snapshot) as path:
+            _copy_database(path, archive, pages, 0.0, progress)
+    elif archive.exists():
+        _empty_archive(archive)
+    else:
+        return safety
+    _mark_archive_pending(db_path)
+    return safety
+
+
+class BackupScheduler:
+    """
+    Takes a snapshot whenever the newest one is older than `interval_hours`,
+    checking every `check_seconds` on a background thread. on_done(path) and
+    on_error(exception) are called on that thread.
+    """
+
+    def __init__(self, db_path: Path, backup_dir: Optional[Path] = None,
+                 interval_hours: float = BACKUP_INTERVAL_HOURS, keep: int = BACKUP_KEEP,
+                 check_seconds: float = 300.0,
+                 on_done: Optional[Callable[[Path], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.db_path = Path(db_path)
+        self.backup_dir = backup_dir
+        self.interval_hours = interval_hours
+        self.keep = keep
+        self.check_seconds = check_seconds
+        self.on_done = on_done
+        self.on_error = on_error
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self) -> bool:
+        """True when there is no snapshot newer than the interval"""
+        regular = [s for s in list_snapshots(self.db_path, self.backup_dir) if not s['label']]
+        if not regular:
+            return True
+        age = datetime.now() - regular[0]['created']
+        return age.total_seconds() >= self.interval_hours * 3600
+
+    def run_pending(self) -> Optional[Path]:
+        """Take a snapshot if one is due; returns its path"""
+        if not self.due():
+            return None
+        return create_snapshot(self.db_path, self.backup_dir, keep=self.keep)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="backup-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                path = self.run_pending()
+                if path and self.on_done:
+                    self.on_done(path)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            self._stop.wait(self.check_seconds)
+
+
+class _CopyRestarting(Exception):
+    """Raised from the progress callback to give up on stepwise copying"""
+
+
+def _copy_database(source: Path, target: Path, pages: int, pause: float,
+                   progress: Optional[Callable[[int, int], None]], standalone: bool = False):
+    """
+    Copy source into target with the backup API, `pages` pages per step.
+
+    Every write to the source from another connection restarts a stepwise
+    copy; after BACKUP_MAX_RESTARTS the copy is finished in a single step
+    instead (under WAL that only holds a read snapshot, so writers still
+    proceed). standalone leaves target in rollback-journal mode, a single
+    self-contained file.
+    """
+    state = {'copied': 0, 'total': 0, 'restarts': 0}
+
+    def step(status, remaining, total):
+        copied = total - remaining
+        # A restart starts over from the first step, so the count stops growing
+        if remaining and copied <= state['copied']:
+            state['restarts'] += 1
+            if state['restarts'] > BACKUP_MAX_RESTARTS:
+                raise _CopyRestarting()
+        state['copied'], state['total'] = copied, total
+        if progress:
+            progress(copied, total)
+        if pause and remaining:
+            time.sleep(pause)
+
+    src = sqlite3.connect(source)
+    try:
+        dst = sqlite3.connect(target)
+        try:
+            try:
+                src.backup(dst, pages=pages, progress=step)
+            except _CopyRestarting:
+                src.backup(dst, pages=-1)
+                if progress:
+                    progress(state['total'], state['total'])
+            if standalone:
+                dst.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            dst.close()
+    except sqlite3.Error as e:
+        raise BackupError(f"Backup of {source.name} failed: {e}") from e
+    finally:
+        src.close()
+
+
+def _empty_archive(archive: Path):
+    """Delete every archived session (and its tags) from an archive database"""
+    con = sqlite3.connect(archive)
+    try:
+        with con:
+            tables = {row[0] for row in
+                      con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            for table in ('sessions', 'session_tags'):
+                if table in tables:
+                    con.execute(f"DELETE FROM {table}")
+    except sqlite3.Error as e:
+        raise BackupError(f"Cannot empty archive {archive.name}: {e}") from e
+    finally:
+        con.close()
+
+
+def _mark_archive_pending(db_path: Path):
+    """
+    Set app.db's 'archive_pending' marker, so all_sessions skips archived
+    copies of hot sessions until they are reconciled
+    """
+    con = sqlite3.connect(db_path)
+    try:
+        with con:
+            if con.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='config'").fetchone():
+                con.execute("INSERT OR REPLACE INTO config (key, value_json) "
+                            "VALUES ('archive_pending', '\"restore\"')")
+    except sqlite3.Error as e:
+        raise BackupError(f"Restored {db_path.name} but could not mark its archive "
+                          f"for reconciling: {e}") from e
+    finally:
+        con.close()
+
+
+def _integrity_check(path: Path) -> str:
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = con.execute("PRAGMA integrity_check").fetchall()
+    except sqlite3.DatabaseError as e:
+        return str(e)
+    finally:
+        con.close()
+    return "; ".join(row[0] for row in rows)
+
+
+@contextmanager
+def _opened_snapshot(snapshot: Path) -> Iterator[Path]:
+    """Path to an uncompressed copy of the snapshot for the duration of the block"""
+    if not snapshot.exists():
+        raise BackupError(f"Snapshot not found: {snapshot}")
+    if snapshot.suffix != ".gz":
+        yield snapshot
+        return
+    fd, temp = tempfile.mkstemp(suffix=".db", prefix="snapshot-")
+    try:
+        try:
+            with os.fdopen(fd, "wb") as dst, gzip.open(snapshot, "rb") as src:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        except (OSError, EOFError) as e:
+            raise BackupError(f"Cannot read snapshot {snapshot.name}: {e}") from e
+        yield Path(temp)
+    finally:
+        os.unlink(temp)
@@ -0,0 +1,131 @@
+# app/change_feed.py
+"""
+Cross-process change feed for a tracker database.
+
+Every writer - the dashboard, scripts, another process - is recorded in
+change_log (see app.change_log). A ChangeFeed polls PRAGMA data_version
+on its own connection, which only moves when some other connection
+commits; an idle poll costs that one PRAGMA. When it moves, the
+change_log rows after the last seen seq are folded into a ChangeSet and
+handed to the subscribers.
+
+A subscriber that falls behind the trimmed log (or a database without
+change_log) gets a ChangeSet with reset=True and should reload everything.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from app import query_trace
+from app.change_log import ChangeSet, change_log_seq, read_changes
+from app.db import get_manager
+
+# Seconds between polls of a started feed
+CHANGE_POLL_INTERVAL = 0.5
+
+
+class ChangeFeed:
+    """
+    Polls a database for changes made by any connection or process and
+    hands each ChangeSet to the subscribers. Call poll() from a timer, or
+    start() a background thread that polls every `interval` seconds
+    (subscribers are then called on that thread).
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, since: Optional[int] = None,
+                 interval: float = CHANGE_POLL_INTERVAL):
+        self.db_path = Path(db_path or get_manager().db_path)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._con: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self._subscribers: List[Callable[[ChangeSet], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Start from "now" unless resuming from a seq saved earlier
+        self.seq = self.current_seq() if since is None else since
+
+    # ---- Subscriptions ----
+    def subscribe(self, callback: Callable[[ChangeSet], None]) -> Callable[[], None]:
+        """Call callback(changes) for every non-empty ChangeSet; returns an unsubscribe function"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    # ---- Polling ----
+    def poll(self) -> Optional[ChangeSet]:
+        """Changes since the previous poll, delivered to subscribers; None when there are none"""
+        with self._lock:
+            version = self._connection().execute("PRAGMA data_version").fetchone()[0]
+            if version == self._version:
+                return None
+            self._version = version
+            changes = self._changes_since(self.seq)
+            self.seq = changes.seq
+            subscribers = list(self._subscribers)
+        if not changes:
+            return None
+        for callback in subscribers:
+            callback(changes)
+        return changes
+
+    def changes_since(self, seq: int) -> ChangeSet:
+        """Net changes after change_log position seq, without moving the feed"""
+        with self._lock:
+            return self._changes_since(seq)
+
+    def current_seq(self) -> int:
+        """Newest change_log position (0 for an empty or missing log)"""
+        with self._lock:
+            return change_log_seq(self._connection())
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    # ---- Reading change_log ----
+    def _connection(self) -> sqlite3.Connection:
+        if self._con is None:
+            # Dedicated connection: data_version only moves for other connections' commits
+            self._con = query_trace.connect(self.db_path, get_manager().tracer,
+                                            check_same_thread=False)
+            self._con.execute("PRAGMA query_only = ON")
+        return self._con
+
+    def _changes_since(self, since: int) -> ChangeSet:
+        con = self._connection()
+        # One read transaction so the bounds and rows agree
+        con.execute("BEGIN")
+        try:
+            return read_changes(con, since)
+        finally:
+            con.execute("COMMIT")
+
@@ -0,0 +1,149 @@
+# app/change_log.py
+"""
+Trigger-filled log of row changes in a tracker database.
+
+Triggers append one change_log row (entity, id, op) per insert, update and
+delete of the watched tables, so every writer - the dashboard, scripts,
+another process - is recorded. read_changes folds the rows after a known
+seq into a ChangeSet: which ids were inserted, updated or deleted per
+entity. Readers keep the last seq they have seen and ask for what came
+after it; the session cache uses this to patch its frame instead of
+reloading it.
+
+change_log trims itself to the newest CHANGE_LOG_KEEP rows. A reader that
+falls further behind than that (or a database without change_log) gets a
+ChangeSet with reset=True and should reload everything.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Set
+
+from app.db import create_trigger_holds, trigger_guard
+
+# change_log rows kept; older ones are trimmed every CHANGE_LOG_TRIM_EVERY inserts
+CHANGE_LOG_KEEP = 50000
+CHANGE_LOG_TRIM_EVERY = 1000
+
+CHANGE_OPS = ('insert', 'update', 'delete')
+
+
+def install_change_log(cur: sqlite3.Cursor, tables: Dict[str, str]):
+    """
+    Create change_log and its triggers; tables maps entity names (as they
+    appear in ChangeSets, e.g. 'session') to the tables to watch. Writes
+    that are not changes (derived columns filled in) hold the triggers
+    through trigger_holds.
+    """
+    create_trigger_holds(cur)
+    cur.execute("""CREATE TABLE IF NOT EXISTS change_log(
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity TEXT NOT NULL,
+        entity_id INTEGER NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete'))
+    )""")
+    events = (('insert', 'INSERT', 'NEW'), ('update', 'UPDATE', 'NEW'), ('delete', 'DELETE', 'OLD'))
+    for entity, table in tables.items():
+        for op, event, row in events:
+            name = f"trg_{table}_change_log_{op}"
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}
+                {trigger_guard(name)} BEGIN
+                    INSERT INTO change_log (entity, entity_id, op)
+                    VALUES ('{entity}', {row}.id, '{op}');
+                END
+            """)
+    # AUTOINCREMENT never reuses a seq, so trimming cannot confuse a reader
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_change_log_trim AFTER INSERT ON change_log
+        WHEN NEW.seq % {CHANGE_LOG_TRIM_EVERY} = 0 BEGIN
+            DELETE FROM change_log WHERE seq <= NEW.seq - {CHANGE_LOG_KEEP};
+        END
+    """)
+
+
+class ChangeSet:
+    """
+    Net changes between two change_log positions, per entity.
+
+    An id inserted and then updated counts as inserted; anything deleted
+    counts only as deleted. reset means the changes are unknown.
+    """
+
+    __slots__ = ('since', 'seq', 'inserted', 'updated', 'deleted', 'reset')
+
+    def __init__(self, since: int, seq: int, reset: bool = False):
+        self.since = since
+        self.seq = seq
+        self.inserted: Dict[str, Set[int]] = {}
+        self.updated: Dict[str, Set[int]] = {}
+        self.deleted: Dict[str, Set[int]] = {}
+        self.reset = reset
+
+    def add(self, entity: str, entity_id: int, op: str):
+        inserted = self.inserted.setdefault(entity, set())
+        updated = self.updated.setdefault(entity, set())
+        if op == 'delete':
+            inserted.discard(entity_id)
+            updated.discard(entity_id)
+            self.deleted.setdefault(entity, set()).add(entity_id)
+        elif op == 'insert':
+            inserted.add(entity_id)
+        elif entity_id not in inserted:
+            updated.add(entity_id)
+
+    def changed(self, entity: str) -> Set[int]:
+        """Ids of entity inserted, updated or deleted"""
+        return (self.inserted.get(entity, set()) | self.updated.get(entity, set())
+                | self.deleted.get(entity, set()))
+
+    @property
+    def sessions(self) -> Set[int]:
+        return self.changed('session')
+
+    @property
+    def items(self) -> Set[int]:
+        return self.changed('item')
+
+    def __bool__(self) -> bool:
+        return self.reset or any(ids for ops in (self.inserted, self.updated, self.deleted)
+                                 for ids in ops.values())
+
+    def __repr__(self) -> str:
+        if self.reset:
+            return f"ChangeSet({self.since}->{self.seq}, reset)"
+        counts = ", ".join(f"{entity}: {len(self.changed(entity))}"
+                           for entity in sorted({*self.inserted, *self.updated, *self.deleted}))
+        return f"ChangeSet({self.since}->{self.seq}, {counts})"
+
+
+def change_log_seq(con: sqlite3.Connection) -> int:
+    """Newest change_log position on con (0 for an empty or missing log)"""
+    try:
+        row = con.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    except sqlite3.OperationalError:  # no AUTOINCREMENT table yet
+        return 0
+    return row[0] if row else 0
+
+
+def read_changes(con: sqlite3.Connection, since: int) -> ChangeSet:
+    """
+    Net changes on con after change_log position since, up to the newest.
+    Run it inside a read transaction when other reads must agree with it.
+    """
+    logged = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'").fetchone()
+    seq = change_log_seq(con)
+    if not logged:
+        return ChangeSet(since, seq, reset=True)
+    oldest = con.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+    # Trimmed past `since`, or the log went backwards (database replaced)
+    if seq < since or (seq > since and (oldest is None or oldest > since + 1)):
+        return ChangeSet(since, seq, reset=True)
+    changes = ChangeSet(since, seq)
+    for entity, entity_id, op in con.execute(
+            "SELECT entity, entity_id, op FROM change_log WHERE seq > ? AND seq <= ? ORDER BY seq",
+            (since, seq)):
+        changes.add(entity, entity_id, op)
+    return changes
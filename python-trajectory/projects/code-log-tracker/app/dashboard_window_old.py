@@ -17,6 +17,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QAction
 
+from app.db import DuplicateSessionError
 from app.widgets import DashboardTable, CompactForm
 from app.services.session_service import SessionService
 from app.services.language_service import LanguageService
@@ -324,10 +325,20 @@ class DashboardWindow(QMainWindow):
             # Add item_id to session data
             form_data["item_id"] = item_id
             
-            # Save session
-            self.session_service.save_session(
-                form_data, editing_session_id=self.editing_session_id
-            )
+            # Save session; ask before logging the same work twice
+            try:
+                self.session_service.save_session(
+                    form_data, editing_session_id=self.editing_session_id
+                )
+            except DuplicateSessionError as e:
+                reply = QMessageBox.question(
+                    self, "Duplicate Session",
+                    f"Session #{e.session_id} already logs the same work. Save another copy?",
+                    QMessageBox.Yes | QMessageBox.No
+                )
+                if reply != QMessageBox.Yes:
+                    return
+                self.session_service.save_session(form_data, allow_duplicate=True)
             
             # Reset form and reload
             self.form.clear_form()
@@ -391,32 +402,11 @@ class DashboardWindow(QMainWindow):
             # Get sessions data
             sessions = self.session_service.get_sessions()
             
-            # Convert to proper format for dashboard table
-            table_data = []
-            for session_tuple in sessions:
-                session_data = {
-                    "id": session_tuple[0],
-                    "date": session_tuple[1],
-                    "type": session_tuple[3],
-                    "canonical_name": session_tuple[4],
-                    "notes": session_tuple[7],
-                    "status": session_tuple[5], 
-                    "hours_spent": session_tuple[6],
-                    "tags": session_tuple[8],
-                    "language_code": session_tuple[2],
-                    "difficulty": session_tuple[9],
-                    "topic": session_tuple[10],
-                    "points_awarded": session_tuple[11],
-                    "progress_pct": session_tuple[12],
-                    "target_hours": session_tuple[14] if len(session_tuple) > 14 else 0,
-                }
-                table_data.append(session_data)
-            
-            # Load into table
-            self.table.load_data(table_data)
+            # Records go to the table as they are
+            self.table.load_data(sessions)
             
             # Update status
-            self.records_label.setText(f"📊 Records: {len(table_data)}")
+            self.records_label.setText(f"📊 Records: {len(sessions)}")
             
         except Exception as e:
             self._show_error("Load Error", f"Failed to load data: {e}")
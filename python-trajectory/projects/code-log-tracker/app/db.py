@@ -1,17 +1,286 @@
 # app/db.py
 import sqlite3
+import base64
+import hashlib
 import json
 import re
+import threading
+import time
+from contextlib import contextmanager
+from collections import Counter
+from itertools import chain, islice
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+)
+
+from app import query_trace
+from app.fuzzy_index import TrigramIndex
+from app.keyword_matcher import ITEM_DEFAULT_WEIGHTS, PackMatcher
+from app.query_trace import QueryTracer
+from app.records import SESSION_RECORD_FIELDS, SessionRecord, fetch_records, record_factory
 
 DB_PATH = Path(__file__).resolve().parent.parent / "learning_tracker.db"
 RULES_PATH = Path(__file__).resolve().parent.parent / "rules"
 
-def connect():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+# Pragma profile applied to every pooled connection. Override per key through
+# configure_database(pragmas={...}) - e.g. {'synchronous': 'FULL'} for durability
+# or a larger cache_size/mmap_size on machines with memory to spare.
+DEFAULT_PRAGMAS: Dict[str, object] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,       # negative = KiB, ~16 MB page cache
+    'mmap_size': 134217728,     # 128 MB memory-mapped reads
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+# Pragmas of the profile that are set per database, so attached ones get them too
+SCHEMA_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size')
+
+# Number of compiled statements sqlite3 keeps per connection
+STATEMENT_CACHE_SIZE = 256
+
+# Rows per executemany batch in bulk_insert_sessions
+BULK_CHUNK_SIZE = 1000
+
+# Rows per multi-row INSERT statement in bulk writes
+BULK_ROWS_PER_STATEMENT = 500
+
+# Page cache (KiB) a bulk write grows its connection to while it runs: the
+# session indexes take new rows in random order, and with the default cache
+# a million-row import spends about a fifth of its time re-reading pages
+BULK_CACHE_KIB = 262144
+
+# A per-item summary refresh costs about as much as recompute_all_summaries
+# spends on this many sessions, plus the same again for each session of the
+# item. Bulk writes whose touched items would cost more than the whole table
+# use the set-based pass instead
+SUMMARY_REBUILD_SESSIONS_PER_ITEM = 40
+
+# Keys per row-value IN (...) lookup when resolving items in bulk
+ITEM_LOOKUP_BATCH = 300
+
+# Sessions dated more than this many days back move to the archive database
+# (the 'archive_after_days' config value overrides it)
+ARCHIVE_AFTER_DAYS = 365
+
+# Sessions moved per archive transaction
+ARCHIVE_BATCH_SIZE = 5000
+
+# Schema name the archive database is attached under
+ARCHIVE_SCHEMA = 'archive'
+
+# Bytes of sessions.content_hash (see session_content_hash)
+CONTENT_HASH_BYTES = 16
+
+# Content hashes looked up per statement by bulk_insert_sessions
+HASH_LOOKUP_BATCH = 500
+
+# Sessions hashed or removed per dedupe_sessions transaction
+DEDUPE_BATCH_SIZE = 5000
+
+class DuplicateSessionError(ValueError):
+    """A new session has the same content as one already logged (session_id)"""
+
+    def __init__(self, session_id: int):
+        super().__init__(f"Session #{session_id} already logs the same work")
+        self.session_id = session_id
+
+
+SESSION_COLUMNS = ('item_id', 'date', 'status', 'hours_spent', 'notes', 'tags',
+                   'difficulty', 'topic', 'points_awarded', 'progress_pct')
+
+
+def default_archive_path(db_path: Path) -> Path:
+    """<database name>.archive.db next to the database"""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.archive.db")
+
+
+class ConnectionManager:
+    """
+    Hands each thread its own long-lived SQLite connection.
+
+    Connections are opened lazily, tuned once with the pragma profile and kept
+    for the life of the process so prepared statements stay cached. Writes go
+    through transaction(), which nests with savepoints. With a tracer, every
+    connection reports its statements to it (see app.query_trace).
+
+    Once the archive database (see archive_sessions) exists, every connection
+    attaches it and reads session history through the temp view
+    all_sessions; without one, all_sessions is just the hot sessions table.
+    """
+
+    def __init__(self, db_path: Path, pragmas: Optional[Dict[str, object]] = None,
+                 cached_statements: int = STATEMENT_CACHE_SIZE,
+                 tracer: Optional[QueryTracer] = None,
+                 archive_path: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        self.archive_path = Path(archive_path or default_archive_path(self.db_path))
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.cached_statements = cached_statements
+        self.tracer = tracer
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._generation = 0
+        self._archive_version = 0
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            local.con = self._open()
+            local.depth = 0
+            local.generation = self._generation
+            local.archive_version = None
+        # Outside transactions only, so a transaction never sees the views change under it
+        if local.archive_version != self._archive_version and local.depth == 0:
+            local.archive_version = self._archive_version
+            local.history = self._attach_archive(local.con)
+        return local.con
+
+    def history_schemas(self) -> Tuple[str, ...]:
+        """Schemas holding this thread's sessions: ('main',) or ('main', 'archive')"""
+        self.connection()
+        return self._local.history
+
+    def create_archive(self):
+        """Create the archive database (or bring its tables up to date) and attach it everywhere"""
+        con = self.connection()
+        if ARCHIVE_SCHEMA not in self._local.history:
+            self._attach(con)
+        with self.transaction(immediate=True) as con:
+            _create_archive_schema(con.cursor())
+        # Every connection (this one included) re-attaches and rebuilds its views on next use
+        with self._lock:
+            self._archive_version += 1
+        self.connection()
+
+    def _attach_archive(self, con: sqlite3.Connection) -> Tuple[str, ...]:
+        attached = any(row[1] == ARCHIVE_SCHEMA for row in con.execute("PRAGMA database_list"))
+        if not attached and self.archive_path.exists():
+            self._attach(con)
+        return create_history_views(con)
+
+    def _attach(self, con: sqlite3.Connection):
+        con.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(self.archive_path),))
+        for name in SCHEMA_PRAGMAS:
+            if name in self.pragmas:
+                con.execute(f"PRAGMA {ARCHIVE_SCHEMA}.{name}={self.pragmas[name]}")
+
+    def _open(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: no implicit BEGIN, transactions are explicit.
+        # check_same_thread=False only so close_all() can run from any thread;
+        # each connection is still used by the thread that opened it.
+        con = query_trace.connect(
+            self.db_path,
+            self.tracer,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        for name, value in self.pragmas.items():
+            con.execute(f"PRAGMA {name}={value}")
+        with self._lock:
+            self._connections.append(con)
+        return con
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Run the block in a transaction on this thread's connection.
+        Nested calls become savepoints, so helpers can be composed freely.
+        """
+        con = self.connection()
+        local = self._local
+        depth = local.depth
+        if depth == 0:
+            con.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            con.execute(f"SAVEPOINT sp_{depth}")
+        local.depth = depth + 1
+        try:
+            yield con
+        except BaseException:
+            local.depth = depth
+            if depth == 0:
+                con.execute("ROLLBACK")
+            else:
+                con.execute(f"ROLLBACK TO sp_{depth}")
+                con.execute(f"RELEASE sp_{depth}")
+            raise
+        local.depth = depth
+        con.execute("COMMIT" if depth == 0 else f"RELEASE sp_{depth}")
+
+    def close_all(self):
+        """Close every pooled connection; threads reopen on next use"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for con in connections:
+            try:
+                con.close()
+            except sqlite3.Error:
+                pass
+
+
+_manager: Optional[ConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> ConnectionManager:
+    """Get the process-wide connection manager for DB_PATH"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ConnectionManager(DB_PATH, tracer=query_trace.get_tracer())
+    return _manager
+
+
+def configure_database(db_path: Optional[Path] = None,
+                       pragmas: Optional[Dict[str, object]] = None,
+                       tracer: Optional[QueryTracer] = None,
+                       archive_path: Optional[Path] = None) -> ConnectionManager:
+    """
+    Point the module at another database file and/or pragma profile.
+    tracer defaults to the TRACKER_DB_TRACE one (None when tracing is off);
+    archive_path to <database name>.archive.db next to the database.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close_all()
+        _manager = ConnectionManager(db_path or DB_PATH, pragmas,
+                                     tracer=tracer or query_trace.get_tracer(),
+                                     archive_path=archive_path)
+    _suggestion_indexes.clear()
+    return _manager
+
+
+def get_query_tracer() -> Optional[QueryTracer]:
+    """The tracer collecting statement stats and slow queries, or None when tracing is off"""
+    return get_manager().tracer
+
+
+# Near-match indexes per (language_code, type), built from the database on first use
+_suggestion_indexes: Dict[Tuple[str, str], TrigramIndex] = {}
+_suggestion_lock = threading.Lock()
+
+
+def connect() -> sqlite3.Connection:
+    """Return this thread's pooled connection. Do not close it."""
+    return get_manager().connection()
+
+
+def transaction(immediate: bool = False):
+    """Context manager for a (possibly nested) transaction on the pooled connection"""
+    return get_manager().transaction(immediate)
 
 def slugify(text: str) -> str:
     """Convert text to a URL-friendly slug"""
@@ -34,9 +303,22 @@ def slugify(text: str) -> str:
     return text.strip('-')
 
 def init_db():
-    con = connect()
-    cur = con.cursor()
+    with transaction() as con:
+        _create_schema(con.cursor())
+
+    # Versioned changes on top of the baseline schema, each in short transactions
+    from app.migrations import migrate
+    migrate()
 
+    # An existing archive follows the sessions table's new columns, and
+    # loses the copies an interrupted archive_sessions left of hot sessions
+    if get_manager().archive_path.exists():
+        get_manager().create_archive()
+        _reconcile_archive()
+
+
+def _create_schema(cur: sqlite3.Cursor):
+    """Create tables, indexes and seed rows inside the caller's transaction"""
     # Global configuration
     cur.execute("""CREATE TABLE IF NOT EXISTS config(
         key TEXT PRIMARY KEY,
@@ -93,11 +375,91 @@ def init_db():
         FOREIGN KEY(item_id) REFERENCES items(id)
     )""")
 
+    # Active days per item (the date set behind streaks and projections).
+    # run_len is the length of the consecutive-day run ending on that day.
+    cur.execute("""CREATE TABLE IF NOT EXISTS item_active_days(
+        item_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        session_count INTEGER NOT NULL DEFAULT 0,
+        hours REAL NOT NULL DEFAULT 0,
+        run_len INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(item_id, day)
+    ) WITHOUT ROWID""")
+
+    # Slugified aliases per item - the lookup side of items.aliases_json
+    cur.execute("""CREATE TABLE IF NOT EXISTS item_aliases(
+        slug TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        PRIMARY KEY(slug, item_id),
+        FOREIGN KEY(item_id) REFERENCES items(id)
+    ) WITHOUT ROWID""")
+
+    # Daily rollup behind dashboard/analytics series, kept current by triggers
+    cur.execute("""CREATE TABLE IF NOT EXISTS daily_stats(
+        date TEXT NOT NULL,
+        language_code TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        difficulty TEXT NOT NULL DEFAULT '',
+        hours REAL NOT NULL DEFAULT 0,
+        points REAL NOT NULL DEFAULT 0,
+        session_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(date, language_code, item_id, difficulty)
+    ) WITHOUT ROWID""")
+    daily_stats_is_new = cur.execute("SELECT 1 FROM daily_stats LIMIT 1").fetchone() is None
+    create_trigger_holds(cur)
+    _create_daily_stats_triggers(cur)
+
+    # Full-text indexes over item names/aliases and session notes/tags/topic
+    search_is_new = _create_search_index(cur)
+
     # Create indexes
     cur.execute("CREATE INDEX IF NOT EXISTS idx_items_language_type ON items(language_code, type)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_items_slug ON items(slug)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_item ON sessions(item_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_item_date ON sessions(item_id, date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_item_aliases_item ON item_aliases(item_id)")
+    # Keyset pagination walks (date, id) newest first. Not covering on purpose: a page
+    # reads its limit+1 rows from the table, and the row has notes and tags
+    page_index = cur.execute(
+        "SELECT sql FROM sqlite_master WHERE type='index' AND name='idx_sessions_page'").fetchone()
+    if page_index and 'status' in page_index[0]:  # the wider index of earlier builds
+        cur.execute("DROP INDEX idx_sessions_page")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_page ON sessions(date DESC, id DESC)")
+
+    # Databases created before item_active_days existed need it filled once
+    cur.execute("SELECT 1 FROM item_active_days LIMIT 1")
+    if not cur.fetchone():
+        cur.execute("""
+            INSERT INTO item_active_days (item_id, day, session_count, hours)
+            SELECT item_id, substr(date, 1, 10), COUNT(*), SUM(hours_spent)
+            FROM sessions GROUP BY item_id, substr(date, 1, 10)
+        """)
+        _rebuild_streak_runs(cur)
+
+    # Fill the rollup from existing sessions
+    if daily_stats_is_new:
+        cur.execute("""
+            INSERT INTO daily_stats (date, language_code, item_id, difficulty,
+                                     hours, points, session_count)
+            SELECT substr(s.date, 1, 10), COALESCE(i.language_code, ''), s.item_id,
+                   COALESCE(s.difficulty, ''), SUM(s.hours_spent),
+                   SUM(COALESCE(s.points_awarded, 0)), COUNT(*)
+            FROM sessions s LEFT JOIN items i ON i.id = s.item_id
+            GROUP BY 1, 2, 3, 4
+        """)
+
+    # Index existing rows once; the triggers keep both tables current afterwards
+    if search_is_new:
+        cur.execute("INSERT INTO items_fts(items_fts) VALUES('rebuild')")
+        cur.execute("INSERT INTO sessions_fts(sessions_fts) VALUES('rebuild')")
+
+    # Same for item_aliases: index every alias already stored as JSON
+    cur.execute("SELECT 1 FROM item_aliases LIMIT 1")
+    if not cur.fetchone():
+        cur.execute("SELECT id, slug, aliases_json FROM items")
+        for item_id, slug, aliases_json in cur.fetchall():
+            _index_aliases(cur, item_id, [slug, *json.loads(aliases_json or '[]')])
 
     # Seed initial data
     now = datetime.utcnow().isoformat()
@@ -143,31 +505,267 @@ def init_db():
             cur.execute("INSERT INTO languages (code, name, color_hex) VALUES (?, ?, ?)",
                        (code, name, color))
 
-    con.commit()
-    con.close()
+
+def _index_aliases(cur: sqlite3.Cursor, item_id: int, aliases: Iterable[str]):
+    """Record the slug of each alias for an item in item_aliases"""
+    slugs = {slugify(alias) for alias in aliases if alias}
+    cur.executemany("INSERT OR IGNORE INTO item_aliases (slug, item_id) VALUES (?, ?)",
+                    [(slug, item_id) for slug in slugs if slug])
+
+
+def create_trigger_holds(cur: sqlite3.Cursor):
+    """Create trigger_holds, the names of triggers switched off by the current write transaction"""
+    cur.execute("CREATE TABLE IF NOT EXISTS trigger_holds(name TEXT PRIMARY KEY) WITHOUT ROWID")
+
+
+def trigger_guard(name: str) -> str:
+    """
+    WHEN clause for trigger name, which skips its body while a row in
+    trigger_holds names it. Bulk writers switch a trigger off that way
+    inside their transaction instead of dropping and recreating it, which
+    would change the schema under every other connection.
+    """
+    return f"WHEN NOT EXISTS (SELECT 1 FROM trigger_holds WHERE name = '{name}')"
+
+
+def _hold_triggers(cur: sqlite3.Cursor, names: Iterable[str]):
+    """
+    Switch the named (guarded) triggers off until _release_triggers, inside
+    the caller's write transaction. No other connection writes meanwhile,
+    and a rollback drops the holds with everything else.
+    """
+    cur.executemany("INSERT OR IGNORE INTO trigger_holds (name) VALUES (?)",
+                    [(name,) for name in names])
+
+
+def _release_triggers(cur: sqlite3.Cursor, names: Iterable[str]):
+    """Switch triggers held by _hold_triggers back on"""
+    cur.executemany("DELETE FROM trigger_holds WHERE name = ?", [(name,) for name in names])
+
+
+# Trigger bodies adding/removing one session's contribution to daily_stats
+_DAILY_STATS_ADD = """
+    INSERT INTO daily_stats (date, language_code, item_id, difficulty, hours, points, session_count)
+    VALUES (substr(NEW.date, 1, 10),
+            COALESCE((SELECT language_code FROM items WHERE id = NEW.item_id), ''),
+            NEW.item_id, COALESCE(NEW.difficulty, ''),
+            NEW.hours_spent, COALESCE(NEW.points_awarded, 0), 1)
+    ON CONFLICT(date, language_code, item_id, difficulty) DO UPDATE SET
+        hours = hours + excluded.hours,
+        points = points + excluded.points,
+        session_count = session_count + 1;
+"""
+_DAILY_STATS_REMOVE = """
+    UPDATE daily_stats SET
+        hours = hours - OLD.hours_spent,
+        points = points - COALESCE(OLD.points_awarded, 0),
+        session_count = session_count - 1
+    WHERE date = substr(OLD.date, 1, 10)
+      AND language_code = COALESCE((SELECT language_code FROM items WHERE id = OLD.item_id), '')
+      AND item_id = OLD.item_id AND difficulty = COALESCE(OLD.difficulty, '');
+    DELETE FROM daily_stats
+    WHERE date = substr(OLD.date, 1, 10)
+      AND language_code = COALESCE((SELECT language_code FROM items WHERE id = OLD.item_id), '')
+      AND item_id = OLD.item_id AND difficulty = COALESCE(OLD.difficulty, '')
+      AND session_count <= 0;
+"""
+
+
+def _create_daily_stats_triggers(cur: sqlite3.Cursor):
+    """Keep daily_stats in step with every insert, update and delete on sessions"""
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_stats_insert AFTER INSERT ON sessions
+        {trigger_guard('trg_sessions_daily_stats_insert')}
+        BEGIN {_DAILY_STATS_ADD} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_stats_delete AFTER DELETE ON sessions
+        {trigger_guard('trg_sessions_daily_stats_delete')}
+        BEGIN {_DAILY_STATS_REMOVE} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_stats_update
+        AFTER UPDATE OF item_id, date, hours_spent, points_awarded, difficulty ON sessions
+        {trigger_guard('trg_sessions_daily_stats_update')}
+        BEGIN {_DAILY_STATS_REMOVE} {_DAILY_STATS_ADD} END
+    """)
+
+
+def _create_search_index(cur: sqlite3.Cursor) -> bool:
+    """Create the FTS5 tables and their sync triggers. True if the tables are new."""
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sessions_fts'")
+    is_new = cur.fetchone() is None
+
+    # External-content tables: the text lives in items/sessions, FTS keeps only the index
+    cur.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        canonical_name, aliases_json,
+        content='items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""")
+    cur.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS sessions_fts USING fts5(
+        notes, tags, topic,
+        content='sessions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""")
+
+    for table, fts, columns, watched in (
+        ('items', 'items_fts', ('canonical_name', 'aliases_json'), 'canonical_name, aliases_json'),
+        ('sessions', 'sessions_fts', ('notes', 'tags', 'topic'), 'notes, tags, topic'),
+    ):
+        names = ', '.join(columns)
+        new_values = ', '.join(f"NEW.{c}" for c in columns)
+        old_values = ', '.join(f"OLD.{c}" for c in columns)
+        add = f"INSERT INTO {fts}(rowid, {names}) VALUES (NEW.id, {new_values});"
+        remove = (f"INSERT INTO {fts}({fts}, rowid, {names}) "
+                  f"VALUES ('delete', OLD.id, {old_values});")
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+            {trigger_guard(f'trg_{fts}_insert')}
+            BEGIN {add} END
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+            {trigger_guard(f'trg_{fts}_delete')}
+            BEGIN {remove} END
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {watched} ON {table}
+            {trigger_guard(f'trg_{fts}_update')}
+            BEGIN {remove} {add} END
+        """)
+    return is_new
+
+
+def _create_archive_schema(cur: sqlite3.Cursor):
+    """
+    Create the archive's sessions and session_tags tables, or add the
+    session columns it is missing. Archived rows keep their ids (hot ids
+    come from AUTOINCREMENT, so they never collide).
+    """
+    columns = cur.execute("PRAGMA main.table_info(sessions)").fetchall()
+    definitions = ['id INTEGER PRIMARY KEY' if col[1] == 'id' else f'{col[1]} {col[2]}'
+                   for col in columns]
+    cur.execute(f"""CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.sessions(
+        {', '.join(definitions)}
+    )""")
+    archived = {row[1] for row in cur.execute(f"PRAGMA {ARCHIVE_SCHEMA}.table_info(sessions)")}
+    for col in columns:
+        if col[1] not in archived:
+            cur.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.sessions ADD COLUMN {col[1]} {col[2]}")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_sessions_date ON sessions(date)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_sessions_item_date "
+                f"ON sessions(item_id, date)")
+    if any(col[1] == 'project_name' for col in columns):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_sessions_project "
+                    f"ON sessions(project_name)")
+    if any(col[1] == 'content_hash' for col in columns):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_sessions_content_hash "
+                    f"ON sessions(content_hash)")
+    cur.execute(f"""CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.session_tags(
+        session_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (session_id, tag_id)
+    ) WITHOUT ROWID""")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_session_tags_tag "
+                f"ON session_tags(tag_id, session_id)")
+
+
+def create_history_views(con: sqlite3.Connection) -> Tuple[str, ...]:
+    """
+    (Re)create con's all_sessions view over the hot sessions and, when the
+    archive is attached to con, the archived ones; returns the schemas
+    holding sessions. For connections opened outside the ConnectionManager.
+    """
+    attached = any(row[1] == ARCHIVE_SCHEMA for row in con.execute("PRAGMA database_list"))
+    archived = attached and con.execute(
+        f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type='table' AND name='sessions'"
+    ).fetchone()
+    _create_history_view(con, bool(archived))
+    return ('main', ARCHIVE_SCHEMA) if archived else ('main',)
+
+
+def _create_history_view(con: sqlite3.Connection, archived: bool):
+    """
+    (Re)create this connection's all_sessions view: hot sessions, UNION ALL
+    archived ones if archived. Archived rows read through the temp view
+    archived_sessions, which skips copies of sessions that are still hot
+    (archive_sessions copies before it deletes, and a crash in between
+    leaves both until _reconcile_archive). The per-row check only runs
+    while config holds the 'archive_pending' marker, i.e. while such
+    copies may exist.
+    """
+    con.execute("DROP VIEW IF EXISTS temp.all_sessions")
+    con.execute("DROP VIEW IF EXISTS temp.archived_sessions")
+    if not archived:
+        con.execute("CREATE TEMP VIEW all_sessions AS SELECT * FROM main.sessions")
+        return
+    con.execute(f"""
+        CREATE TEMP VIEW archived_sessions AS
+        SELECT * FROM {ARCHIVE_SCHEMA}.sessions a
+        WHERE NOT EXISTS (SELECT 1 FROM main.config WHERE key = 'archive_pending')
+           OR NOT EXISTS (SELECT 1 FROM main.sessions m WHERE m.id = a.id)
+    """)
+    hot = [row[1] for row in con.execute("PRAGMA main.table_info(sessions)")]
+    cold = {row[1] for row in con.execute(f"PRAGMA {ARCHIVE_SCHEMA}.table_info(sessions)")}
+    con.execute(f"""
+        CREATE TEMP VIEW all_sessions AS
+        SELECT {', '.join(hot)} FROM main.sessions
+        UNION ALL
+        SELECT {', '.join(c if c in cold else f'NULL AS {c}' for c in hot)}
+        FROM temp.archived_sessions
+    """)
+
+
+# What a history arm reads as the sessions of each schema (see _create_history_view)
+_HISTORY_SESSIONS = {'main': 'main.sessions', ARCHIVE_SCHEMA: 'temp.archived_sessions'}
+
+
+def _history_union(arm: str, params: Iterable = ()) -> Tuple[str, List]:
+    """
+    arm, a SELECT over {sessions} (and {schema}.session_tags), once per
+    schema holding sessions and joined with UNION ALL; params repeated
+    to match. For joined or ordered reads, where the all_sessions view would
+    be materialized: each arm keeps its own indexes, and an ORDER BY on the
+    compound merges the arms instead of sorting.
+    """
+    schemas = get_manager().history_schemas()
+    arms = [arm.format(schema=schema, sessions=_HISTORY_SESSIONS[schema]) for schema in schemas]
+    return " UNION ALL ".join(arms), list(params) * len(schemas)
+
 
 def get_config(key: str = 'global') -> Dict:
     """Get configuration from database"""
-    con = connect()
-    cur = con.cursor()
-    cur.execute("SELECT value_json FROM config WHERE key=?", (key,))
-    row = cur.fetchone()
-    con.close()
-    
+    row = connect().execute("SELECT value_json FROM config WHERE key=?", (key,)).fetchone()
+
     if row:
         return json.loads(row[0])
     return {}
 
-def load_language_pack(language_code: str) -> Dict:
-    """Load language pack from JSON file"""
-    # Clean language code to prevent path issues
-    clean_code = language_code.replace('/', '_').replace(' ', '_').lower()
-    pack_file = RULES_PATH / f"{clean_code}.json"
-    common_file = RULES_PATH / "_common.json"
-    
-    # Ensure rules directory exists
-    RULES_PATH.mkdir(exist_ok=True)
-    
+# Pack used in memory for languages without a rules/<code>.json file
+DEFAULT_LANGUAGE_PACK: Dict = {
+    'topics': {
+        'Basics': {'default_difficulty': 'Beginner', 'default_target_hours': 5},
+        'Intermediate': {'default_difficulty': 'Intermediate', 'default_target_hours': 10},
+        'Advanced': {'default_difficulty': 'Advanced', 'default_target_hours': 15}
+    },
+    'skills': {},
+    'aliases': {}
+}
+
+# clean language code -> ((common mtime, pack mtime), frozen pack, compiled matcher)
+_pack_cache: Dict[str, Tuple[Tuple, Mapping, PackMatcher]] = {}
+_pack_lock = threading.Lock()
+
+
+def _file_mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _read_language_pack(common_file: Path, pack_file: Path) -> Dict:
+    """Merge rules/_common.json with a language file (language-specific keys win)"""
     pack = {}
     
     # Load common rules first
@@ -186,30 +784,133 @@ def load_language_pack(language_code: str) -> Dict:
                 else:
                     pack[key] = value
     else:
-        # Create default language pack if it doesn't exist
-        default_pack = {
-            'topics': {
-                'Basics': {'default_difficulty': 'Beginner', 'default_target_hours': 5},
-                'Intermediate': {'default_difficulty': 'Intermediate', 'default_target_hours': 10},
-                'Advanced': {'default_difficulty': 'Advanced', 'default_target_hours': 15}
-            },
-            'skills': {},
-            'aliases': {}
-        }
-        
-        with open(pack_file, 'w') as f:
-            json.dump(default_pack, f, indent=2)
-        pack.update(default_pack)
+        pack.update(json.loads(json.dumps(DEFAULT_LANGUAGE_PACK)))
     
     return pack
 
+
+def _freeze(value: Any) -> Any:
+    """Read-only view of parsed JSON: dicts become mapping proxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _language_pack_entry(language_code: str) -> Tuple[Tuple, Mapping, PackMatcher]:
+    """Cached (mtimes, pack, matcher) for a language, reloaded when either file changes"""
+    # Clean language code to prevent path issues
+    clean_code = language_code.replace('/', '_').replace(' ', '_').lower()
+    pack_file = RULES_PATH / f"{clean_code}.json"
+    common_file = RULES_PATH / "_common.json"
+
+    with _pack_lock:
+        mtimes = (_file_mtime(common_file), _file_mtime(pack_file))
+        entry = _pack_cache.get(clean_code)
+        if entry is None or entry[0] != mtimes:
+            pack = _read_language_pack(common_file, pack_file)
+            entry = (mtimes, _freeze(pack), PackMatcher(pack))
+            _pack_cache[clean_code] = entry
+    return entry
+
+
+def load_language_pack(language_code: str) -> Mapping:
+    """
+    Load language pack from JSON files. The pack is cached and shared, so
+    it comes back read-only (nested mappings and tuples).
+    """
+    return _language_pack_entry(language_code)[1]
+
+
+def get_pack_matcher(language_code: str) -> PackMatcher:
+    """Compiled keyword matcher for a language pack"""
+    return _language_pack_entry(language_code)[2]
+
+def _infer_item_defaults(language_code: str, name: str) -> Tuple[str, str, float]:
+    """Pick (topic, difficulty, target_hours) for a new item by scoring its name against its pack"""
+    _, pack, matcher = _language_pack_entry(language_code)
+
+    # Auto-detect topic and difficulty from language pack
+    default_topic = 'Basics'
+    default_difficulty = 'Beginner'
+    default_target = 5.0
+    best_score = 0
+
+    # One pass over the name scores every topic and skill
+    scores = matcher.scores(name, ITEM_DEFAULT_WEIGHTS)
+
+    topic = matcher.best(scores, 'topic')
+    if topic:
+        default_topic, best_score = topic
+        topic_info = pack['topics'][default_topic]
+        default_difficulty = topic_info.get('default_difficulty', 'Beginner')
+        default_target = topic_info.get('default_target_hours', 5.0)
+
+    # Check skills for better matches
+    skill = matcher.best(scores, 'skill')
+    if skill and skill[1] > best_score:
+        skill_info = pack['skills'][skill[0]]
+        default_difficulty = skill_info.get('difficulty', default_difficulty)
+        default_target = skill_info.get('default_target_hours', default_target)
+
+    return default_topic, default_difficulty, default_target
+
+
+def _suggestion_index(language_code: str, item_type: str) -> TrigramIndex:
+    """Get the near-match index for a language/type, loading it from items and aliases if needed"""
+    key = (language_code, item_type)
+    index = _suggestion_indexes.get(key)
+    if index is not None:
+        return index
+
+    with _suggestion_lock:
+        index = _suggestion_indexes.get(key)
+        if index is None:
+            cur = connect().execute("""
+                SELECT i.id, i.canonical_name, i.slug, a.slug FROM items i
+                LEFT JOIN item_aliases a ON a.item_id = i.id
+                WHERE i.language_code=? AND i.type=? AND i.is_active=1
+                ORDER BY i.id
+            """, key)
+            terms: Dict[int, Tuple[str, List[str]]] = {}
+            for item_id, name, slug, alias_slug in cur.fetchall():
+                entry = terms.setdefault(item_id, (name, [slug]))
+                if alias_slug and alias_slug != slug:
+                    entry[1].append(alias_slug)
+            index = TrigramIndex()
+            for item_id, (name, slugs) in terms.items():
+                index.add(item_id, name, slugs)
+            _suggestion_indexes[key] = index
+    return index
+
+
+def _forget_suggestion_index(language_code: str, item_type: str):
+    """Drop a cached near-match index so the next lookup rebuilds it"""
+    _suggestion_indexes.pop((language_code, item_type), None)
+
+
+def suggest_items(language_code: str, item_type: str, work_item_name: str,
+                  limit: int = 3) -> List[Dict]:
+    """
+    Ranked near matches for a work item name within a language/type.
+    Returns [{'id', 'name', 'similarity', 'similarity_hint'}], best first.
+    """
+    slug = slugify(work_item_name)
+    if not slug:
+        return []
+    matches = _suggestion_index(language_code, item_type).search(slug, limit=limit)
+    for match in matches:
+        match['similarity_hint'] = f"{match['similarity']:.0%} similar"
+    return matches
+
+
 def find_or_create_item(language_code: str, item_type: str, work_item_name: str) -> Tuple[int, bool, List[Dict]]:
     """
     Find existing item or create new one
     Returns: (item_id, is_new, suggestions)
     """
-    con = connect()
-    cur = con.cursor()
+    cur = connect().cursor()
     
     # Normalize input
     slug = slugify(work_item_name)
@@ -223,235 +924,574 @@ def find_or_create_item(language_code: str, item_type: str, work_item_name: str)
     
     row = cur.fetchone()
     if row:
-        con.close()
         return row[0], False, []
     
     # Try alias match
     cur.execute("""
-        SELECT id, aliases_json FROM items 
-        WHERE language_code=? AND type=? AND is_active=1
-    """, (language_code, item_type))
+        SELECT a.item_id FROM item_aliases a
+        JOIN items i ON i.id = a.item_id
+        WHERE a.slug=? AND i.language_code=? AND i.type=? AND i.is_active=1
+        LIMIT 1
+    """, (slug, language_code, item_type))
     
-    for item_id, aliases_json in cur.fetchall():
-        aliases = json.loads(aliases_json or '[]')
-        if slug in [slugify(alias) for alias in aliases]:
-            con.close()
-            return item_id, False, []
+    row = cur.fetchone()
+    if row:
+        return row[0], False, []
     
     # Generate suggestions for near matches
-    suggestions = []
-    cur.execute("""
-        SELECT id, canonical_name, slug FROM items 
-        WHERE language_code=? AND type=? AND is_active=1
-    """, (language_code, item_type))
-    
-    for item_id, canonical_name, item_slug in cur.fetchall():
-        # Simple similarity check
-        if abs(len(slug) - len(item_slug)) <= 2:  # Length difference
-            common_chars = set(slug) & set(item_slug)
-            if len(common_chars) >= min(3, len(slug) // 2):  # Some common characters
-                suggestions.append({
-                    'id': item_id,
-                    'name': canonical_name,
-                    'similarity_hint': f"matched: {', '.join(sorted(common_chars)[:3])}"
-                })
+    suggestions = suggest_items(language_code, item_type, work_item_name)
     
     # If we have close suggestions and the input is short, return them
     if suggestions and len(work_item_name.strip()) <= 20:
-        con.close()
-        return None, False, suggestions[:3]
+        return None, False, suggestions
     
     # Create new item
-    pack = load_language_pack(language_code)
-    
-    # Auto-detect topic and difficulty from language pack
-    default_topic = 'Basics'
-    default_difficulty = 'Beginner'
-    default_target = 5.0
-    
-    # Score against language pack keywords
-    text_to_score = f"{normalized_name}".lower()
-    best_score = 0
-    
-    for topic, topic_info in pack.get('topics', {}).items():
-        score = 0
-        # Simple keyword matching
-        if topic.lower() in text_to_score:
-            score += 10
-        
-        if score > best_score:
-            best_score = score
-            default_topic = topic
-            default_difficulty = topic_info.get('default_difficulty', 'Beginner')
-            default_target = topic_info.get('default_target_hours', 5.0)
-    
-    # Check skills for better matches
-    for skill_name, skill_info in pack.get('skills', {}).items():
-        score = 0
-        keywords = skill_info.get('keywords', [])
-        
-        for keyword in keywords:
-            if keyword.lower() in text_to_score:
-                score += 5
-        
-        if skill_name.lower() in text_to_score:
-            score += 15
-            
-        if score > best_score:
-            best_score = score
-            default_difficulty = skill_info.get('difficulty', default_difficulty)
-            default_target = skill_info.get('default_target_hours', default_target)
-    
+    default_topic, default_difficulty, default_target = _infer_item_defaults(language_code,
+                                                                             normalized_name)
+
     # Insert new item
     now = datetime.utcnow().isoformat()
     aliases = [normalized_name, slug]  # Start with input variants
     
-    cur.execute("""
-        INSERT INTO items (
-            language_code, type, canonical_name, slug, aliases_json,
-            default_difficulty, default_topic, target_hours, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (language_code, item_type, normalized_name, slug, json.dumps(aliases),
-          default_difficulty, default_topic, default_target, now))
-    
-    item_id = cur.lastrowid
-    con.commit()
-    con.close()
-    
+    with transaction() as con:
+        cur = con.execute("""
+            INSERT INTO items (
+                language_code, type, canonical_name, slug, aliases_json,
+                default_difficulty, default_topic, target_hours, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (language_code, item_type, normalized_name, slug, json.dumps(aliases),
+              default_difficulty, default_topic, default_target, now))
+        item_id = cur.lastrowid
+        _index_aliases(con.cursor(), item_id, aliases)
+
+    index = _suggestion_indexes.get((language_code, item_type))
+    if index is not None:
+        index.add(item_id, normalized_name, [slug])
     return item_id, True, []
 
-def update_item_summaries(item_id: int):
-    """Update computed fields for an item"""
-    con = connect()
-    cur = con.cursor()
-    
-    # Get all sessions for this item
+def _rebuild_streak_runs(cur: sqlite3.Cursor, item_id: Optional[int] = None):
+    """Recompute run_len (gaps and islands) and longest streak for one item or all items"""
+    where = "WHERE item_id=?" if item_id is not None else ""
+    params = (item_id,) * 2 if item_id is not None else ()
+    cur.execute(f"""
+        UPDATE item_active_days SET run_len = runs.run_len
+        FROM (
+            SELECT item_id, day,
+                   ROW_NUMBER() OVER (PARTITION BY item_id, grp ORDER BY day) AS run_len
+            FROM (
+                SELECT item_id, day,
+                       julianday(day) - ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY day) AS grp
+                FROM item_active_days {where}
+            )
+        ) AS runs
+        WHERE item_active_days.item_id = runs.item_id AND item_active_days.day = runs.day
+    """, params[:1])
+    cur.execute(f"""
+        UPDATE items SET longest_streak_days = COALESCE(
+            (SELECT MAX(run_len) FROM item_active_days d WHERE d.item_id = items.id), 0)
+        {"WHERE id=?" if item_id is not None else ""}
+    """, params[1:])
+
+
+def _add_session_to_summary(cur: sqlite3.Cursor, item_id: int, date: str, hours: float) -> bool:
+    """
+    Fold one new session into totals and the active-day set.
+    Returns True when the day lands before the item's last active day,
+    i.e. the streak runs have to be rebuilt.
+    """
+    day = date[:10]
+    cur.execute("UPDATE items SET total_logs=total_logs+1, total_hours=total_hours+? WHERE id=?",
+                (hours, item_id))
+
     cur.execute("""
-        SELECT date, hours_spent FROM sessions 
-        WHERE item_id=? 
-        ORDER BY date
+        UPDATE item_active_days SET session_count=session_count+1, hours=hours+?
+        WHERE item_id=? AND day=?
+    """, (hours, item_id, day))
+    if cur.rowcount:
+        return False
+
+    cur.execute("SELECT MAX(day) FROM item_active_days WHERE item_id=?", (item_id,))
+    last_day = cur.fetchone()[0]
+    if last_day is not None and day < last_day:
+        cur.execute("""
+            INSERT INTO item_active_days (item_id, day, session_count, hours) VALUES (?, ?, 1, ?)
+        """, (item_id, day, hours))
+        return True
+
+    # Appending in date order: extend the run ending yesterday
+    prev_day = (datetime.fromisoformat(day) - timedelta(days=1)).date().isoformat()
+    cur.execute("SELECT run_len FROM item_active_days WHERE item_id=? AND day=?",
+                (item_id, prev_day))
+    prev = cur.fetchone()
+    run_len = prev[0] + 1 if prev else 1
+    cur.execute("""
+        INSERT INTO item_active_days (item_id, day, session_count, hours, run_len)
+        VALUES (?, ?, 1, ?, ?)
+    """, (item_id, day, hours, run_len))
+    cur.execute("UPDATE items SET longest_streak_days=MAX(longest_streak_days, ?) WHERE id=?",
+                (run_len, item_id))
+    return False
+
+
+def _remove_session_from_summary(cur: sqlite3.Cursor, item_id: int, date: str,
+                                 hours: float) -> bool:
+    """Take one session out of totals and the active-day set. Returns True if a day disappeared."""
+    day = date[:10]
+    cur.execute("""
+        UPDATE items SET total_logs=MAX(total_logs-1, 0), total_hours=total_hours-? WHERE id=?
+    """, (hours, item_id))
+    cur.execute("""
+        UPDATE item_active_days SET session_count=session_count-1, hours=hours-?
+        WHERE item_id=? AND day=?
+    """, (hours, item_id, day))
+    cur.execute("DELETE FROM item_active_days WHERE item_id=? AND day=? AND session_count<=0",
+                (item_id, day))
+    return cur.rowcount > 0
+
+
+def _refresh_item_summary(cur: sqlite3.Cursor, item_id: int, rebuild_streaks: bool = False):
+    """Refresh current streak, last log and projection from the active-day set"""
+    if rebuild_streaks:
+        _rebuild_streak_runs(cur, item_id)
+
+    today = datetime.now().date()
+
+    # Current streak only counts if the latest active day is today
+    cur.execute("""
+        SELECT day, run_len FROM item_active_days
+        WHERE item_id=? ORDER BY day DESC LIMIT 1
     """, (item_id,))
-    
-    sessions = cur.fetchall()
-    
-    if not sessions:
-        con.close()
+    last = cur.fetchone()
+    current_streak = last[1] if last and last[0] == today.isoformat() else 0
+
+    cur.execute("SELECT MAX(date) FROM all_sessions WHERE item_id=?", (item_id,))
+    last_logged_at = cur.fetchone()[0]
+
+    cur.execute("SELECT target_hours, total_hours FROM items WHERE id=?", (item_id,))
+    row = cur.fetchone()
+    if row is None:
         return
-    
-    # Calculate totals
-    total_logs = len(sessions)
-    total_hours = sum(float(row[1]) for row in sessions)
-    last_logged_at = sessions[-1][0]
-    
-    # Calculate streaks
-    dates = [datetime.fromisoformat(row[0]).date() for row in sessions]
-    unique_dates = sorted(set(dates))
-    
-    current_streak = 0
-    longest_streak = 0
-    temp_streak = 1
-    
-    if unique_dates:
-        # Current streak (from most recent date backwards)
-        today = datetime.now().date()
-        for i, date in enumerate(reversed(unique_dates)):
-            expected_date = today - timedelta(days=i)
-            if date == expected_date:
-                current_streak += 1
-            else:
-                break
-        
-        # Longest streak
-        for i in range(1, len(unique_dates)):
-            if (unique_dates[i] - unique_dates[i-1]).days == 1:
-                temp_streak += 1
-                longest_streak = max(longest_streak, temp_streak)
-            else:
-                temp_streak = 1
-        longest_streak = max(longest_streak, temp_streak)
-    
-    # Calculate projected finish date
-    cur.execute("SELECT target_hours FROM items WHERE id=?", (item_id,))
-    target_row = cur.fetchone()
-    target_hours = float(target_row[0]) if target_row and target_row[0] else 0
-    
+    target_hours = float(row[0] or 0)
+    total_hours = float(row[1] or 0)
+
+    # Calculate projected finish date from the last 14 days of activity
     projected_finish_date = None
-    if target_hours > total_hours and len(unique_dates) >= 2:
-        # Calculate average hours per active day (last 14 days of activity)
-        recent_dates = [d for d in unique_dates if (datetime.now().date() - d).days <= 14]
-        if recent_dates:
-            recent_sessions = [s for s in sessions if datetime.fromisoformat(s[0]).date() in recent_dates]
-            recent_hours = sum(float(s[1]) for s in recent_sessions)
-            avg_hours_per_day = recent_hours / len(set(recent_dates))
-            
+    cur.execute("SELECT COUNT(*) FROM (SELECT 1 FROM item_active_days WHERE item_id=? LIMIT 2)",
+                (item_id,))
+    if target_hours > total_hours and cur.fetchone()[0] >= 2:
+        since = (today - timedelta(days=14)).isoformat()
+        cur.execute("""
+            SELECT SUM(hours), COUNT(*) FROM item_active_days
+            WHERE item_id=? AND day>=?
+        """, (item_id, since))
+        recent_hours, recent_days = cur.fetchone()
+        if recent_days:
+            avg_hours_per_day = float(recent_hours or 0) / recent_days
             if avg_hours_per_day > 0:
                 remaining_hours = target_hours - total_hours
                 days_to_finish = remaining_hours / avg_hours_per_day
                 projected_finish_date = (datetime.now() + timedelta(days=days_to_finish)).isoformat()
-    
-    # Update item
+
     cur.execute("""
-        UPDATE items SET 
-            total_logs=?, total_hours=?, last_logged_at=?,
-            current_streak_days=?, longest_streak_days=?, projected_finish_date=?
+        UPDATE items SET current_streak_days=?, last_logged_at=?, projected_finish_date=?
         WHERE id=?
-    """, (total_logs, total_hours, last_logged_at,
-          current_streak, longest_streak, projected_finish_date, item_id))
-    
-    con.commit()
-    con.close()
+    """, (current_streak, last_logged_at, projected_finish_date, item_id))
 
-def insert_or_update_session(session_data: Dict) -> int:
-    """Insert or update a session"""
-    con = connect()
-    cur = con.cursor()
-    
-    # Get global config for calculations
-    config = get_config()
+
+def apply_session_change(old: Optional[Tuple[int, str, float]],
+                         new: Optional[Tuple[int, str, float]]):
+    """
+    Apply one session insert, edit or delete to the item summaries.
+
+    old/new are (item_id, date, hours) before and after the change - None for
+    an insert or delete respectively. Cost does not depend on how many
+    sessions the item has; streaks are only rebuilt when a day is added
+    before the item's latest day or a day drops out of its history.
+    """
+    with transaction() as con:
+        cur = con.cursor()
+        rebuild: Dict[int, bool] = {}
+
+        if old and new and old[0] == new[0] and old[1][:10] == new[1][:10]:
+            # Same item and day: only the hours move
+            delta = float(new[2]) - float(old[2])
+            cur.execute("UPDATE items SET total_hours=total_hours+? WHERE id=?", (delta, new[0]))
+            cur.execute("UPDATE item_active_days SET hours=hours+? WHERE item_id=? AND day=?",
+                        (delta, new[0], new[1][:10]))
+            rebuild[new[0]] = False
+        else:
+            if old:
+                rebuild[old[0]] = _remove_session_from_summary(cur, old[0], old[1], float(old[2]))
+            if new:
+                added = _add_session_to_summary(cur, new[0], new[1], float(new[2]))
+                rebuild[new[0]] = rebuild.get(new[0], False) or added
+
+        for item_id, rebuild_streaks in rebuild.items():
+            _refresh_item_summary(cur, item_id, rebuild_streaks)
+
+
+def update_item_summaries(item_id: int):
+    """Recompute every computed field for an item from its sessions"""
+    with transaction() as con:
+        cur = con.cursor()
+        cur.execute("DELETE FROM item_active_days WHERE item_id=?", (item_id,))
+        cur.execute("""
+            INSERT INTO item_active_days (item_id, day, session_count, hours)
+            SELECT item_id, substr(date, 1, 10), COUNT(*), SUM(hours_spent)
+            FROM all_sessions WHERE item_id=? GROUP BY substr(date, 1, 10)
+        """, (item_id,))
+        cur.execute("""
+            UPDATE items SET
+                total_logs=(SELECT COUNT(*) FROM all_sessions WHERE item_id=?),
+                total_hours=(SELECT IFNULL(SUM(hours_spent), 0) FROM all_sessions WHERE item_id=?)
+            WHERE id=?
+        """, (item_id, item_id, item_id))
+        _refresh_item_summary(cur, item_id, rebuild_streaks=True)
+
+def recompute_all_summaries() -> Dict:
+    """
+    Recompute the summaries of every item from sessions in one set-based pass.
+
+    The active-day set and its streak runs are rebuilt with a gaps-and-islands
+    window query; totals, streaks, last log and the 14-day velocity projection
+    are aggregated per item and written with a single UPDATE ... FROM. Gives
+    the same results as update_item_summaries on each item, for the cost of a
+    few table scans. Returns the item count and elapsed seconds.
+    """
+    started = time.perf_counter()
+    now = datetime.now()
+    today = now.date()
+
+    with transaction(immediate=True) as con:
+        cur = con.cursor()
+        cur.execute("DELETE FROM item_active_days")
+        # Days of one run share julianday(day) - row number
+        cur.execute("""
+            INSERT INTO item_active_days (item_id, day, session_count, hours, run_len)
+            SELECT item_id, day, session_count, hours,
+                   ROW_NUMBER() OVER (PARTITION BY item_id, grp ORDER BY day)
+            FROM (
+                SELECT item_id, day, session_count, hours,
+                       julianday(day) - ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY day) AS grp
+                FROM (
+                    SELECT item_id, substr(date, 1, 10) AS day, COUNT(*) AS session_count,
+                           SUM(hours_spent) AS hours
+                    FROM all_sessions GROUP BY item_id, day
+                )
+            )
+        """)
+        cur.execute("""
+            UPDATE items SET
+                total_logs = agg.logs,
+                total_hours = agg.hours,
+                last_logged_at = agg.last_logged_at,
+                longest_streak_days = agg.longest,
+                current_streak_days = agg.current,
+                projected_finish_date = CASE
+                    WHEN items.target_hours > agg.hours AND agg.days >= 2 AND agg.recent_hours > 0
+                    THEN strftime('%Y-%m-%dT%H:%M:%f', :now, printf('%+f days',
+                         (items.target_hours - agg.hours) * agg.recent_days / agg.recent_hours))
+                END
+            FROM (
+                SELECT i.id AS item_id,
+                       IFNULL(t.logs, 0) AS logs, IFNULL(t.hours, 0) AS hours, t.last_logged_at,
+                       IFNULL(d.longest, 0) AS longest, IFNULL(d.current, 0) AS current,
+                       IFNULL(d.days, 0) AS days, d.recent_hours, d.recent_days
+                FROM items i
+                LEFT JOIN (
+                    SELECT item_id, COUNT(*) AS logs, SUM(hours_spent) AS hours,
+                           MAX(date) AS last_logged_at
+                    FROM all_sessions GROUP BY item_id
+                ) t ON t.item_id = i.id
+                LEFT JOIN (
+                    -- Current streak only counts if the latest active day is today
+                    SELECT item_id, MAX(run_len) AS longest, COUNT(*) AS days,
+                           CASE WHEN MAX(day) = :today
+                                THEN MAX(CASE WHEN day = :today THEN run_len END)
+                                ELSE 0 END AS current,
+                           SUM(CASE WHEN day >= :since THEN hours END) AS recent_hours,
+                           SUM(day >= :since) AS recent_days
+                    FROM item_active_days GROUP BY item_id
+                ) d ON d.item_id = i.id
+            ) AS agg
+            WHERE items.id = agg.item_id
+        """, {'now': now.isoformat(), 'today': today.isoformat(),
+              'since': (today - timedelta(days=14)).isoformat()})
+        items = cur.rowcount
+
+    return {'items': items, 'seconds': time.perf_counter() - started}
+
+
+def add_item_alias(item_id: int, alias: str):
+    """Add an alias to an item, keeping aliases_json and item_aliases in sync"""
+    with transaction() as con:
+        cur = con.cursor()
+        cur.execute("SELECT aliases_json FROM items WHERE id=?", (item_id,))
+        row = cur.fetchone()
+        if row is None:
+            raise ValueError(f"Item {item_id} does not exist")
+        aliases = json.loads(row[0] or '[]')
+        if alias not in aliases:
+            aliases.append(alias)
+            cur.execute("UPDATE items SET aliases_json=? WHERE id=?",
+                        (json.dumps(aliases), item_id))
+        _index_aliases(cur, item_id, [alias])
+        cur.execute("SELECT language_code, type FROM items WHERE id=?", (item_id,))
+        _forget_suggestion_index(*cur.fetchone())
+
+
+def merge_items(source_id: int, target_id: int):
+    """
+    Fold source item into target: sessions move over, the source name and
+    aliases become target aliases, and the source is deactivated.
+    """
+    if source_id == target_id:
+        return
+    with transaction() as con:
+        cur = con.cursor()
+        cur.execute("""
+            SELECT id, canonical_name, aliases_json, language_code, type
+            FROM items WHERE id IN (?, ?)
+        """, (source_id, target_id))
+        found = {row[0]: row for row in cur.fetchall()}
+        if source_id not in found or target_id not in found:
+            raise ValueError(f"Cannot merge item {source_id} into {target_id}: item not found")
+
+        _, source_name, source_aliases = found[source_id][:3]
+        target_aliases = json.loads(found[target_id][2] or '[]')
+        for alias in [source_name, *json.loads(source_aliases or '[]')]:
+            if alias not in target_aliases:
+                target_aliases.append(alias)
+
+        cur.execute("UPDATE items SET aliases_json=? WHERE id=?",
+                    (json.dumps(target_aliases), target_id))
+        cur.execute("UPDATE items SET is_active=0 WHERE id=?", (source_id,))
+        # Moved sessions hash differently (the item is part of the content)
+        for schema in get_manager().history_schemas():
+            moved = cur.execute(f"""
+                SELECT id, date, hours_spent, notes, tags FROM {schema}.sessions WHERE item_id=?
+            """, (source_id,)).fetchall()
+            cur.executemany(f"UPDATE {schema}.sessions SET item_id=?, content_hash=? WHERE id=?",
+                            [(target_id, session_content_hash(target_id, *row[1:]), row[0])
+                             for row in moved])
+            if schema == ARCHIVE_SCHEMA:
+                _log_changes(cur, 'session', [row[0] for row in moved], 'update')
+        cur.execute("""
+            UPDATE OR IGNORE item_aliases SET item_id=? WHERE item_id=?
+        """, (target_id, source_id))
+        cur.execute("DELETE FROM item_aliases WHERE item_id=?", (source_id,))
+        _index_aliases(cur, target_id, target_aliases)
+
+        update_item_summaries(source_id)
+        update_item_summaries(target_id)
+
+    for item_id in (source_id, target_id):
+        _forget_suggestion_index(*found[item_id][3:])
+
+
+def _log_changes(cur: sqlite3.Cursor, entity: str, ids: Iterable[int], op: str):
+    """
+    Record writes to archived rows in change_log, which only has triggers
+    on the hot tables, so change_log readers (app.change_feed, the session
+    cache) see them too.
+    """
+    logged = cur.execute(
+        "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'change_log'").fetchone()
+    if logged:
+        cur.executemany("INSERT INTO change_log (entity, entity_id, op) VALUES (?, ?, ?)",
+                        [(entity, entity_id, op) for entity_id in ids])
+
+
+def _calculate_points(config: Dict, hours: float, difficulty: str, status: str) -> float:
+    """Points = hours x difficulty weight x status multiplier"""
     diff_weights = config.get('difficulty_weights', {'Beginner': 1.0})
     status_multipliers = config.get('status_multipliers', {'In Progress': 1.0})
-    
-    # Calculate points
+    return hours * diff_weights.get(difficulty, 1.0) * status_multipliers.get(status, 1.0)
+
+# Separators between tags in the sessions.tags string
+_TAG_SPLIT_RE = re.compile(r"[,;]")
+
+
+def parse_tags(text: Optional[str]) -> List[str]:
+    """Distinct tags of a comma-separated tags string, first spelling wins"""
+    tags, seen = [], set()
+    for part in _TAG_SPLIT_RE.split(text or ''):
+        tag = " ".join(part.split())
+        if tag and tag.lower() not in seen:
+            seen.add(tag.lower())
+            tags.append(tag)
+    return tags
+
+
+def session_content_hash(item_id: int, date: str, hours: float,
+                         notes: Optional[str], tags: Optional[str]) -> bytes:
+    """
+    Digest of what makes two sessions the same: item, day, hours, and the
+    notes and tags with case and spacing normalized (tags in any order).
+    Stored in sessions.content_hash, where an index makes a duplicate check
+    one lookup.
+    """
+    key = "\x1f".join((
+        str(item_id),
+        str(date)[:10],
+        f"{float(hours or 0):.4f}",
+        " ".join(str(notes or '').split()).casefold(),
+        ",".join(sorted(tag.casefold() for tag in parse_tags(tags))),
+    ))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=CONTENT_HASH_BYTES).digest()
+
+
+def _store_content_hashes(cur: sqlite3.Cursor, rows: Iterable[Tuple], schema: str = 'main'):
+    """
+    Set content_hash for (id, item_id, date, hours_spent, notes, tags) rows.
+    The hash is derived from the row, so the change log does not record
+    filling it in as an edit.
+    """
+    held = ['trg_sessions_change_log_update'] if schema == 'main' else []
+    _hold_triggers(cur, held)
+    cur.executemany(f"UPDATE {schema}.sessions SET content_hash=? WHERE id=?",
+                    [(session_content_hash(*row[1:]), row[0]) for row in rows])
+    _release_triggers(cur, held)
+
+
+def _sync_session_tags(cur: sqlite3.Cursor, sessions: Iterable[Tuple[int, Optional[str]]],
+                       replace: bool = True, tag_ids: Optional[Dict[str, int]] = None):
+    """
+    Point session_tags at the tags parsed from each (session_id, tags string).
+    The tags string stays the source of truth; this keeps the normalized copy
+    in step with it. Tag names match case-insensitively (COLLATE NOCASE).
+    tag_ids caches tag spelling -> id across calls in one transaction.
+    """
+    tag_ids = {} if tag_ids is None else tag_ids
+    ids, pairs = [], []
+    parsed: Dict[Optional[str], List[str]] = {}
+    for session_id, text in sessions:
+        ids.append((session_id,))
+        tags = parsed.get(text)
+        if tags is None:
+            tags = parsed[text] = parse_tags(text)
+        pairs.extend((session_id, tag) for tag in tags)
+    if replace:
+        cur.executemany("DELETE FROM session_tags WHERE session_id=?", ids)
+    new = [tag for tag in dict.fromkeys(tag for _, tag in pairs) if tag not in tag_ids]
+    if new:
+        cur.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", [(tag,) for tag in new])
+        for tag in new:
+            tag_ids[tag] = cur.execute("SELECT id FROM tags WHERE name = ?", (tag,)).fetchone()[0]
+    _insert_values(cur, "INSERT OR IGNORE INTO session_tags (session_id, tag_id)", 2,
+                   [(session_id, tag_ids[tag]) for session_id, tag in pairs])
+
+
+def insert_or_update_session(session_data: Dict, check_duplicate: bool = False) -> int:
+    """
+    Insert or update a session; updating a session that no longer exists
+    raises ValueError. With check_duplicate, a new session with the same
+    content as one already logged (hot or archived) is not written and
+    DuplicateSessionError names the logged one, for the caller to ask
+    before saving it anyway.
+    """
+    # One transaction covers the write and the summary refresh
+    with transaction() as con:
+        session_id, old, new = _write_session(con.cursor(), get_config(), session_data,
+                                              check_duplicate)
+        if session_id is None:
+            raise ValueError(f"Session {session_data['id']} no longer exists")
+        apply_session_change(old, new)
+    return session_id
+
+
+def update_sessions(rows: Iterable[Dict]) -> List[int]:
+    """
+    Insert or update several sessions in one transaction.
+
+    Each row is written as by insert_or_update_session, but item summaries
+    are recomputed once per touched item at the end rather than per row.
+    Returns the session ids in row order, None for an update of a session
+    deleted in the meantime (which is skipped).
+    """
+    with transaction(immediate=True) as con:
+        cur = con.cursor()
+        config = get_config()
+        session_ids, touched = [], set()
+        for session_data in rows:
+            session_id, old, new = _write_session(cur, config, session_data)
+            session_ids.append(session_id)
+            if old:
+                touched.add(old[0])
+            if new:
+                touched.add(new[0])
+        for item_id in touched:
+            update_item_summaries(item_id)
+    return session_ids
+
+
+def _write_session(cur: sqlite3.Cursor, config: Dict, session_data: Dict,
+                   check_duplicate: bool = False
+                   ) -> Tuple[int, Optional[Tuple], Optional[Tuple[int, str, float]]]:
+    """
+    Write one session row with its points, progress, tags and project fields.
+    Item summaries are left to the caller; returns (session_id, old, new)
+    in the form apply_session_change takes, or (None, None, None) without
+    writing anything when session_data['id'] names a deleted session.
+    check_duplicate is as for insert_or_update_session.
+    """
     hours = float(session_data.get('hours_spent', 0))
+    notes = session_data.get('notes', '')
+    tags = session_data.get('tags', '')
+    content_hash = session_content_hash(session_data['item_id'], session_data['date'], hours,
+                                        notes, tags)
+    if check_duplicate and not session_data.get('id'):
+        # A repeated save (double click, re-run script) of a logged session
+        cur.execute("SELECT id FROM all_sessions WHERE content_hash=? LIMIT 1", (content_hash,))
+        duplicate = cur.fetchone()
+        if duplicate:
+            raise DuplicateSessionError(duplicate[0])
+
+    # Calculate points
     difficulty = session_data.get('difficulty', 'Beginner')
     status = session_data.get('status', 'In Progress')
-    
-    points = hours * diff_weights.get(difficulty, 1.0) * status_multipliers.get(status, 1.0)
-    
+
+    points = _calculate_points(config, hours, difficulty, status)
+
     # Calculate progress
     item_id = session_data['item_id']
-    cur.execute("SELECT target_hours, total_hours FROM items WHERE id=?", (item_id,))
+    cur.execute("SELECT target_hours, total_hours, type, canonical_name FROM items WHERE id=?",
+                (item_id,))
     item_row = cur.fetchone()
-    
+
     target_hours = float(item_row[0]) if item_row and item_row[0] else 0
     current_total = float(item_row[1]) if item_row and item_row[1] else 0
-    
+
     # For updates, subtract the old hours first
+    old = None
     if session_data.get('id'):
-        cur.execute("SELECT hours_spent FROM sessions WHERE id=?", (session_data['id'],))
-        old_hours_row = cur.fetchone()
-        if old_hours_row:
-            current_total -= float(old_hours_row[0])
-    
+        cur.execute("SELECT item_id, date, hours_spent FROM sessions WHERE id=?",
+                    (session_data['id'],))
+        old = cur.fetchone()
+        if old is None:
+            return None, None, None
+        if old[0] == item_id:
+            current_total -= float(old[2])
+
     new_total = current_total + hours
     progress_pct = min(100.0, (new_total / target_hours) * 100.0) if target_hours > 0 else 0.0
-    
+
     # Prepare session data
-    cols = ['item_id', 'date', 'status', 'hours_spent', 'notes', 'tags', 
-            'difficulty', 'topic', 'points_awarded', 'progress_pct']
+    cols = [*SESSION_COLUMNS, 'content_hash']
     vals = [
         session_data['item_id'],
         session_data['date'],
         session_data.get('status', 'In Progress'),
         hours,
-        session_data.get('notes', ''),
-        session_data.get('tags', ''),
+        notes,
+        tags,
         session_data.get('difficulty', 'Beginner'),
         session_data.get('topic', ''),
         points,
-        progress_pct
+        progress_pct,
+        content_hash,
     ]
-    
+
     if session_data.get('id'):
         # Update existing session
         sets = ",".join([f"{c}=?" for c in cols])
@@ -462,18 +1502,21 @@ def insert_or_update_session(session_data: Dict) -> int:
         placeholders = ",".join(["?"] * len(cols))
         cur.execute(f"INSERT INTO sessions({','.join(cols)}) VALUES({placeholders})", vals)
         session_id = cur.lastrowid
-    
-    con.commit()
 
-    # Recompute and store project progress if a project name is provided
+    _sync_session_tags(cur, [(session_id, tags)])
+
+    # Recompute and store project progress; Project items log against their own project
     project_name = session_data.get("project_name")
+    if not project_name and item_row and item_row[2] == 'Project':
+        project_name = item_row[3]
     if project_name:
+        cur.execute("UPDATE sessions SET project_name=? WHERE id=?", (project_name, session_id))
         cur.execute("SELECT target_hours FROM projects WHERE name=?", (project_name,))
         tgt_row = cur.fetchone()
         target = float(tgt_row[0]) if tgt_row else 0.0
 
         cur.execute(
-            "SELECT IFNULL(SUM(hours_spent),0) FROM sessions WHERE project_name=?",
+            "SELECT IFNULL(SUM(hours_spent),0) FROM all_sessions WHERE project_name=?",
             (project_name,),
         )
         logged_row = cur.fetchone()
@@ -482,30 +1525,541 @@ def insert_or_update_session(session_data: Dict) -> int:
         progress = min(100.0, (logged / target) * 100.0) if target > 0 else 0.0
         cur.execute(
             "UPDATE sessions SET project_progress_pct=? WHERE id=?",
-            (progress, sid),
+            (progress, session_id),
         )
-        con.commit()
 
-    con.close()
-    
-    # Update item summaries
-    update_item_summaries(item_id)
-    
-    return session_id
+    return session_id, old, (item_id, session_data['date'], hours)
+
+def _resolve_items_bulk(cur: sqlite3.Cursor, chunk: List[Dict],
+                        known: Optional[Dict[Tuple, int]] = None) -> Tuple[List[int], int]:
+    """
+    Resolve the item for every row of a chunk with batched lookups.
+    Rows carry either item_id or language_code/type/canonical_name; unknown
+    items are created with language-pack defaults. known caches
+    (language_code, type, name as given) -> item_id across chunks of one
+    transaction, so repeated names are neither slugified nor looked up again.
+    Returns (item_ids aligned with chunk, number of items created).
+    """
+    known = {} if known is None else known
+    given: List[Optional[Tuple]] = []
+    keys: Dict[Tuple, Tuple[str, str, str]] = {}
+    names: Dict[Tuple[str, str, str], str] = {}
+    for row in chunk:
+        if row.get('item_id') is not None:
+            given.append(None)
+            continue
+        raw = (row.get('language_code'), row.get('type'), row.get('canonical_name'))
+        given.append(raw)
+        if raw in known or raw in keys:
+            continue
+        name = (raw[2] or '').strip()
+        if not (raw[0] and raw[1] and name):
+            raise ValueError(f"Row needs item_id or language_code/type/canonical_name: {row!r}")
+        key = (raw[0], raw[1], slugify(name))
+        keys[raw] = key
+        names.setdefault(key, name)
+
+    def lookup(wanted: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], int]:
+        found = {}
+        for start in range(0, len(wanted), ITEM_LOOKUP_BATCH):
+            batch = wanted[start:start + ITEM_LOOKUP_BATCH]
+            values = ",".join(["(?, ?, ?)"] * len(batch))
+            # Joined rather than IN (VALUES ...), which scans items instead of using its unique key
+            cur.execute(f"""
+                WITH wanted(language_code, type, slug) AS (VALUES {values})
+                SELECT i.language_code, i.type, i.slug, i.id
+                FROM wanted w
+                JOIN items i
+                  ON i.language_code = w.language_code AND i.type = w.type AND i.slug = w.slug
+                WHERE i.is_active=1
+            """, [part for key in batch for part in key])
+            found.update({(lang, typ, slug): item_id
+                          for lang, typ, slug, item_id in cur.fetchall()})
+        return found
+
+    resolved = lookup(list(names))
+    missing = [key for key in names if key not in resolved]
+    if missing:
+        now = datetime.utcnow().isoformat()
+        new_items = []
+        for language_code, item_type, slug in missing:
+            name = names[(language_code, item_type, slug)]
+            topic, difficulty, target = _infer_item_defaults(language_code, name)
+            new_items.append((language_code, item_type, name, slug, json.dumps([name, slug]),
+                              difficulty, topic, target, now))
+        _insert_values(cur, """
+            INSERT INTO items (
+                language_code, type, canonical_name, slug, aliases_json,
+                default_difficulty, default_topic, target_hours, created_at
+            )""", 9, new_items)
+        resolved.update(lookup(missing))
+        for language_code, item_type, slug in missing:
+            item_id = resolved[(language_code, item_type, slug)]
+            _index_aliases(cur, item_id, [names[(language_code, item_type, slug)], slug])
+            _forget_suggestion_index(language_code, item_type)
+
+    for raw, key in keys.items():
+        known[raw] = resolved[key]
+    item_ids = [row['item_id'] if raw is None else known[raw] for row, raw in zip(chunk, given)]
+    return item_ids, len(missing)
+
+
+def _insert_values(cur: sqlite3.Cursor, insert_sql: str, width: int, values: List[Tuple]):
+    """
+    Run insert_sql ("INSERT INTO t(cols)") for rows of width values,
+    BULK_ROWS_PER_STATEMENT rows per statement. FTS5 flushes its pending
+    index data at every statement boundary, so one statement per row
+    (plain executemany) writes a tiny FTS segment per session; batching the
+    rows makes bulk inserts into sessions about 4x faster.
+    """
+    row = "(" + ",".join("?" * width) + ")"
+    per = BULK_ROWS_PER_STATEMENT
+    full = len(values) - len(values) % per
+    if full:
+        cur.executemany(f"{insert_sql} VALUES {','.join([row] * per)}",
+                        (list(chain.from_iterable(values[start:start + per]))
+                         for start in range(0, full, per)))
+    if full < len(values):
+        rest = values[full:]
+        cur.execute(f"{insert_sql} VALUES {','.join([row] * len(rest))}",
+                    list(chain.from_iterable(rest)))
+
+
+# Per-row AFTER INSERT triggers on sessions, each with the statement doing
+# its work for all sessions with id > ? at once (for bulk_insert_sessions)
+_SESSION_INSERT_BACKFILLS = {
+    'trg_sessions_fts_insert': """
+        INSERT INTO sessions_fts(rowid, notes, tags, topic)
+        SELECT id, notes, tags, topic FROM sessions WHERE id > ?
+    """,
+    'trg_sessions_daily_stats_insert': """
+        INSERT INTO daily_stats (date, language_code, item_id, difficulty,
+                                 hours, points, session_count)
+        SELECT substr(s.date, 1, 10), COALESCE(i.language_code, ''), s.item_id,
+               COALESCE(s.difficulty, ''), SUM(s.hours_spent),
+               SUM(COALESCE(s.points_awarded, 0)), COUNT(*)
+        FROM sessions s LEFT JOIN items i ON i.id = s.item_id
+        WHERE s.id > ?
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT(date, language_code, item_id, difficulty) DO UPDATE SET
+            hours = hours + excluded.hours,
+            points = points + excluded.points,
+            session_count = session_count + excluded.session_count
+    """,
+    'trg_sessions_change_log_insert': """
+        INSERT INTO change_log (entity, entity_id, op)
+        SELECT 'session', id, 'insert' FROM sessions WHERE id > ? ORDER BY id
+    """,
+}
+
+
+def _logged_hashes(cur: sqlite3.Cursor, hashes: List[bytes], last_id: int) -> Counter:
+    """How many sessions, hot or archived, with id <= last_id have each of hashes"""
+    found = Counter()
+    unique = list(set(hashes))
+    for start in range(0, len(unique), HASH_LOOKUP_BATCH):
+        batch = unique[start:start + HASH_LOOKUP_BATCH]
+        found.update(dict(cur.execute(f"""
+            SELECT content_hash, COUNT(*) FROM all_sessions
+            WHERE content_hash IN ({','.join('?' * len(batch))}) AND id <= ?
+            GROUP BY content_hash
+        """, [*batch, last_id])))
+    return found
+
+
+@contextmanager
+def _page_cache(con: sqlite3.Connection, kib: int):
+    """Grow con's page cache to at least kib KiB for the duration of the block"""
+    cache_size = con.execute("PRAGMA cache_size").fetchone()[0]
+    page_size = con.execute("PRAGMA page_size").fetchone()[0]
+    current = -cache_size if cache_size < 0 else cache_size * page_size // 1024
+    if current >= kib:
+        yield
+        return
+    con.execute(f"PRAGMA cache_size=-{kib}")
+    try:
+        yield
+    finally:
+        con.execute(f"PRAGMA cache_size={cache_size}")
+
+
+def bulk_insert_sessions(rows: Iterable[Dict], chunk_size: int = BULK_CHUNK_SIZE,
+                         progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Insert many sessions in a single transaction.
+
+    Rows are streamed in chunks of chunk_size and written with multi-row
+    INSERTs. Each row needs date and hours_spent plus either item_id or
+    language_code/type/canonical_name. Rows repeating a session logged
+    before the call are skipped, found with batched content_hash index
+    lookups, and counted as duplicates; a session logged n times covers
+    its first n repeats, so repeated rows within rows are all kept the
+    first time and all skipped when the same rows come again. Summaries are
+    recomputed once per touched item at the end instead of after every row
+    (in one set-based pass when that is cheaper). The connection's page cache is raised to
+    BULK_CACHE_KIB while it runs.
+    Returns counts, elapsed seconds and rows per second.
+    """
+    started = time.perf_counter()
+    rows = iter(rows)
+    # item_id -> [target_hours, running total] for progress_pct
+    item_totals: Dict[int, List[float]] = {}
+    # item_id -> project name; sessions of Project items belong to the project of the same name
+    item_projects: Dict[int, Optional[str]] = {}
+    inserted = 0
+    duplicates = 0
+    items_created = 0
+
+    columns = (*SESSION_COLUMNS, 'project_name', 'content_hash')
+    insert_sql = f"INSERT INTO sessions({','.join(columns)})"
+    known_items: Dict[Tuple, int] = {}
+
+    with _page_cache(connect(), BULK_CACHE_KIB), transaction(immediate=True) as con:
+        cur = con.cursor()
+        config = get_config()
+        # AUTOINCREMENT: every session, hot or archived, has an id <= seq,
+        # and new ones are above it
+        first_new_id = cur.execute(
+            "SELECT IFNULL((SELECT seq FROM sqlite_sequence WHERE name='sessions'), 0)"
+        ).fetchone()[0]
+        repeats = Counter()
+
+        # Per-row insert triggers give way to one set-based pass over the new rows
+        names = list(_SESSION_INSERT_BACKFILLS)
+        held = [name for (name,) in cur.execute(f"""
+            SELECT name FROM sqlite_master
+            WHERE type='trigger' AND tbl_name='sessions' AND name IN ({','.join('?' * len(names))})
+        """, names)]
+        _hold_triggers(cur, held)
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            item_ids, created = _resolve_items_bulk(cur, chunk, known_items)
+            items_created += created
+
+            hashes = []
+            for row, item_id in zip(chunk, item_ids):
+                if not row.get('date'):
+                    raise ValueError(f"Row is missing a date: {row!r}")
+                hashes.append(session_content_hash(item_id, row['date'], row.get('hours_spent', 0),
+                                                   row.get('notes', ''), row.get('tags', '')))
+            # Only sessions from before this call count; rows inserted by
+            # earlier chunks are not repeats
+            logged = _logged_hashes(cur, hashes, first_new_id)
+            fresh = []
+            for row, item_id, content_hash in zip(chunk, item_ids, hashes):
+                if repeats[content_hash] < logged[content_hash]:
+                    repeats[content_hash] += 1
+                    duplicates += 1
+                else:
+                    fresh.append((row, item_id, content_hash))
+            item_ids = [item_id for _, item_id, _ in fresh]
+
+            unseen = [item_id for item_id in set(item_ids) if item_id not in item_totals]
+            for start in range(0, len(unseen), ITEM_LOOKUP_BATCH):
+                batch = unseen[start:start + ITEM_LOOKUP_BATCH]
+                for item_id, target, total, item_type, name in cur.execute(f"""
+                    SELECT id, target_hours, total_hours, type, canonical_name FROM items
+                    WHERE id IN ({','.join('?' * len(batch))})
+                """, batch).fetchall():
+                    item_totals[item_id] = [float(target or 0), float(total or 0)]
+                    item_projects[item_id] = name if item_type == 'Project' else None
+            for item_id in unseen:
+                item_totals.setdefault(item_id, [0.0, 0.0])
+
+            values = []
+            for row, item_id, content_hash in fresh:
+                hours = float(row.get('hours_spent', 0))
+                difficulty = row.get('difficulty') or 'Beginner'
+                status = row.get('status') or 'In Progress'
+
+                totals = item_totals[item_id]
+                totals[1] += hours
+                progress_pct = min(100.0, totals[1] / totals[0] * 100.0) if totals[0] > 0 else 0.0
+
+                values.append((
+                    item_id, row['date'], status, hours,
+                    row.get('notes', ''), row.get('tags', ''), difficulty, row.get('topic', ''),
+                    _calculate_points(config, hours, difficulty, status), progress_pct,
+                    item_projects.get(item_id), content_hash,
+                ))
+
+            _insert_values(cur, insert_sql, len(columns), values)
+            inserted += len(values)
+            if progress:
+                progress(inserted)
+
+        for name in held:
+            cur.execute(_SESSION_INSERT_BACKFILLS[name], (first_new_id,))
+        _release_triggers(cur, held)
+
+        # Normalized tags for the new rows, read back a chunk at a time
+        tagged = con.execute("SELECT id, tags FROM sessions WHERE id > ? AND tags <> ''",
+                             (first_new_id,))
+        tag_ids: Dict[str, int] = {}
+        while True:
+            chunk = tagged.fetchmany(chunk_size)
+            if not chunk:
+                break
+            _sync_session_tags(cur, chunk, replace=False, tag_ids=tag_ids)
+
+        # Deferred summaries: one recompute per touched item, or a single
+        # set-based pass when that is cheaper (the touched items hold at
+        # least the inserted sessions)
+        total = cur.execute("SELECT COUNT(*) FROM all_sessions").fetchone()[0]
+        if len(item_totals) * SUMMARY_REBUILD_SESSIONS_PER_ITEM + inserted > total:
+            recompute_all_summaries()
+        else:
+            for item_id in item_totals:
+                update_item_summaries(item_id)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'inserted': inserted,
+        'duplicates': duplicates,
+        'items_created': items_created,
+        'items_touched': len(item_totals),
+        'seconds': elapsed,
+        'rows_per_second': inserted / elapsed if elapsed > 0 else 0.0,
+    }
+
+def archive_sessions(older_than_days: Optional[int] = None, batch_size: int = ARCHIVE_BATCH_SIZE,
+                     progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Move sessions dated before the archive horizon (older_than_days, default
+    the 'archive_after_days' config value or ARCHIVE_AFTER_DAYS) out of the
+    database into the archive database, batch_size sessions at a time.
+
+    Archived sessions stay part of the history: item summaries, project
+    progress, daily stats, tag reports and exports read them through the
+    attached archive. The session list, search and edits cover the hot
+    sessions only. progress(moved) is called after every batch. Returns
+    the sessions moved, batches, the horizon date and elapsed seconds.
+    """
+    started = time.perf_counter()
+    if older_than_days is None:
+        older_than_days = int(get_config().get('archive_after_days', ARCHIVE_AFTER_DAYS))
+    horizon = (datetime.now().date() - timedelta(days=older_than_days)).isoformat()
+    get_manager().create_archive()
+    # Until _reconcile_archive clears it, all_sessions checks archived rows against the hot ones
+    with transaction(immediate=True) as con:
+        con.execute("INSERT OR REPLACE INTO config (key, value_json) VALUES ('archive_pending', ?)",
+                    (json.dumps(horizon),))
+    names = [row[1] for row in connect().execute("PRAGMA main.table_info(sessions)")]
+    columns = ', '.join(names)
+    unchanged = ' AND '.join(f"a.{name} IS main.sessions.{name}" for name in names)
+
+    moved = batches = 0
+    while True:
+        # Oldest batch_size sessions before the horizon, bounded by (date, id)
+        bound = connect().execute("""
+            SELECT date, id FROM main.sessions WHERE date < ?
+            ORDER BY date, id LIMIT 1 OFFSET ?
+        """, (horizon, batch_size - 1)).fetchone()
+        where, params = "date < ?", [horizon]
+        if bound:
+            where += " AND (date, id) <= (?, ?)"
+            params.extend(bound)
+
+        # With WAL, a transaction spanning both files is not atomic and main
+        # commits first, so copy and delete commit separately: a crash in
+        # between leaves copies that the next run replaces, never lost sessions
+        with transaction(immediate=True) as con:
+            cur = con.cursor()
+            batch = f"SELECT id FROM main.sessions WHERE {where}"
+            cur.execute(f"""
+                INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.sessions ({columns})
+                SELECT {columns} FROM main.sessions WHERE {where}
+            """, params)
+            cur.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.session_tags WHERE session_id IN ({batch})",
+                        params)
+            cur.execute(f"""
+                INSERT INTO {ARCHIVE_SCHEMA}.session_tags (session_id, tag_id)
+                SELECT session_id, tag_id FROM main.session_tags WHERE session_id IN ({batch})
+            """, params)
+        with transaction(immediate=True) as con:
+            cur = con.cursor()
+            # daily_stats keeps the archived days; the other delete triggers
+            # drop the hot copies' tags and search entries and log the deletes
+            _hold_triggers(cur, ['trg_sessions_daily_stats_delete'])
+            # A session edited since the copy stays hot until the next run
+            cur.execute(f"""
+                DELETE FROM main.sessions WHERE {where} AND EXISTS (
+                    SELECT 1 FROM {ARCHIVE_SCHEMA}.sessions a
+                    WHERE a.id = main.sessions.id AND {unchanged})
+            """, params)
+            count = cur.rowcount
+            _release_triggers(cur, ['trg_sessions_daily_stats_delete'])
+
+        if count:
+            moved += count
+            batches += 1
+            if progress:
+                progress(moved)
+        if bound is None or not count:
+            break
+
+    _reconcile_archive()
+    return {
+        'archived': moved,
+        'batches': batches,
+        'horizon': horizon,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def _reconcile_archive():
+    """
+    Drop archived copies of sessions that are still hot (the hot row wins:
+    left by an interrupted archive_sessions, or edited after the copy),
+    then clear the 'archive_pending' marker once none are left.
+    """
+    con = connect()
+    if not con.execute("SELECT 1 FROM config WHERE key = 'archive_pending'").fetchone():
+        return
+    # Each transaction writes one database, so each commits atomically
+    with transaction(immediate=True) as con:
+        con.execute(
+            f"DELETE FROM {ARCHIVE_SCHEMA}.sessions WHERE id IN (SELECT id FROM main.sessions)")
+        con.execute(f"""
+            DELETE FROM {ARCHIVE_SCHEMA}.session_tags
+            WHERE session_id IN (SELECT id FROM main.sessions)
+        """)
+    with transaction(immediate=True) as con:
+        stale = con.execute(f"""
+            SELECT 1 FROM main.sessions m
+            WHERE EXISTS (SELECT 1 FROM {ARCHIVE_SCHEMA}.sessions a WHERE a.id = m.id)
+            LIMIT 1
+        """).fetchone()
+        if not stale:
+            con.execute("DELETE FROM config WHERE key = 'archive_pending'")
+
+
+def dedupe_sessions(batch_size: int = DEDUPE_BATCH_SIZE,
+                    progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Remove sessions that repeat an earlier one: the same content_hash (see
+    session_content_hash) as a session with a lower id, hot or archived.
+
+    Sessions without a hash (written before the column existed, or by other
+    tools) are hashed first. Both steps cover at most batch_size sessions
+    per transaction, so the pass can run in the background next to other
+    writers; each batch also takes the removed sessions out of the item
+    summaries and daily stats. progress(removed) is called after every
+    batch. Returns the sessions hashed and removed, batches and elapsed
+    seconds.
+    """
+    started = time.perf_counter()
+    schemas = get_manager().history_schemas()
+
+    hashed = 0
+    for schema in schemas:
+        while True:
+            with transaction(immediate=True) as con:
+                rows = con.execute(f"""
+                    SELECT id, item_id, date, hours_spent, notes, tags FROM {schema}.sessions
+                    WHERE content_hash IS NULL LIMIT ?
+                """, (batch_size,)).fetchall()
+                _store_content_hashes(con.cursor(), rows, schema)
+            hashed += len(rows)
+            if len(rows) < batch_size:
+                break
+
+    # A copy with a lower id in either database makes a session the duplicate
+    earlier = " OR ".join(
+        f"EXISTS (SELECT 1 FROM {schema}.sessions o "
+        f"WHERE o.content_hash = d.content_hash AND o.id < d.id)"
+        for schema in schemas)
+    removed = batches = 0
+    for schema in schemas:
+        after = 0
+        while True:
+            with transaction(immediate=True) as con:
+                cur = con.cursor()
+                # Next batch_size ids, so every transaction stays short
+                # however rare duplicates are
+                last = cur.execute(f"""
+                    SELECT MAX(id) FROM (
+                        SELECT id FROM {schema}.sessions WHERE id > ? ORDER BY id LIMIT ?)
+                """, (after, batch_size)).fetchone()[0]
+                if last is None:
+                    break
+                rows = cur.execute(f"""
+                    SELECT d.id, d.item_id, d.date, d.hours_spent FROM {schema}.sessions d
+                    WHERE d.id > ? AND d.id <= ? AND d.content_hash IS NOT NULL AND ({earlier})
+                """, (after, last)).fetchall()
+                if rows:
+                    _delete_duplicates(cur, schema, rows)
+            after = last
+            removed += len(rows)
+            batches += 1
+            if progress:
+                progress(removed)
+
+    return {
+        'hashed': hashed,
+        'removed': removed,
+        'batches': batches,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def _delete_duplicates(cur: sqlite3.Cursor, schema: str, rows: List[Tuple]):
+    """
+    Delete (id, item_id, date, hours_spent) sessions from schema and take
+    them out of the summaries
+    """
+    ids = [row[0] for row in rows]
+    marks = ','.join('?' * len(ids))
+    if schema == 'main':
+        # The delete triggers drop the tags, search entries and daily stats and log the deletes
+        cur.execute(f"DELETE FROM main.sessions WHERE id IN ({marks})", ids)
+    else:
+        # Archived days still count in daily_stats: take the rows out per stats key
+        gone = cur.execute(f"""
+            SELECT SUM(s.hours_spent), SUM(COALESCE(s.points_awarded, 0)), COUNT(*),
+                   substr(s.date, 1, 10), COALESCE(i.language_code, ''), s.item_id,
+                   COALESCE(s.difficulty, '')
+            FROM {schema}.sessions s LEFT JOIN items i ON i.id = s.item_id
+            WHERE s.id IN ({marks})
+            GROUP BY 4, 5, 6, 7
+        """, ids).fetchall()
+        cur.executemany("""
+            UPDATE daily_stats
+            SET hours = hours - ?, points = points - ?, session_count = session_count - ?
+            WHERE date = ? AND language_code = ? AND item_id = ? AND difficulty = ?
+        """, gone)
+        cur.executemany("""
+            DELETE FROM daily_stats
+            WHERE date = ? AND language_code = ? AND item_id = ? AND difficulty = ?
+              AND session_count <= 0
+        """, [key[3:] for key in gone])
+        cur.execute(f"DELETE FROM {schema}.sessions WHERE id IN ({marks})", ids)
+        cur.execute(f"DELETE FROM {schema}.session_tags WHERE session_id IN ({marks})", ids)
+        # change_log has no triggers on the archive
+        _log_changes(cur, 'session', ids, 'delete')
+
+    rebuild: Dict[int, bool] = {}
+    for _, item_id, date, hours in rows:
+        dropped_day = _remove_session_from_summary(cur, item_id, date, float(hours))
+        rebuild[item_id] = rebuild.get(item_id, False) or dropped_day
+    for item_id, rebuild_streaks in rebuild.items():
+        _refresh_item_summary(cur, item_id, rebuild_streaks)
+
 
 def get_languages() -> List[Tuple[str, str, str]]:
     """Get all active languages"""
-    con = connect()
-    cur = con.cursor()
+    cur = connect().cursor()
     cur.execute("SELECT code, name, color_hex FROM languages WHERE is_active=1 ORDER BY name")
     result = cur.fetchall()
-    con.close()
     return result
 
 def search_items(language_code: str, item_type: str = None, query: str = None, limit: int = 50) -> List[Dict]:
     """Search items with optional filters"""
-    con = connect()
-    cur = con.cursor()
+    cur = connect().cursor()
     
     sql = """
         SELECT id, canonical_name, type, target_hours, total_hours, 
@@ -519,17 +2073,16 @@ def search_items(language_code: str, item_type: str = None, query: str = None, l
         sql += " AND type=?"
         params.append(item_type)
     
-    if query:
-        sql += " AND (canonical_name LIKE ? OR slug LIKE ?)"
-        query_pattern = f"%{query}%"
-        params.extend([query_pattern, query_pattern])
+    match = fts_match_query(query)
+    if match:
+        sql += " AND id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)"
+        params.append(match)
     
     sql += " ORDER BY last_logged_at DESC, canonical_name LIMIT ?"
     params.append(limit)
     
     cur.execute(sql, params)
     rows = cur.fetchall()
-    con.close()
     
     return [
         {
@@ -541,29 +2094,442 @@ def search_items(language_code: str, item_type: str = None, query: str = None, l
         for row in rows
     ]
 
-def list_sessions(limit: int = 200) -> List[Tuple]:
+_FTS_TERM_RE = re.compile(r"\w+")
+
+# Tokens of context around each hit in search snippets
+SEARCH_SNIPPET_TOKENS = 10
+
+# filter -> (condition on items or None, condition on sessions)
+_SEARCH_FILTERS = {
+    'language_code': ("i.language_code = ?", "i.language_code = ?"),
+    'item_type': ("i.type = ?", "i.type = ?"),
+    'status': (None, "s.status = ?"),
+    'date_from': (None, "s.date >= ?"),
+    'date_to': (None, "s.date <= ?"),
+}
+
+
+def fts_match_query(text: Optional[str]) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression: every word must match,
+    each as a prefix. None when the text has no searchable words.
+    """
+    terms = _FTS_TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(query: str, filters: Optional[Dict] = None, limit: int = 50) -> List[Dict]:
+    """
+    Ranked full-text search over item names/aliases and session notes, tags
+    and topics. Words match as prefixes ("deco" finds "decorators").
+
+    filters: language_code, item_type, status, date_from, date_to. Session-only
+    filters (status, dates) leave items out of the results.
+
+    Returns [{'kind', 'id', 'item_id', 'name', 'date', 'snippet', 'score'}],
+    best match first; kind is 'item' or 'session' and score is bm25 (lower is better).
+    """
+    match = fts_match_query(query)
+    if not match:
+        return []
+
+    filters = {k: v for k, v in (filters or {}).items() if v not in (None, '')}
+    unknown = set(filters) - set(_SEARCH_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown search filters: {', '.join(sorted(unknown))}")
+
+    item_where, item_params = [], []
+    session_where, session_params = [], []
+    for key, value in filters.items():
+        item_cond, session_cond = _SEARCH_FILTERS[key]
+        if item_cond:
+            item_where.append(item_cond)
+            item_params.append(value)
+        session_where.append(session_cond)
+        session_params.append(value)
+    include_items = len(item_where) == len(filters)
+
+    cur = connect().cursor()
+    results = []
+
+    if include_items:
+        cur.execute(f"""
+            SELECT 'item', i.id, i.id, i.canonical_name, i.last_logged_at,
+                   snippet(items_fts, -1, '[', ']', '…', {SEARCH_SNIPPET_TOKENS}),
+                   bm25(items_fts, 2.0, 1.0) AS score
+            FROM items_fts JOIN items i ON i.id = items_fts.rowid
+            WHERE items_fts MATCH ? AND i.is_active = 1
+            {''.join(' AND ' + cond for cond in item_where)}
+            ORDER BY score LIMIT ?
+        """, [match, *item_params, limit])
+        results.extend(cur.fetchall())
+
+    cur.execute(f"""
+        SELECT 'session', s.id, s.item_id, i.canonical_name, s.date,
+               snippet(sessions_fts, -1, '[', ']', '…', {SEARCH_SNIPPET_TOKENS}),
+               bm25(sessions_fts, 1.0, 1.5, 1.0) AS score
+        FROM sessions_fts
+        JOIN sessions s ON s.id = sessions_fts.rowid
+        LEFT JOIN items i ON i.id = s.item_id
+        WHERE sessions_fts MATCH ?
+        {''.join(' AND ' + cond for cond in session_where)}
+        ORDER BY score LIMIT ?
+    """, [match, *session_params, limit])
+    results.extend(cur.fetchall())
+
+    results.sort(key=lambda row: row[6])
+    return [
+        {
+            'kind': row[0], 'id': row[1], 'item_id': row[2], 'name': row[3],
+            'date': row[4], 'snippet': row[5], 'score': row[6]
+        }
+        for row in results[:limit]
+    ]
+
+# Rows per page when iterating sessions
+SESSION_PAGE_SIZE = 500
+
+# Keys of the list_sessions row layout (SessionRecord fields), position by position
+SESSION_LIST_FIELDS = SESSION_RECORD_FIELDS
+
+_SESSION_LIST_SQL = """
+    SELECT s.id, s.date, i.language_code, i.type, i.canonical_name, 
+           s.status, s.hours_spent, s.notes, s.tags, s.difficulty, 
+           s.topic, s.points_awarded, s.progress_pct, s.item_id, i.target_hours
+    FROM sessions s
+    JOIN items i ON s.item_id = i.id
+"""
+
+
+def encode_cursor(date: str, session_id: int) -> str:
+    """Opaque continuation token for the position after (date, id)"""
+    raw = json.dumps([date, session_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor; raises ValueError on a malformed token"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, session_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(date), int(session_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid session cursor: {cursor!r}") from e
+
+
+def list_sessions_page(limit: int = 200, cursor: Optional[str] = None,
+                       language_code: Optional[str] = None, item_type: Optional[str] = None,
+                       status: Optional[str] = None, date_from: Optional[str] = None,
+                       date_to: Optional[str] = None) -> Tuple[List[SessionRecord], Optional[str]]:
+    """
+    One page of sessions, newest first, with optional filters.
+
+    Pages are addressed by keyset on (date, id) rather than OFFSET, so
+    every page costs the same however deep it is. Returns (records, next_cursor);
+    next_cursor is None on the last page.
+    """
+    where, params = _session_filters(language_code, item_type, status, date_from, date_to)
+    return _session_page(where, params, limit, cursor)
+
+
+def _session_page(where: List[str], params: List, limit: int,
+                  cursor: Optional[str]) -> Tuple[List[SessionRecord], Optional[str]]:
+    """Keyset page of _SESSION_LIST_SQL records matching where, after cursor"""
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        where.append("(s.date, s.id) < (?, ?)")
+        params.extend([after_date, after_id])
+
+    sql = _SESSION_LIST_SQL
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY s.date DESC, s.id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    rows = fetch_records(connect().cursor(), sql, params)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].date, rows[-1].id)
+
+
+def _session_filters(language_code: Optional[str] = None, item_type: Optional[str] = None,
+                     status: Optional[str] = None, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> Tuple[List[str], List]:
+    """WHERE conditions and parameters for the session list filters (sessions s JOIN items i)"""
+    where, params = [], []
+    if language_code:
+        where.append("i.language_code = ?")
+        params.append(language_code)
+    if item_type:
+        where.append("i.type = ?")
+        params.append(item_type)
+    if status:
+        where.append("s.status = ?")
+        params.append(status)
+    if date_from:
+        where.append("s.date >= ?")
+        params.append(date_from)
+    if date_to:
+        # Inclusive of the whole day even if dates carry a time part
+        where.append("s.date < date(?, '+1 day')")
+        params.append(date_to)
+    return where, params
+
+
+def iter_sessions(page_size: int = SESSION_PAGE_SIZE, **filters) -> Iterator[SessionRecord]:
+    """Yield every session matching the list_sessions_page filters, one page in memory at a time"""
+    cursor = None
+    while True:
+        rows, cursor = list_sessions_page(page_size, cursor, **filters)
+        yield from rows
+        if cursor is None:
+            return
+
+
+# Rows fetched per step when streaming sessions out for export
+EXPORT_CHUNK_SIZE = 5000
+
+# Session fields by key (the TableConfig.KEYS names) as selected from sessions s JOIN items i
+SESSION_FIELD_SQL = {
+    'id': 's.id',
+    'date': 's.date',
+    'type': 'i.type',
+    'canonical_name': 'i.canonical_name',
+    'notes': 's.notes',
+    'status': 's.status',
+    'hours_spent': 's.hours_spent',
+    'tags': 's.tags',
+    'language_code': 'i.language_code',
+    'difficulty': 's.difficulty',
+    'topic': 's.topic',
+    'points_awarded': 's.points_awarded',
+    'progress_pct': 's.progress_pct',
+    'target_hours': 'i.target_hours',
+    'item_id': 's.item_id',
+}
+
+
+def count_sessions(**filters) -> int:
+    """Number of sessions, archived ones included, matching the list_sessions_page filters"""
+    where, params = _session_filters(**filters)
+    arm = "SELECT COUNT(*) AS n FROM {sessions} s JOIN items i ON s.item_id = i.id"
+    if where:
+        arm += " WHERE " + " AND ".join(where)
+    sql, params = _history_union(arm, params)
+    return connect().execute(f"SELECT SUM(n) FROM ({sql})", params).fetchone()[0]
+
+
+def iter_session_chunks(columns: Iterable[str], chunk_size: int = EXPORT_CHUNK_SIZE,
+                        **filters) -> Iterator[List[Tuple]]:
+    """
+    Stream sessions newest first, archived ones included, as lists of up to
+    chunk_size tuples holding the requested SESSION_FIELD_SQL columns, in order.
+
+    One statement is stepped with fetchmany, so the whole walk reads a single
+    snapshot and only one chunk is in memory at a time. Stop iterating (or
+    close the generator) to abandon the walk early.
+    """
+    columns = list(columns)
+    unknown = [c for c in columns if c not in SESSION_FIELD_SQL]
+    if unknown:
+        raise ValueError(f"Unknown session columns: {', '.join(unknown)}")
+    # A compound ORDER BY names result columns; date and id ride along if not requested
+    extra = [c for c in ('date', 'id') if c not in columns]
+    selected = columns + extra
+    where, params = _session_filters(**filters)
+    arm = (f"SELECT {', '.join(SESSION_FIELD_SQL[c] for c in selected)} "
+           f"FROM {{sessions}} s JOIN items i ON s.item_id = i.id")
+    if where:
+        arm += " WHERE " + " AND ".join(where)
+    sql, params = _history_union(arm, params)
+    sql += f" ORDER BY {selected.index('date') + 1} DESC, {selected.index('id') + 1} DESC"
+
+    cur = connect().cursor()
+    try:
+        cur.execute(sql, params)
+        while True:
+            chunk = cur.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield [row[:len(columns)] for row in chunk] if extra else chunk
+    finally:
+        cur.close()
+
+
+TAG_MATCH_MODES = ('all', 'any')
+
+
+def sessions_with_tags(tags: Iterable[str], match: str = 'all', limit: int = 200,
+                       cursor: Optional[str] = None,
+                       **filters) -> Tuple[List[SessionRecord], Optional[str]]:
+    """
+    One page of sessions carrying all (or any) of the given tags, newest
+    first, with the list_sessions_page filters and cursor.
+
+    Resolved through the tags/session_tags indexes instead of scanning the
+    tags strings. Tags match case-insensitively; a comma-separated string
+    works too.
+    """
+    if match not in TAG_MATCH_MODES:
+        raise ValueError(f"Unknown tag match '{match}', expected one of {TAG_MATCH_MODES}")
+    wanted = parse_tags(tags if isinstance(tags, str) else ",".join(tags))
+    if not wanted:
+        return [], None
+
+    tag_ids = f"SELECT id FROM tags WHERE name IN ({','.join('?' * len(wanted))})"
+    if match == 'all':
+        condition = (f"s.id IN (SELECT session_id FROM session_tags WHERE tag_id IN ({tag_ids}) "
+                     f"GROUP BY session_id HAVING COUNT(*) = ?)")
+        tag_params = [*wanted, len(wanted)]
+    else:
+        condition = f"s.id IN (SELECT session_id FROM session_tags WHERE tag_id IN ({tag_ids}))"
+        tag_params = list(wanted)
+
+    where, params = _session_filters(**filters)
+    return _session_page([condition, *where], [*tag_params, *params], limit, cursor)
+
+
+def get_tag_hours_by_week(start: Optional[str] = None, end: Optional[str] = None,
+                          tags: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Hours and session counts per tag per week (weeks start on Monday),
+    archived sessions included.
+
+    start/end are inclusive yyyy-mm-dd bounds; tags limits the result to
+    those tags. A session with several tags counts toward each of them.
+    """
+    where, params = [], []
+    if start:
+        where.append("s.date >= ?")
+        params.append(start)
+    if end:
+        where.append("s.date < date(?, '+1 day')")
+        params.append(end)
+    if tags is not None:
+        wanted = parse_tags(tags if isinstance(tags, str) else ",".join(tags))
+        if not wanted:
+            return []
+        where.append(
+            f"st.tag_id IN (SELECT id FROM tags WHERE name IN ({','.join('?' * len(wanted))}))")
+        params.extend(wanted)
+
+    arm = f"""
+        SELECT st.tag_id, s.date, s.hours_spent
+        FROM {{schema}}.session_tags st
+        JOIN {{sessions}} s ON s.id = st.session_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+    """
+    sql, params = _history_union(arm, params)
+    rows = connect().execute(f"""
+        SELECT date(x.date, '-6 days', 'weekday 1') AS week, t.name,
+               SUM(x.hours_spent), COUNT(*)
+        FROM ({sql}) x
+        JOIN tags t ON t.id = x.tag_id
+        GROUP BY week, t.id
+        ORDER BY week, t.name
+    """, params).fetchall()
+    return [{'week': week, 'tag': name, 'hours': round(hours or 0.0, 6), 'sessions': sessions}
+            for week, name, hours, sessions in rows]
+
+
+def list_sessions(limit: int = 200) -> List[SessionRecord]:
     """Get recent sessions with item info"""
-    con = connect()
-    cur = con.cursor()
-    
-    cur.execute("""
-        SELECT s.id, s.date, i.language_code, i.type, i.canonical_name, 
-               s.status, s.hours_spent, s.notes, s.tags, s.difficulty, 
-               s.topic, s.points_awarded, s.progress_pct, s.item_id, i.target_hours
-        FROM sessions s
-        JOIN items i ON s.item_id = i.id
-        ORDER BY s.date DESC, s.id DESC 
-        LIMIT ?
-    """, (limit,))
-    
-    result = cur.fetchall()
-    con.close()
-    return result
+    return list_sessions_page(limit)[0]
+
+
+def sessions_by_id(session_ids: Iterable[int]) -> List[SessionRecord]:
+    """Sessions with the given ids, newest first; missing ids are skipped"""
+    ids = sorted(set(session_ids))
+    rows = []
+    cur = connect().cursor()
+    cur.row_factory = record_factory()
+    for start in range(0, len(ids), ITEM_LOOKUP_BATCH):
+        chunk = ids[start:start + ITEM_LOOKUP_BATCH]
+        rows.extend(cur.execute(
+            f"{_SESSION_LIST_SQL} WHERE s.id IN ({','.join('?' * len(chunk))})", chunk).fetchall())
+    return sorted(rows, key=lambda row: (row.date, row.id), reverse=True)
+
+
+# Bucket expressions over daily_stats.date for get_stats_series
+_STATS_PERIODS = {
+    'day': "date",
+    'week': "date(date, '-6 days', 'weekday 1')",   # Monday of the week
+    'month': "substr(date, 1, 7) || '-01'",
+    'all': "NULL",
+}
+_STATS_GROUPS = ('language_code', 'item_id', 'difficulty')
+
+
+def get_stats_series(period: str = 'day', start: Optional[str] = None, end: Optional[str] = None,
+                     language_code: Optional[str] = None, item_id: Optional[int] = None,
+                     group_by: Optional[str] = None) -> List[Dict]:
+    """
+    Hours, points and session counts per day/week/month from the daily_stats rollup.
+
+    start/end are inclusive yyyy-mm-dd bounds; period='all' gives totals.
+    group_by splits each bucket by 'language_code', 'item_id' or 'difficulty'.
+    Cost depends on the date range, not on total history.
+    """
+    filters = {'language_code': language_code or None, 'item_id': item_id}
+    return stats_series(connect(), period, start, end, filters, group_by)
+
+
+def stats_series(con: sqlite3.Connection, period: str = 'day', start: Optional[str] = None,
+                 end: Optional[str] = None, filters: Optional[Dict] = None,
+                 group_by: Optional[str] = None,
+                 groups: Sequence[str] = _STATS_GROUPS) -> List[Dict]:
+    """
+    get_stats_series over the daily_stats table of any connection, for
+    databases with a rollup of their own (simple_db). filters maps columns
+    to the value they must have (None skips the column); group_by must be
+    one of groups.
+    """
+    if period not in _STATS_PERIODS:
+        raise ValueError(f"Unknown period '{period}', expected one of {sorted(_STATS_PERIODS)}")
+    if group_by is not None and group_by not in groups:
+        raise ValueError(f"Unknown group_by '{group_by}', expected one of {tuple(groups)}")
+
+    bucket = _STATS_PERIODS[period]
+    group_col = f", {group_by}" if group_by else ""
+    where, params = [], []
+    if start:
+        where.append("date >= ?")
+        params.append(start)
+    if end:
+        where.append("date <= ?")
+        params.append(end)
+    for column, value in (filters or {}).items():
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+
+    sql = f"""
+        SELECT {bucket} AS period{group_col},
+               SUM(hours), SUM(points), SUM(session_count)
+        FROM daily_stats
+        {"WHERE " + " AND ".join(where) if where else ""}
+        GROUP BY period{group_col}
+        ORDER BY period{group_col}
+    """
+    rows = con.execute(sql, params).fetchall()
+
+    series = []
+    for row in rows:
+        entry = {'period': row[0]}
+        if group_by:
+            entry[group_by] = row[1]
+        hours, points, sessions = row[-3:]
+        entry.update({'hours': round(hours or 0.0, 6), 'points': round(points or 0.0, 6),
+                      'sessions': sessions or 0})
+        series.append(entry)
+    return series
 
 def get_item_by_id(item_id: int) -> Optional[Dict]:
     """Get item details by ID"""
-    con = connect()
-    cur = con.cursor()
+    cur = connect().cursor()
     
     cur.execute("""
         SELECT id, language_code, type, canonical_name, slug, 
@@ -573,7 +2539,6 @@ def get_item_by_id(item_id: int) -> Optional[Dict]:
     """, (item_id,))
     
     row = cur.fetchone()
-    con.close()
     
     if row:
         return {
@@ -34,8 +34,8 @@ from PySide6.QtGui import QValidator
 # ---------- Suggestion Dialog ----------
 class SuggestionDialog(QDialog):
     """
-    Presents a list of similar items and lets the user select one
-    or choose to create a new item instead.
+    Presents a list of similar items, ranked by similarity score,
+    and lets the user select one or choose to create a new item instead.
     """
 
     def __init__(self, suggestions: Iterable[dict], work_item_name: str, parent=None):
@@ -55,11 +55,14 @@ class SuggestionDialog(QDialog):
         msg.setWordWrap(True)
         layout.addWidget(msg)
 
-        # Suggestion list
+        # Suggestion list, best match first
         self.list_widget = QListWidget()
-        for suggestion in suggestions or []:
+        ranked = sorted(suggestions or [], key=lambda s: s.get("similarity", 0.0), reverse=True)
+        for suggestion in ranked:
             name = suggestion.get("name", "Unnamed")
             hint = suggestion.get("similarity_hint", "")
+            if not hint and "similarity" in suggestion:
+                hint = f"{suggestion['similarity']:.0%} similar"
             item_text = f"{name} ({hint})" if hint else name
             list_item = QListWidgetItem(item_text)
             list_item.setData(Qt.UserRole, suggestion.get("id"))
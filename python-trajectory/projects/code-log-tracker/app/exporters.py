@@ -0,0 +1,161 @@
+# app/exporters.py
+"""
+Streaming session exporters.
+
+Sessions are read in fetchmany chunks (see db.iter_session_chunks) and
+written out as each chunk arrives, so memory stays flat however many
+rows are exported. CSV and JSONL are always available; Parquet needs
+pyarrow and is written one row group per chunk.
+
+Output goes to a temporary file that replaces the target only when the
+export finishes, so a cancelled or failed export never leaves a
+truncated file behind.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config.table_config import TableConfig
+from app.db import EXPORT_CHUNK_SIZE, count_sessions, iter_session_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Arrow type per exported column; anything not listed is a string
+_ARROW_TYPES = {
+    'id': 'int64',
+    'hours_spent': 'float64',
+    'points_awarded': 'float64',
+    'progress_pct': 'float64',
+    'target_hours': 'float64',
+}
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is stopped through its cancel callback."""
+
+
+def export_format(path: str, fmt: Optional[str] = None) -> str:
+    """Resolve the export format from fmt or the file extension"""
+    fmt = (fmt or Path(path).suffix.lstrip('.')).lower()
+    if fmt == 'ndjson':
+        fmt = 'jsonl'
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt or path!r}")
+    if fmt == 'parquet' and pa is None:
+        raise ValueError("Parquet export requires pyarrow")
+    return fmt
+
+
+def export_sessions(
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+    **filters,
+) -> int:
+    """
+    Export sessions matching the list filters to path and return the row count.
+
+    Columns follow TableConfig (headers for CSV, keys for JSONL/Parquet).
+    progress(done, total) is called after every chunk; cancel() is checked
+    before every chunk and raises ExportCancelled when it returns True.
+    Safe to call from a worker thread.
+    """
+    fmt = export_format(path, fmt)
+    total = count_sessions(**filters) if progress else 0
+    chunks = _checked_chunks(iter_session_chunks(TableConfig.KEYS, chunk_size, **filters),
+                             total, progress, cancel)
+
+    tmp_path = f"{path}.part"
+    try:
+        count = _WRITERS[fmt](tmp_path, chunks)
+        os.replace(tmp_path, path)
+        return count
+    finally:
+        chunks.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _checked_chunks(chunks: Iterator[List[Tuple]], total: int,
+                    progress: Optional[Callable[[int, int], None]],
+                    cancel: Optional[Callable[[], bool]]) -> Iterator[List[Tuple]]:
+    """Pass chunks through, reporting progress and honouring cancellation"""
+    done = 0
+    try:
+        while True:
+            if cancel and cancel():
+                raise ExportCancelled(f"Export cancelled after {done} rows")
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+            done += len(chunk)
+            if progress:
+                progress(done, max(total, done))
+    finally:
+        chunks.close()
+
+
+def _write_csv(path: str, chunks: Iterator[List[Tuple]]) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(TableConfig.HEADERS)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def _write_jsonl(path: str, chunks: Iterator[List[Tuple]]) -> int:
+    count = 0
+    keys = TableConfig.KEYS
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(''.join(encode(dict(zip(keys, row))) + '\n' for row in chunk))
+            count += len(chunk)
+    return count
+
+
+def _arrow_schema():
+    return pa.schema([
+        (key, getattr(pa, _ARROW_TYPES.get(key, 'string'))())
+        for key in TableConfig.KEYS
+    ])
+
+
+def _write_parquet(path: str, chunks: Iterator[List[Tuple]]) -> int:
+    count = 0
+    schema = _arrow_schema()
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            batch = pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            count += len(chunk)
+    return count
+
+
+_WRITERS: Dict[str, Callable[[str, Iterator[List[Tuple]]], int]] = {
+    'csv': _write_csv,
+    'jsonl': _write_jsonl,
+    'parquet': _write_parquet,
+}
@@ -0,0 +1,300 @@
+# app/importers.py
+"""
+Chunked session importer for CSV and Excel files.
+
+Files are read IMPORT_CHUNK_SIZE rows at a time into pandas frames
+(read_csv chunks, or openpyxl's read-only row stream for .xlsx). Columns
+are matched to TableConfig by header or key, and each chunk is validated
+and normalized column-wise: dates to YYYY-MM-DD, hours against the
+ui_limits range, and type, language, status and difficulty matched
+case-insensitively to their allowed values. Columns repeat a small set of
+values, so each check runs once per distinct value of a column and is
+broadcast back to its rows. Valid rows go straight into
+db.bulk_insert_sessions, which resolves their work items with batched
+lookups. Invalid rows are not written; each one goes into the reject
+report with the reason. Rows repeating a session logged before the
+import (same content hash) are skipped and counted as duplicates, so
+importing a file twice does not double the hours; identical rows within
+one file are all kept.
+
+The import is a single transaction: a cancelled or failed import leaves
+the database as it was. ID, Points and Progress % are computed on insert,
+and Target Time belongs to the work item, so those columns are ignored.
+"""
+
+from __future__ import annotations
+
+import csv
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from app.config.table_config import TableConfig
+from app.db import BULK_CHUNK_SIZE, bulk_insert_sessions, get_config, get_languages
+
+try:
+    import pandas as pd
+except ImportError:  # Import needs pandas
+    pd = None
+
+try:
+    import openpyxl
+except ImportError:  # Excel import is optional
+    openpyxl = None
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+# Rows per pandas chunk read and validated at a time
+IMPORT_CHUNK_SIZE = 50000
+
+# Rejected rows kept in the returned report; reject_path gets all of them
+IMPORT_REJECT_LIMIT = 1000
+
+# Session fields read from a file, and those every row needs
+IMPORT_KEYS = ('date', 'type', 'canonical_name', 'notes', 'status', 'hours_spent',
+               'tags', 'language_code', 'difficulty', 'topic')
+REQUIRED_KEYS = ('date', 'type', 'canonical_name', 'hours_spent', 'language_code')
+
+ITEM_TYPES = ('Exercise', 'Project')
+
+# Defaults for blank cells, as in bulk_insert_sessions
+DEFAULT_STATUS = 'In Progress'
+DEFAULT_DIFFICULTY = 'Beginner'
+
+
+class ImportCancelled(Exception):
+    """Raised when an import is stopped through its cancel callback."""
+
+
+def import_format(path: str, fmt: Optional[str] = None) -> str:
+    """Resolve the import format from fmt or the file extension"""
+    fmt = (fmt or Path(path).suffix.lstrip('.')).lower()
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt or path!r}")
+    if pd is None:
+        raise ValueError("Session import requires pandas")
+    if fmt == 'xlsx' and openpyxl is None:
+        raise ValueError("Excel import requires openpyxl")
+    return fmt
+
+
+def import_sessions(
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    reject_path: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> Dict:
+    """
+    Import sessions from a CSV or XLSX file with TableConfig headers (or keys).
+
+    Returns the bulk_insert_sessions counts plus rows read, rows rejected
+    and the first IMPORT_REJECT_LIMIT rejects as {'row', 'reason', 'values'};
+    row is the file row, counting the header as row 1, and values maps the
+    file's columns to the row's cells.
+    reject_path, if given, receives every reject as CSV. progress(read) is
+    called after every chunk; cancel() is checked before every chunk and
+    raises ImportCancelled when it returns True.
+    """
+    fmt = import_format(path, fmt)
+    started = time.perf_counter()
+    rules = _import_rules()
+    report = {'read': 0, 'rejected': 0, 'rejects': []}
+
+    reject_file = open(reject_path, "w", newline="", encoding="utf-8") if reject_path else None
+    try:
+        reject_writer = csv.writer(reject_file) if reject_file else None
+
+        def valid_rows() -> Iterator[Dict]:
+            columns = None
+            for frame in _READERS[fmt](path, chunk_size):
+                if cancel and cancel():
+                    raise ImportCancelled(f"Import cancelled after {report['read']} rows")
+                if columns is None:
+                    columns = _match_columns(frame.columns)
+                    if reject_writer:
+                        reject_writer.writerow(['row', 'reason', *frame.columns])
+                valid, rejected, reasons = _normalize_chunk(frame, columns, rules)
+                report['read'] += len(frame)
+                _record_rejects(report, rejected, reasons, reject_writer)
+                # Column lists zipped into dicts; DataFrame.to_dict boxes cell by cell
+                keys = list(valid.columns)
+                for values in zip(*(valid[key].tolist() for key in keys)):
+                    yield dict(zip(keys, values))
+                if progress:
+                    progress(report['read'])
+
+        stats = bulk_insert_sessions(valid_rows(), chunk_size=BULK_CHUNK_SIZE)
+    finally:
+        if reject_file:
+            reject_file.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        **stats,
+        'read': report['read'],
+        'rejected': report['rejected'],
+        'rejects': report['rejects'],
+        'seconds': elapsed,
+        'rows_per_second': report['read'] / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+# ---- Reading ----
+def _read_csv(path: str, chunk_size: int) -> Iterator["pd.DataFrame"]:
+    # Everything as text; the validators do the typing. utf-8-sig drops an Excel BOM
+    with pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+                     chunksize=chunk_size) as reader:
+        yield from reader
+
+
+def _read_xlsx(path: str, chunk_size: int) -> Iterator["pd.DataFrame"]:
+    """First worksheet, streamed in read-only mode"""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = ['' if cell is None else str(cell) for cell in header]
+        width = len(columns)
+        start = 0
+        while True:
+            block = [row[:width] + (None,) * (width - len(row)) for row in islice(rows, chunk_size)]
+            if not block:
+                return
+            yield pd.DataFrame.from_records(block, columns=columns,
+                                            index=pd.RangeIndex(start, start + len(block)))
+            start += len(block)
+    finally:
+        workbook.close()
+
+
+_READERS: Dict[str, Callable[[str, int], Iterator["pd.DataFrame"]]] = {
+    'csv': _read_csv,
+    'xlsx': _read_xlsx,
+}
+
+
+def _match_columns(columns) -> Dict[str, str]:
+    """File column -> session key for the importable columns; raises if a required one is missing"""
+    known = {}
+    for header, key in zip(TableConfig.HEADERS, TableConfig.KEYS):
+        if key in IMPORT_KEYS:
+            known[header.lower()] = key
+            known[key] = key
+    matched = {}
+    for column in columns:
+        key = known.get(str(column).strip().lower())
+        if key and key not in matched.values():
+            matched[column] = key
+    missing = [TableConfig.get_header_for_key(key)
+               for key in REQUIRED_KEYS if key not in matched.values()]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return matched
+
+
+# ---- Validation ----
+def _import_rules() -> Dict:
+    """Allowed values (lowercase spelling -> stored value) and the hours range"""
+    config = get_config() or {}
+    limits = config.get('ui_limits') or {}
+    languages = {}
+    for code, name, _ in get_languages():
+        languages[name.lower()] = code
+        languages[code.lower()] = code
+    return {
+        'language_code': languages,
+        'type': {t.lower(): t for t in ITEM_TYPES},
+        'status': {s.lower(): s
+                   for s in config.get('status_multipliers') or {DEFAULT_STATUS: 1.0}},
+        'difficulty': {d.lower(): d
+                       for d in config.get('difficulty_weights') or {DEFAULT_DIFFICULTY: 1.0}},
+        'min_hours': float(limits.get('min_hours_per_session', 0)),
+        'max_hours': float(limits.get('max_hours_per_session', 24)),
+    }
+
+
+def _per_value(column: "pd.Series", convert: Callable[["pd.Series"], "pd.Series"]) -> "pd.Series":
+    """convert applied to the distinct values of column, mapped back onto its rows"""
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    converted = convert(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    return pd.Series(converted[codes], index=column.index, dtype=object)
+
+
+def _text(values: "pd.Series") -> "pd.Series":
+    """Cells as stripped strings, blanks as ''"""
+    return values.map(lambda cell: '' if cell is None or cell != cell else str(cell).strip())
+
+
+def _parse_dates(text: "pd.Series") -> "pd.Series":
+    """YYYY-MM-DD strings; NaN where text is not a date"""
+    parsed = pd.to_datetime(text, format='ISO8601', errors='coerce')
+    # Spreadsheet spellings (03/15/2024, 15 Mar 2024, ...) only for what ISO missed
+    retry = parsed.isna() & (text != '')
+    if retry.any():
+        parsed[retry] = pd.to_datetime(text[retry], format='mixed', errors='coerce')
+    return parsed.dt.strftime('%Y-%m-%d').astype(object)
+
+
+def _normalize_chunk(frame: "pd.DataFrame", columns: Dict[str, str],
+                     rules: Dict) -> Tuple["pd.DataFrame", "pd.DataFrame", "pd.Series"]:
+    """
+    Validate and normalize one chunk. Returns (valid rows as session dict
+    columns, rejected rows of frame as read, the reason for each of them).
+    Rows with every imported cell blank are skipped silently.
+    """
+    data = pd.DataFrame({key: _per_value(frame[column], _text) for column, key in columns.items()},
+                        index=frame.index)
+    for key in IMPORT_KEYS:
+        if key not in data:
+            data[key] = ''
+    data = data[(data != '').any(axis=1)]
+    reason = pd.Series(None, index=data.index, dtype=object)
+
+    def reject(bad: "pd.Series", why: str):
+        nonlocal reason
+        reason = reason.mask(bad & reason.isna(), why)
+
+    # First failed check wins
+    dates = _per_value(data['date'], _parse_dates)
+    reject(dates.isna(), "invalid date")
+    for key, default in (('language_code', None), ('type', None),
+                         ('status', DEFAULT_STATUS), ('difficulty', DEFAULT_DIFFICULTY)):
+        text = data[key] if default is None else data[key].mask(data[key] == '', default)
+        mapped = _per_value(text,
+                            lambda values, allowed=rules[key]: values.str.lower().map(allowed))
+        reject(mapped.isna(), f"unknown {TableConfig.get_header_for_key(key).lower()}")
+        data[key] = mapped
+    reject(data['canonical_name'] == '', "missing work item name")
+    hours = pd.to_numeric(_per_value(data['hours_spent'],
+                                     lambda values: pd.to_numeric(values, errors='coerce')))
+    reject(hours.isna(), "hours is not a number")
+    reject((hours < rules['min_hours']) | (hours > rules['max_hours']),
+           f"hours outside {rules['min_hours']:g}-{rules['max_hours']:g}")
+    data['hours_spent'] = hours
+    data['date'] = dates
+
+    ok = reason.isna()
+    # The file's own columns stay apart from row/reason, which they may share a name with
+    return data.loc[ok, list(IMPORT_KEYS)], frame.loc[reason.index[~ok]], reason[~ok]
+
+
+def _record_rejects(report: Dict, rejected: "pd.DataFrame", reasons: "pd.Series",
+                    writer) -> None:
+    report['rejected'] += len(rejected)
+    if not len(rejected):
+        return
+    rows = (rejected.index + 2).tolist()
+    reasons = reasons.tolist()
+    room = IMPORT_REJECT_LIMIT - len(report['rejects'])
+    if room > 0:
+        report['rejects'].extend(
+            {'row': row, 'reason': why, 'values': values}
+            for row, why, values in zip(rows, reasons, rejected.head(room).to_dict('records')))
+    if writer:
+        writer.writerows([row, why, *values] for row, why, values in
+                         zip(rows, reasons, rejected.itertuples(index=False, name=None)))
@@ -0,0 +1,127 @@
+# app/keyword_matcher.py
+"""
+Multi-pattern keyword matching for language packs.
+
+KeywordMatcher is an Aho-Corasick automaton: every phrase in a pack is
+found in one pass over the text, overlapping and nested phrases included,
+with the same substring semantics as `phrase in text`.
+
+PackMatcher compiles a language pack's topic/skill names, keywords,
+aliases and patterns into one matcher and turns the matches into
+per-topic and per-skill scores.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Score per matched phrase, by (kind, role)
+SUGGESTION_WEIGHTS: Dict[Tuple[str, str], int] = {
+    ('topic', 'name'): 10,
+    ('topic', 'keyword'): 5,
+    ('topic', 'alias'): 8,
+    ('skill', 'name'): 15,
+    ('skill', 'keyword'): 5,
+    ('skill', 'pattern'): 7,
+}
+
+# Weights used when picking defaults for a brand new item
+ITEM_DEFAULT_WEIGHTS: Dict[Tuple[str, str], int] = {
+    ('topic', 'name'): 10,
+    ('skill', 'name'): 15,
+    ('skill', 'keyword'): 5,
+}
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over lower-cased phrases."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for phrase in {p.lower() for p in phrases if p}:
+            node = 0
+            for ch in phrase:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(phrase)
+
+        # Breadth-first failure links; outputs inherit from their fail node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[str]:
+        """Distinct phrases that occur in text (case-insensitive)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class PackMatcher:
+    """Compiled keyword matcher for one language pack."""
+
+    def __init__(self, pack: Dict):
+        # phrase -> [(kind, name, role)], duplicates kept so scores match a per-keyword scan
+        self.entries: Dict[str, List[Tuple[str, str, str]]] = {}
+        # (kind, name) -> position in the pack, for first-wins tie breaking
+        self.order: Dict[Tuple[str, str], int] = {}
+
+        for kind, section, roles in (
+            ('topic', 'topics', (('keyword', 'keywords'), ('alias', 'aliases'))),
+            ('skill', 'skills', (('keyword', 'keywords'), ('pattern', 'patterns'))),
+        ):
+            for name, info in (pack.get(section) or {}).items():
+                self.order[(kind, name)] = len(self.order)
+                self._add(name, kind, name, 'name')
+                for role, field in roles:
+                    for phrase in (info or {}).get(field, []):
+                        self._add(phrase, kind, name, role)
+
+        self.matcher = KeywordMatcher(self.entries)
+
+    def _add(self, phrase: str, kind: str, name: str, role: str):
+        if phrase:
+            self.entries.setdefault(phrase.lower(), []).append((kind, name, role))
+
+    def scores(self, text: str, weights: Dict[Tuple[str, str], int]) -> Dict[Tuple[str, str], int]:
+        """Score every topic and skill mentioned in text: {(kind, name): score}"""
+        totals: Dict[Tuple[str, str], int] = {}
+        for phrase in self.matcher.find(text):
+            for kind, name, role in self.entries[phrase]:
+                weight = weights.get((kind, role), 0)
+                if weight:
+                    totals[(kind, name)] = totals.get((kind, name), 0) + weight
+        return totals
+
+    def best(self, scores: Dict[Tuple[str, str], int], kind: str) -> Optional[Tuple[str, int]]:
+        """Highest scoring name of a kind (earliest in the pack on ties), or None"""
+        ranked = [(score, -self.order[key], key[1])
+                  for key, score in scores.items() if key[0] == kind]
+        if not ranked:
+            return None
+        score, _, name = max(ranked)
+        return name, score
@@ -0,0 +1,343 @@
+# app/migrations.py
+"""
+Versioned schema migrations.
+
+init_db creates the baseline tables; everything after that is a numbered
+migration recorded in schema_version. A migration has up to three parts:
+
+- schema: DDL run in one short transaction that also records the version,
+  so it is either fully applied and recorded or not applied at all
+- backfills: batch functions run one bounded batch per transaction, with
+  the resume point (checkpoint) saved in the same transaction
+- finalize: run together with marking the migration done
+
+No step ever holds the write lock for longer than one batch, and an
+interrupted run picks up from the last checkpoint instead of repeating
+work. A recorded step is never run again.
+
+A backfill is fn(cur, checkpoint, batch_size) -> next checkpoint, or None
+once it has nothing left to do. Checkpoints are strings (usually the last
+processed rowid).
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app import db
+from app.change_log import install_change_log
+
+# Rows touched per backfill transaction
+MIGRATION_BATCH_SIZE = 2000
+
+Backfill = Callable[[sqlite3.Cursor, Optional[str], int], Optional[str]]
+
+
+class MigrationError(Exception):
+    """The database and the registered migrations disagree."""
+
+
+class Migration:
+    """One numbered schema change."""
+
+    def __init__(self, version: int, name: str, schema: Callable[[sqlite3.Cursor], None],
+                 backfills: Sequence[Backfill] = (),
+                 finalize: Optional[Callable[[sqlite3.Cursor], None]] = None):
+        self.version = version
+        self.name = name
+        self.schema = schema
+        self.backfills = tuple(backfills)
+        self.finalize = finalize
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version}, {self.name!r})"
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str, backfills: Sequence[Backfill] = (),
+              finalize: Optional[Callable[[sqlite3.Cursor], None]] = None):
+    """Register the decorated schema function as migration `version`"""
+    def register(schema: Callable[[sqlite3.Cursor], None]):
+        if any(m.version == version for m in MIGRATIONS):
+            raise MigrationError(f"Duplicate migration version {version}")
+        MIGRATIONS.append(Migration(version, name, schema, backfills, finalize))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return schema
+    return register
+
+
+def _ensure_version_table(cur: sqlite3.Cursor):
+    cur.execute("""CREATE TABLE IF NOT EXISTS schema_version(
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        state TEXT NOT NULL CHECK (state IN ('backfilling', 'done')),
+        checkpoint TEXT,
+        started_at TEXT NOT NULL,
+        finished_at TEXT
+    )""")
+
+
+def migration_status() -> List[Dict]:
+    """Every registered or recorded migration with its state ('pending', 'backfilling', 'done')"""
+    con = db.connect()
+    _ensure_version_table(con.cursor())
+    recorded = {
+        row[0]: row for row in
+        con.execute("SELECT version, name, state, checkpoint, started_at, finished_at "
+                    "FROM schema_version")
+    }
+    status = []
+    for version in sorted({m.version for m in MIGRATIONS} | set(recorded)):
+        known = next((m for m in MIGRATIONS if m.version == version), None)
+        row = recorded.get(version)
+        status.append({
+            'version': version,
+            'name': row[1] if row else known.name,
+            'state': row[2] if row else 'pending',
+            'checkpoint': json.loads(row[3]) if row and row[3] else None,
+            'started_at': row[4] if row else None,
+            'finished_at': row[5] if row else None,
+            'known': known is not None,
+        })
+    return status
+
+
+def migrate(target: Optional[int] = None, batch_size: int = MIGRATION_BATCH_SIZE,
+            max_batches: Optional[int] = None,
+            progress: Optional[Callable[[Migration, str], None]] = None) -> List[int]:
+    """
+    Apply pending migrations up to target (default: all) and return the
+    versions completed by this call.
+
+    max_batches caps the backfill batches run in this call; the remaining
+    work stays checkpointed for the next run. progress(migration, message)
+    is called after the schema step and every batch.
+    """
+    con = db.connect()
+    with db.transaction() as tx:
+        _ensure_version_table(tx.cursor())
+
+    newest = max((m.version for m in MIGRATIONS), default=0)
+    row = con.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    if row[0] is not None and row[0] > newest:
+        raise MigrationError(
+            f"Database is at schema version {row[0]}, newer than this code ({newest})")
+
+    completed = []
+    batches = [0]
+    for m in MIGRATIONS:
+        if target is not None and m.version > target:
+            break
+        if _apply(m, batch_size, max_batches, batches, progress):
+            completed.append(m.version)
+        elif _state(m) != 'done':
+            break  # out of batches; later migrations wait for this one
+    return completed
+
+
+def _state(m: Migration) -> Optional[str]:
+    row = db.connect().execute("SELECT state FROM schema_version WHERE version=?",
+                               (m.version,)).fetchone()
+    return row[0] if row else None
+
+
+def _apply(m: Migration, batch_size: int, max_batches: Optional[int], batches: List[int],
+           progress: Optional[Callable[[Migration, str], None]]) -> bool:
+    """Run what is left of one migration; True if this call finished it"""
+    now = datetime.utcnow().isoformat()
+
+    # Schema step, recorded in the same transaction so it can never run twice
+    with db.transaction(immediate=True) as con:
+        cur = con.cursor()
+        cur.execute("SELECT name, state FROM schema_version WHERE version=?", (m.version,))
+        row = cur.fetchone()
+        if row is not None and row[0] != m.name:
+            raise MigrationError(
+                f"Schema version {m.version} is recorded as {row[0]!r}, expected {m.name!r}")
+        if row is not None and row[1] == 'done':
+            return False
+        if row is None:
+            m.schema(cur)
+            cur.execute("""
+                INSERT INTO schema_version (version, name, state, checkpoint, started_at)
+                VALUES (?, ?, 'backfilling', ?, ?)
+            """, (m.version, m.name, json.dumps({'step': 0, 'cursor': None}), now))
+            if progress:
+                progress(m, "schema applied")
+
+    # Backfill batches, each with its checkpoint, then finalize
+    finished = False
+    while not finished:
+        if max_batches is not None and batches[0] >= max_batches:
+            return False
+        with db.transaction(immediate=True) as con:
+            cur = con.cursor()
+            cur.execute("SELECT state, checkpoint FROM schema_version WHERE version=?",
+                        (m.version,))
+            state, checkpoint = cur.fetchone()
+            if state == 'done':
+                return False  # another runner finished it
+            position = json.loads(checkpoint)
+            step = position['step']
+
+            if step < len(m.backfills):
+                cursor = m.backfills[step](cur, position['cursor'], batch_size)
+                if cursor is None:
+                    position = {'step': step + 1, 'cursor': None}
+                else:
+                    position = {'step': step, 'cursor': cursor}
+                cur.execute("UPDATE schema_version SET checkpoint=? WHERE version=?",
+                            (json.dumps(position), m.version))
+                batches[0] += 1
+                message = (f"backfill {step + 1}/{len(m.backfills)} "
+                           + (f"at {cursor}" if cursor else "complete"))
+            else:
+                if m.finalize:
+                    m.finalize(cur)
+                cur.execute("""
+                    UPDATE schema_version SET state='done', checkpoint=NULL, finished_at=?
+                    WHERE version=?
+                """, (datetime.utcnow().isoformat(), m.version))
+                message = "done"
+                finished = True
+
+        if progress:
+            progress(m, message)
+    return True
+
+
+# ---------------------------
+# Migrations
+# ---------------------------
+
+def _batch_ids(cur: sqlite3.Cursor, table: str, checkpoint: Optional[str], batch_size: int):
+    """(first_id, last_id) of the next batch of rowids after checkpoint, or None when done"""
+    after = int(checkpoint or 0)
+    cur.execute(f"SELECT MAX(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+                (after, batch_size))
+    last = cur.fetchone()[0]
+    return None if last is None else (after, last)
+
+
+def _backfill_project_names(cur: sqlite3.Cursor, checkpoint: Optional[str],
+                            batch_size: int) -> Optional[str]:
+    """Sessions logged against Project items belong to the project of the same name"""
+    span = _batch_ids(cur, 'sessions', checkpoint, batch_size)
+    if span is None:
+        return None
+    cur.execute("""
+        UPDATE sessions SET project_name = i.canonical_name
+        FROM items i
+        WHERE i.id = sessions.item_id AND i.type = 'Project'
+          AND sessions.id > ? AND sessions.id <= ? AND sessions.project_name IS NULL
+    """, span)
+    return str(span[1])
+
+
+def _backfill_project_progress(cur: sqlite3.Cursor, checkpoint: Optional[str],
+                               batch_size: int) -> Optional[str]:
+    """Progress of each session's project against the project's target"""
+    span = _batch_ids(cur, 'sessions', checkpoint, batch_size)
+    if span is None:
+        return None
+    # Totals only for the projects that appear in this batch
+    cur.execute("""
+        UPDATE sessions SET project_progress_pct =
+            CASE WHEN p.target_hours > 0 THEN MIN(100.0, 100.0 * t.hours / p.target_hours)
+                 ELSE 0.0 END
+        FROM projects p, (
+            SELECT project_name, SUM(hours_spent) AS hours FROM sessions
+            WHERE project_name IN (SELECT project_name FROM sessions WHERE id > ?1 AND id <= ?2)
+            GROUP BY project_name
+        ) t
+        WHERE p.name = sessions.project_name AND t.project_name = sessions.project_name
+          AND sessions.id > ?1 AND sessions.id <= ?2
+    """, span)
+    return str(span[1])
+
+
+@migration(1, "projects", backfills=(_backfill_project_names, _backfill_project_progress))
+def _add_projects(cur: sqlite3.Cursor):
+    """Projects with targets, and the sessions.project_* columns insert_or_update_session writes"""
+    cur.execute("""CREATE TABLE IF NOT EXISTS projects(
+        name TEXT PRIMARY KEY,
+        target_hours REAL DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )""")
+    cur.execute("ALTER TABLE sessions ADD COLUMN project_name TEXT")
+    cur.execute("ALTER TABLE sessions ADD COLUMN project_progress_pct REAL DEFAULT 0")
+    # Indexing the still-empty column is instant, and the progress backfill needs it
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions(project_name)")
+    cur.execute("""
+        INSERT OR IGNORE INTO projects (name, target_hours)
+        SELECT canonical_name, MAX(target_hours) FROM items
+        WHERE type = 'Project' GROUP BY canonical_name
+    """)
+
+
+def _backfill_session_tags(cur: sqlite3.Cursor, checkpoint: Optional[str],
+                           batch_size: int) -> Optional[str]:
+    """Split the existing tags strings into session_tags"""
+    span = _batch_ids(cur, 'sessions', checkpoint, batch_size)
+    if span is None:
+        return None
+    cur.execute("SELECT id, tags FROM sessions WHERE id > ? AND id <= ? AND tags <> ''", span)
+    db._sync_session_tags(cur, cur.fetchall())
+    return str(span[1])
+
+
+@migration(2, "session_tags", backfills=(_backfill_session_tags,))
+def _add_session_tags(cur: sqlite3.Cursor):
+    """Normalized copy of sessions.tags for indexed tag filters and per-tag totals"""
+    cur.execute("""CREATE TABLE IF NOT EXISTS tags(
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE
+    )""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS session_tags(
+        session_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (session_id, tag_id),
+        FOREIGN KEY(session_id) REFERENCES sessions(id),
+        FOREIGN KEY(tag_id) REFERENCES tags(id)
+    ) WITHOUT ROWID""")
+    # (tag_id, session_id) drives the tag -> sessions direction
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_session_tags_tag ON session_tags(tag_id, session_id)")
+    # Writes go through the session write path; deletes are caught here
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_session_tags_delete AFTER DELETE ON sessions BEGIN
+            DELETE FROM session_tags WHERE session_id = OLD.id;
+        END
+    """)
+
+
+@migration(3, "change_log")
+def _add_change_log(cur: sqlite3.Cursor):
+    """Trigger-filled log of session and item changes (see app.change_log)"""
+    install_change_log(cur, {'session': 'sessions', 'item': 'items'})
+
+
+def _backfill_content_hashes(cur: sqlite3.Cursor, checkpoint: Optional[str],
+                             batch_size: int) -> Optional[str]:
+    """Content hashes of the existing sessions"""
+    span = _batch_ids(cur, 'sessions', checkpoint, batch_size)
+    if span is None:
+        return None
+    cur.execute("SELECT id, item_id, date, hours_spent, notes, tags FROM sessions "
+                "WHERE id > ? AND id <= ?", span)
+    db._store_content_hashes(cur, cur.fetchall())
+    return str(span[1])
+
+
+@migration(4, "session_content_hash", backfills=(_backfill_content_hashes,))
+def _add_content_hash(cur: sqlite3.Cursor):
+    """sessions.content_hash (see db.session_content_hash), indexed for duplicate checks"""
+    cur.execute("ALTER TABLE sessions ADD COLUMN content_hash BLOB")
+    # A lookup index, not UNIQUE: duplicates logged so far stay until
+    # db.dedupe_sessions removes them
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_content_hash ON sessions(content_hash)")
@@ -0,0 +1,313 @@
+# app/query_trace.py
+"""
+Query tracing for the tracker database.
+
+Set TRACKER_DB_TRACE=1 to trace every connection opened by app.db (and
+simple_db). Traced connections time each execute/executemany and count
+the rows fetched, per statement. set_trace_callback supplies the statement
+as SQLite ran it, with parameters filled in. Statements slower than
+TRACKER_DB_SLOW_MS (default 100) go to the slow-query log with their
+EXPLAIN QUERY PLAN.
+
+With the variable unset, connections are plain sqlite3 connections and
+nothing here runs.
+
+Latency is the time spent in execute/executemany, i.e. until the first row
+is ready or the write is done; time spent stepping through further rows
+is reported separately as fetch_ms.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+TRACE_ENV = "TRACKER_DB_TRACE"
+SLOW_MS_ENV = "TRACKER_DB_SLOW_MS"
+DEFAULT_SLOW_MS = 100.0
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+# Slow statements kept in memory
+SLOW_LOG_SIZE = 200
+
+# Statements EXPLAIN QUERY PLAN has nothing to say about
+_NO_PLAN_PREFIXES = ("BEGIN", "COMMIT", "END", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA",
+                     "CREATE", "DROP", "ALTER", "ANALYZE", "VACUUM", "ATTACH", "DETACH")
+
+logger = logging.getLogger(__name__)
+
+
+class StatementStats:
+    """Counters for one statement text"""
+
+    __slots__ = ('sql', 'calls', 'total_ms', 'max_ms', 'rows', 'fetch_ms', 'errors', 'buckets')
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.fetch_ms = 0.0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, ms: float):
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th call (max_ms for the open bucket)"""
+        wanted = self.calls * pct / 100.0
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            'sql': self.sql,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'fetch_ms': round(self.fetch_ms, 3),
+            'histogram': list(zip((*LATENCY_BUCKETS_MS, None), self.buckets)),
+        }
+
+
+class QueryTracer:
+    """
+    Collects statement statistics and the slow-query log for the
+    connections it is installed on. Safe to share between threads.
+    """
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS, slow_log_size: int = SLOW_LOG_SIZE):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[str, StatementStats] = {}
+        self._slow: deque = deque(maxlen=slow_log_size)
+
+    def connect(self, path, **kwargs) -> sqlite3.Connection:
+        """Open a traced connection; takes the sqlite3.connect arguments"""
+        con = sqlite3.connect(path, factory=TracedConnection, **kwargs)
+        con.tracer = self
+        con.set_trace_callback(self._on_trace)
+        return con
+
+    # ---- Recording (called by the traced connections) ----
+    def _on_trace(self, sql: str):
+        # First matching statement of the current execute; triggers and modules
+        # (FTS5 runs its own PRAGMAs) trace further statements in between
+        local = self._local
+        if (getattr(local, 'expanded', '') is None
+                and sql.lstrip()[:len(local.keyword)].upper() == local.keyword):
+            local.expanded = sql
+
+    def _begin(self, sql: str):
+        self._local.keyword = sql.lstrip()[:6].upper()
+        self._local.expanded = None
+
+    def _record(self, con: sqlite3.Connection, sql: str, parameters, ms: float,
+                failed: bool, many: bool = False) -> StatementStats:
+        key = " ".join(sql.split())
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(key)
+            stats.add(ms)
+            if failed:
+                stats.errors += 1
+        expanded = getattr(self._local, 'expanded', None)
+        self._local.expanded = ''
+        if ms >= self.slow_ms and not failed:
+            self._log_slow(con, key, expanded, parameters, ms, many)
+        return stats
+
+    def _record_fetch(self, stats: StatementStats, rows: int, ms: float):
+        with self._lock:
+            stats.rows += rows
+            stats.fetch_ms += ms
+
+    def _log_slow(self, con: sqlite3.Connection, key: str, expanded: Optional[str], parameters,
+                  ms: float, many: bool):
+        plan = explain(con, expanded, None) if expanded else explain(con, key, parameters)
+        statement = " ".join(expanded.split()) if expanded else None
+        entry = {'at': datetime.now().isoformat(timespec='milliseconds'), 'ms': round(ms, 3),
+                 'sql': key, 'statement': statement, 'executemany': many, 'plan': plan}
+        with self._lock:
+            self._slow.append(entry)
+        logger.warning("Slow query (%.1f ms%s): %s%s",
+                       ms, ", executemany; first row shown" if many else "",
+                       statement or key, "".join("\n    " + line for line in plan or []))
+
+    # ---- Reading ----
+    def stats(self) -> List[Dict]:
+        """Per-statement counters, most total time first"""
+        with self._lock:
+            rows = [s.as_dict() for s in self._stats.values()]
+        return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+
+    def slow_queries(self) -> List[Dict]:
+        """
+        Slow-query log, oldest first: at, ms, sql, statement (with values;
+        the first row for executemany), executemany, plan
+        """
+        with self._lock:
+            return list(self._slow)
+
+    def summary(self) -> Dict:
+        """Totals over every statement: calls, total_ms, p95_ms, slow"""
+        with self._lock:
+            merged = StatementStats("*")
+            for s in self._stats.values():
+                merged.calls += s.calls
+                merged.total_ms += s.total_ms
+                merged.max_ms = max(merged.max_ms, s.max_ms)
+                merged.buckets = [a + b for a, b in zip(merged.buckets, s.buckets)]
+            slow = len(self._slow)
+        return {'statements': len(self._stats), 'calls': merged.calls,
+                'total_ms': round(merged.total_ms, 3), 'p95_ms': merged.percentile(95),
+                'slow': slow}
+
+    def reset(self):
+        """Forget all counters and the slow-query log"""
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3.Connection whose cursors report to a QueryTracer"""
+
+    tracer: QueryTracer
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracedCursor)
+
+    # The C implementations of these bypass cursor(), so route them through it
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Times execute calls and counts fetched rows against the statement"""
+
+    _stats: Optional[StatementStats] = None
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters, many=True)
+
+    def _timed(self, run, sql, parameters, many: bool = False):
+        tracer = self.connection.tracer
+        tracer._begin(sql)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = run(sql, parameters)
+            failed = False
+            return result
+        finally:
+            ms = (time.perf_counter() - started) * 1000.0
+            self._stats = tracer._record(self.connection, sql, None if many else parameters,
+                                         ms, failed, many)
+
+    def _fetched(self, rows: int, started: float):
+        if self._stats is not None:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self.connection.tracer._record_fetch(self._stats, rows, elapsed_ms)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, started)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows), started)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), started)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        row = super().__next__()
+        self._fetched(1, started)
+        return row
+
+
+def explain(con: sqlite3.Connection, sql: str, parameters=None) -> Optional[List[str]]:
+    """EXPLAIN QUERY PLAN lines for sql (indented by depth), or None if it has no plan"""
+    if sql.lstrip().upper().startswith(_NO_PLAN_PREFIXES):
+        return None
+    try:
+        # Plain cursor: the plan lookup itself is not traced
+        cur = sqlite3.Cursor(con)
+        rows = cur.execute(f"EXPLAIN QUERY PLAN {sql}", parameters or ()).fetchall()
+    except sqlite3.Error:
+        return None
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def trace_enabled() -> bool:
+    """True when TRACKER_DB_TRACE asks for tracing"""
+    return os.environ.get(TRACE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+_tracer: Optional[QueryTracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Optional[QueryTracer]:
+    """The process-wide tracer when tracing is enabled, else None"""
+    global _tracer
+    if _tracer is None and trace_enabled():
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = QueryTracer(float(os.environ.get(SLOW_MS_ENV) or DEFAULT_SLOW_MS))
+    return _tracer
+
+
+def connect(path, tracer: Optional[QueryTracer] = None, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect, traced when a tracer is given"""
+    if tracer is None:
+        return sqlite3.connect(path, **kwargs)
+    return tracer.connect(path, **kwargs)
@@ -0,0 +1,83 @@
+# app/records.py
+"""
+Session record type shared by the data layer, services, dashboards and
+table model.
+
+SessionRecord is a tuple with named fields (no per-instance dict), built
+straight from the cursor by a row factory, so a row is never re-mapped or
+copied on its way from SQLite to the table. It still indexes like the
+plain row tuples it replaces. Exports stream only their own columns as
+plain tuples (db.iter_session_chunks) and never build records.
+
+The row factory also interns the low-cardinality text columns (dates,
+names, status, ...) per query: a million rows then share a few thousand
+string objects instead of holding one copy each.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# Field order of every session row, as selected by db._SESSION_LIST_SQL
+SESSION_RECORD_FIELDS = ('id', 'date', 'language_code', 'type', 'canonical_name',
+                         'status', 'hours_spent', 'notes', 'tags', 'difficulty',
+                         'topic', 'points_awarded', 'progress_pct', 'item_id', 'target_hours')
+
+# Text columns with few distinct values; notes are left alone
+_INTERNED_FIELDS = ('date', 'language_code', 'type', 'canonical_name', 'status',
+                    'tags', 'difficulty', 'topic')
+
+
+class SessionRecord(namedtuple('_SessionRow', SESSION_RECORD_FIELDS)):
+    """One session row; fields by name (record.hours_spent) or position"""
+
+    __slots__ = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Field by name, like dict.get"""
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def as_dict(self, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Fields (all, or the given keys in that order) as a dict"""
+        if keys is None:
+            return dict(zip(self._fields, self))
+        return {key: getattr(self, key) for key in keys}
+
+    @classmethod
+    def blank(cls) -> "SessionRecord":
+        return _BLANK
+
+
+_FIELD_SET = frozenset(SESSION_RECORD_FIELDS)
+_BLANK = SessionRecord._make((None,) * len(SESSION_RECORD_FIELDS))
+_INTERNED_POSITIONS = tuple(SESSION_RECORD_FIELDS.index(f) for f in _INTERNED_FIELDS)
+
+
+def record_factory() -> Callable[[sqlite3.Cursor, tuple], SessionRecord]:
+    """
+    Row factory building SessionRecords from SESSION_RECORD_FIELDS-ordered
+    rows. Use a fresh one per query (cursor.row_factory = record_factory());
+    its intern table lives as long as the cursor.
+    """
+    interned: Dict[str, str] = {}
+    share = interned.setdefault
+    make = tuple.__new__
+    positions = _INTERNED_POSITIONS
+
+    def factory(cursor: sqlite3.Cursor, row: tuple) -> SessionRecord:
+        values = list(row)
+        for pos in positions:
+            value = values[pos]
+            if value is not None:
+                values[pos] = share(value, value)
+        return make(SessionRecord, values)
+
+    return factory
+
+
+def fetch_records(cursor: sqlite3.Cursor, sql: str, params: Sequence = ()) -> List[SessionRecord]:
+    """Run sql on cursor and return every row as an interned SessionRecord"""
+    cursor.row_factory = record_factory()
+    return cursor.execute(sql, params).fetchall()
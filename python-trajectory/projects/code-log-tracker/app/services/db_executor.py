@@ -0,0 +1,175 @@
+# app/services/db_executor.py
+"""
+Background executor for service calls - keeps SQLite off the GUI thread.
+
+Handles:
+- Running any service call on a QThreadPool worker
+- Delivering results/errors back on the GUI thread via signals
+- Coalescing identical in-flight calls that share a key
+- Superseding stale keyed calls (queued ones are dropped, running ones ignored)
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Qt, Signal, Slot
+
+# Worker threads for database calls; WAL readers run in parallel, writers queue on the lock
+DB_WORKER_THREADS = 2
+
+
+class DbTask(QObject):
+    """
+    Handle for one submitted call. Connect to `finished(result)` and
+    `failed(message)`; both fire on the thread that submitted the call.
+    """
+
+    finished = Signal(object)
+    failed = Signal(str)
+
+    _done = Signal(object, object)
+
+    def __init__(self, key: Optional[str], fn: Callable, args: Tuple, kwargs: Dict[str, Any],
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self._cancelled = threading.Event()
+        self._runnable: Optional[QRunnable] = None
+        self._done.connect(self._deliver, Qt.QueuedConnection)
+
+    def then(self, on_result: Callable[[Any], None],
+             on_error: Optional[Callable[[str], None]] = None) -> "DbTask":
+        """Connect result/error callbacks and return self for chaining."""
+        self.finished.connect(on_result)
+        if on_error:
+            self.failed.connect(on_error)
+        return self
+
+    def cancel(self):
+        """Drop the result; calls that accept a cancel callback also stop early."""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        """True once cancelled; safe to call from the worker thread."""
+        return self._cancelled.is_set()
+
+    def same_call(self, fn: Callable, args: Tuple, kwargs: Dict[str, Any]) -> bool:
+        """Whether this task runs the same call with the same arguments."""
+        return self.fn == fn and self.args == args and self.kwargs == kwargs
+
+    def _run(self):
+        """Worker-thread body."""
+        if self.is_cancelled():
+            self._done.emit(None, None)
+            return
+        try:
+            self._done.emit(self.fn(*self.args, **self.kwargs), None)
+        except Exception as e:
+            self._done.emit(None, e)
+
+    @Slot(object, object)
+    def _deliver(self, result: Any, error: Optional[Exception]):
+        """GUI-thread side: emit the outcome unless the task was cancelled."""
+        executor = self.parent()
+        if isinstance(executor, DbExecutor):
+            executor._task_done(self)
+        if self.is_cancelled():
+            return
+        if error is not None:
+            self.failed.emit(str(error))
+        else:
+            self.finished.emit(result)
+
+
+class _TaskRunnable(QRunnable):
+    """QRunnable wrapper so the pool can queue, run and drop tasks."""
+
+    def __init__(self, task: DbTask):
+        super().__init__()
+        self.task = task
+        self.setAutoDelete(False)
+
+    def run(self):
+        self.task._run()
+
+
+class DbExecutor(QObject):
+    """Runs service calls on a thread pool and reports back through DbTask signals."""
+
+    busyChanged = Signal(bool)
+
+    def __init__(self, parent: Optional[QObject] = None, max_threads: int = DB_WORKER_THREADS):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._keyed: Dict[str, DbTask] = {}
+        self._pending: set = set()
+
+    def submit(self, fn: Callable, *args: Any, key: Optional[str] = None,
+               cancellable: bool = False, **kwargs: Any) -> DbTask:
+        """
+        Run fn(*args, **kwargs) on a worker and return its DbTask.
+
+        With a key, an identical call already in flight under that key is
+        returned instead of starting a new one, and a different in-flight
+        call under the key is cancelled as stale. With cancellable=True,
+        fn also receives cancel=task.is_cancelled to poll.
+        """
+        if key is not None:
+            current = self._keyed.get(key)
+            if current is not None and not current.is_cancelled():
+                if current.same_call(fn, args, kwargs):
+                    return current
+                self._cancel_task(current)
+
+        task = DbTask(key, fn, args, dict(kwargs), parent=self)
+        if cancellable:
+            task.kwargs['cancel'] = task.is_cancelled
+        if key is not None:
+            self._keyed[key] = task
+
+        was_idle = not self._pending
+        self._pending.add(task)
+        task._runnable = _TaskRunnable(task)
+        self.pool.start(task._runnable)
+        if was_idle:
+            self.busyChanged.emit(True)
+        return task
+
+    def cancel(self, key: str):
+        """Cancel the in-flight call under key, if any."""
+        task = self._keyed.get(key)
+        if task is not None:
+            self._cancel_task(task)
+
+    def is_busy(self) -> bool:
+        return bool(self._pending)
+
+    def shutdown(self, timeout_ms: int = 3000) -> bool:
+        """Cancel everything queued and wait for running calls to finish."""
+        for task in list(self._pending):
+            self._cancel_task(task)
+        return self.pool.waitForDone(timeout_ms)
+
+    def _cancel_task(self, task: DbTask):
+        task.cancel()
+        if task.key is not None and self._keyed.get(task.key) is task:
+            del self._keyed[task.key]
+        # Not started yet: take it off the queue so it never touches the database
+        if task._runnable is not None and self.pool.tryTake(task._runnable):
+            self._task_done(task)
+
+    def _task_done(self, task: DbTask):
+        if task.key is not None and self._keyed.get(task.key) is task:
+            del self._keyed[task.key]
+        if task in self._pending:
+            self._pending.discard(task)
+            task._runnable = None
+            task.deleteLater()
+            if not self._pending:
+                self.busyChanged.emit(False)
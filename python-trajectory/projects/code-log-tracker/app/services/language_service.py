@@ -9,16 +9,18 @@ Handles:
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Mapping, Tuple, Optional
 
-from app.db import get_languages, load_language_pack
+from app.db import get_languages, load_language_pack, get_pack_matcher
+from app.keyword_matcher import PackMatcher, SUGGESTION_WEIGHTS
 
 
 class LanguageService:
     """Service for managing language packs and providing smart suggestions."""
 
     def __init__(self):
-        self.current_language_pack: Dict[str, Any] = {}
+        self.current_language_pack: Mapping[str, Any] = {}
+        self.pack_matcher: PackMatcher = PackMatcher({})
 
     def get_languages(self) -> List[Tuple[str, str, str]]:
         """Get list of available languages."""
@@ -31,6 +33,7 @@ class LanguageService:
         """Load language pack for the specified language."""
         try:
             self.current_language_pack = load_language_pack(language_code) or {}
+            self.pack_matcher = get_pack_matcher(language_code)
         except Exception as e:
             raise Exception(f"Failed to load language pack for {language_code}: {e}")
 
@@ -56,25 +59,24 @@ class LanguageService:
             return {}
 
         try:
-            text_lower = text.lower()
+            # Single pass over the text scores every topic and skill
+            scores = self.pack_matcher.scores(text, SUGGESTION_WEIGHTS)
             best_topic = ""
             best_difficulty = ""
             best_score = 0
 
-            # Analyze topics
-            for topic, topic_info in self.current_language_pack.get("topics", {}).items():
-                score = self._calculate_topic_score(topic, topic_info, text_lower)
-                if score > best_score:
-                    best_score = score
-                    best_topic = topic
-                    best_difficulty = topic_info.get("default_difficulty", "Beginner")
-
-            # Analyze skills (can override topic-based difficulty)
-            for skill_name, skill_info in self.current_language_pack.get("skills", {}).items():
-                score = self._calculate_skill_score(skill_name, skill_info, text_lower)
-                if score > best_score:
-                    best_score = score
-                    best_difficulty = skill_info.get("difficulty", best_difficulty)
+            topic = self.pack_matcher.best(scores, "topic")
+            if topic:
+                best_topic, best_score = topic
+                topic_info = self.current_language_pack.get("topics", {}).get(best_topic) or {}
+                best_difficulty = topic_info.get("default_difficulty", "Beginner")
+
+            # Skills can override topic-based difficulty
+            skill = self.pack_matcher.best(scores, "skill")
+            if skill and skill[1] > best_score:
+                best_score = skill[1]
+                skill_info = self.current_language_pack.get("skills", {}).get(skill[0]) or {}
+                best_difficulty = skill_info.get("difficulty", best_difficulty)
 
             result = {}
             if best_topic and best_score > 0:
@@ -88,55 +90,11 @@ class LanguageService:
             print(f"Warning: Text analysis failed: {e}")
             return {}
 
-    def _calculate_topic_score(self, topic: str, topic_info: Dict[str, Any], text: str) -> int:
-        """Calculate relevance score for a topic based on text content."""
-        score = 0
-        
-        # Direct topic name match
-        if topic.lower() in text:
-            score += 10
-        
-        # Check for topic keywords if available
-        keywords = topic_info.get("keywords", [])
-        for keyword in keywords:
-            if keyword.lower() in text:
-                score += 5
-        
-        # Check for topic aliases if available
-        aliases = topic_info.get("aliases", [])
-        for alias in aliases:
-            if alias.lower() in text:
-                score += 8
-        
-        return score
-
-    def _calculate_skill_score(self, skill_name: str, skill_info: Dict[str, Any], text: str) -> int:
-        """Calculate relevance score for a skill based on text content."""
-        score = 0
-        
-        # Direct skill name match
-        if skill_name.lower() in text:
-            score += 15
-        
-        # Check for skill keywords
-        keywords = skill_info.get("keywords", [])
-        for keyword in keywords:
-            if keyword.lower() in text:
-                score += 5
-        
-        # Check for skill patterns if available
-        patterns = skill_info.get("patterns", [])
-        for pattern in patterns:
-            if pattern.lower() in text:
-                score += 7
-        
-        return score
-
-    def get_topic_info(self, topic: str) -> Optional[Dict[str, Any]]:
+    def get_topic_info(self, topic: str) -> Optional[Mapping[str, Any]]:
         """Get detailed information about a specific topic."""
         return self.current_language_pack.get("topics", {}).get(topic)
 
-    def get_skill_info(self, skill: str) -> Optional[Dict[str, Any]]:
+    def get_skill_info(self, skill: str) -> Optional[Mapping[str, Any]]:
         """Get detailed information about a specific skill."""
         return self.current_language_pack.get("skills", {}).get(skill)
 
@@ -148,12 +106,12 @@ class LanguageService:
     def get_related_topics(self, topic: str) -> List[str]:
         """Get topics related to the specified topic."""
         topic_info = self.get_topic_info(topic)
-        return topic_info.get("related_topics", []) if topic_info else []
+        return list(topic_info.get("related_topics", [])) if topic_info else []
 
     def get_prerequisites(self, topic: str) -> List[str]:
         """Get prerequisites for a topic."""
         topic_info = self.get_topic_info(topic)
-        return topic_info.get("prerequisites", []) if topic_info else []
+        return list(topic_info.get("prerequisites", [])) if topic_info else []
 
     def validate_difficulty_for_topic(self, topic: str, difficulty: str) -> bool:
         """Check if a difficulty level is appropriate for a topic."""
@@ -4,44 +4,147 @@ Session Service - Business logic for managing learning sessions.
 
 Handles:
 - Session CRUD operations
+- Coalescing rapid inline edits (see app.services.write_buffer)
 - Item management and suggestions
 - Points calculation
-- Data export
+- Vectorized analytics over a columnar session cache (see app.session_cache)
+- Data export (streamed, see app.exporters)
+- Data import from CSV/Excel (chunked and validated, see app.importers)
+- Archiving old sessions to the archive database (see db.archive_sessions)
+- Duplicate session detection and cleanup (content hashes, see db.dedupe_sessions)
 """
 
 from __future__ import annotations
-import csv
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Callable, Iterable, List, Tuple, Optional
 
 from app.db import (
+    DuplicateSessionError,
     get_config,
     find_or_create_item,
     insert_or_update_session,
+    bulk_insert_sessions,
+    recompute_all_summaries,
+    archive_sessions,
+    dedupe_sessions,
     list_sessions,
+    list_sessions_page,
+    sessions_by_id,
+    sessions_with_tags,
+    get_stats_series,
+    get_tag_hours_by_week,
     search_items,
+    search,
     get_item_by_id,
-    connect,
-    update_item_summaries,
+    transaction,
+    apply_session_change,
 )
-from app.config.table_config import TableConfig
+from app.exporters import ExportCancelled, export_sessions
+from app.importers import ImportCancelled, import_sessions
+from app.records import SessionRecord
+from app.session_cache import SessionFrameCache
+from app.services.write_buffer import INLINE_WRITE_WINDOW, SessionWriteBuffer
 
 
 class SessionService:
     """Service for managing learning sessions and related data."""
 
-    def __init__(self):
+    def __init__(self, inline_write_window: float = INLINE_WRITE_WINDOW,
+                 inline_edits: Optional[SessionWriteBuffer] = None):
         self.config = get_config() or {}
+        # Inline cell edits are written behind; everything else flushes them first
+        self._inline_edits = inline_edits or SessionWriteBuffer(inline_write_window)
+        # Created on first analytics call (needs pandas)
+        self._analytics: Optional[SessionFrameCache] = None
 
-    def get_sessions(self, limit: int = 1000) -> List[tuple]:
+    def get_sessions(self, limit: int = 1000) -> List[SessionRecord]:
         """Get list of sessions for display."""
         try:
+            self._inline_edits.flush()
             return list_sessions(limit) or []
         except Exception as e:
             raise Exception(f"Failed to retrieve sessions: {e}")
 
-    def save_session(self, session_data: Dict[str, Any], editing_session_id: Optional[int] = None):
-        """Save a new or updated session with points calculation."""
+    def get_sessions_page(
+        self, limit: int = 200, cursor: Optional[str] = None, **filters: Any
+    ) -> Tuple[List[SessionRecord], Optional[str]]:
+        """Get one page of sessions and the cursor for the next page (None at the end)."""
         try:
+            self._inline_edits.flush()
+            return list_sessions_page(limit, cursor, **filters)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve sessions: {e}")
+
+    def get_sessions_by_ids(self, session_ids: Iterable[int]) -> List[SessionRecord]:
+        """Get the current rows of specific sessions (e.g. those a change feed reported)."""
+        try:
+            self._inline_edits.flush()
+            return sessions_by_id(session_ids)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve sessions: {e}")
+
+    def get_stats_series(self, period: str = "day", **filters: Any) -> List[Dict[str, Any]]:
+        """Get hours/points/session totals per day, week or month from the rollup."""
+        try:
+            self._inline_edits.flush()
+            return get_stats_series(period, **filters)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve stats: {e}")
+
+    def get_sessions_with_tags(
+        self, tags: Iterable[str], match: str = "all", limit: int = 200,
+        cursor: Optional[str] = None, **filters: Any
+    ) -> Tuple[List[SessionRecord], Optional[str]]:
+        """Get one page of sessions tagged with all (or any) of the given tags."""
+        try:
+            self._inline_edits.flush()
+            return sessions_with_tags(tags, match, limit, cursor, **filters)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve tagged sessions: {e}")
+
+    def get_tag_hours_by_week(
+        self, start: Optional[str] = None, end: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get hours and session counts per tag per week."""
+        try:
+            self._inline_edits.flush()
+            return get_tag_hours_by_week(start, end, tags)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve tag stats: {e}")
+
+    def get_session_totals(self, **filters: Any) -> Dict[str, Any]:
+        """Get session count, hours, points and average hours from the analytics cache."""
+        try:
+            self._inline_edits.flush()
+            return self._session_cache().totals(**filters)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve totals: {e}")
+
+    def get_analytics_series(
+        self, period: str = "week", group_by: Optional[str] = None, **filters: Any
+    ) -> List[Dict[str, Any]]:
+        """Get hours/points/session totals per period and group from the analytics cache."""
+        try:
+            self._inline_edits.flush()
+            return self._session_cache().series(period, group_by, **filters)
+        except Exception as e:
+            raise Exception(f"Failed to retrieve analytics: {e}")
+
+    def save_session(
+        self,
+        session_data: Dict[str, Any],
+        editing_session_id: Optional[int] = None,
+        allow_duplicate: bool = False,
+    ) -> int:
+        """
+        Save a new or updated session with points calculation and return its ID.
+
+        A new session repeating one already logged raises DuplicateSessionError
+        (with the logged session's id) unless allow_duplicate is set, so the UI
+        can ask before logging the same work twice.
+        """
+        try:
+            self._inline_edits.flush()
             # Calculate points
             points = self._calculate_points(
                 session_data.get("hours_spent", 0),
@@ -58,29 +161,75 @@ class SessionService:
             if editing_session_id:
                 full_data["id"] = editing_session_id
             
-            insert_or_update_session(full_data)
+            return insert_or_update_session(full_data, check_duplicate=not allow_duplicate)
             
+        except DuplicateSessionError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to save session: {e}")
 
+    def bulk_insert_sessions(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        chunk_size: int = 1000,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """Insert many sessions in one transaction and return counts and throughput."""
+        try:
+            self._inline_edits.flush()
+            return bulk_insert_sessions(rows, chunk_size=chunk_size, progress=progress)
+        except Exception as e:
+            raise Exception(f"Failed to bulk insert sessions: {e}")
+
+    def recompute_all_summaries(self) -> Dict[str, Any]:
+        """Recompute totals, streaks and projections of every item in one pass."""
+        try:
+            self._inline_edits.flush()
+            return recompute_all_summaries()
+        except Exception as e:
+            raise Exception(f"Failed to recompute summaries: {e}")
+
+    def archive_sessions(
+        self,
+        older_than_days: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """Move sessions older than the archive horizon to the archive database."""
+        try:
+            self._inline_edits.flush()
+            return archive_sessions(older_than_days, progress=progress)
+        except Exception as e:
+            raise Exception(f"Failed to archive sessions: {e}")
+
+    def dedupe_sessions(self, progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Remove duplicate sessions in short batches; run it through DbExecutor
+        to keep the UI responsive.
+        """
+        try:
+            self._inline_edits.flush()
+            return dedupe_sessions(progress=progress)
+        except Exception as e:
+            raise Exception(f"Failed to remove duplicate sessions: {e}")
+
     def delete_session(self, session_id: int):
         """Delete a session and update related summaries."""
         try:
-            with connect() as con:
+            self._inline_edits.flush()
+            with transaction() as con:
                 cur = con.cursor()
                 
-                # Get item_id before deletion for summary update
-                cur.execute("SELECT item_id FROM sessions WHERE id=?", (session_id,))
-                row = cur.fetchone()
-                item_id = row[0] if row else None
+                # Get item, date and hours before deletion for summary update
+                cur.execute("SELECT item_id, date, hours_spent FROM sessions WHERE id=?",
+                            (session_id,))
+                old = cur.fetchone()
                 
                 # Delete the session
                 cur.execute("DELETE FROM sessions WHERE id=?", (session_id,))
-                con.commit()
                 
-                # Update item summaries if needed
-                if item_id is not None:
-                    update_item_summaries(item_id)
+                # Take it out of the item summaries if needed
+                if old is not None:
+                    apply_session_change(old, None)
                     
         except Exception as e:
             raise Exception(f"Failed to delete session: {e}")
@@ -98,14 +247,34 @@ class SessionService:
             # Add points to data
             full_data = {**row_data, "points_awarded": points}
             
-            # Save updates
-            insert_or_update_session(full_data)
+            # Queue the update; edits to the same row within the window become one write
+            if full_data.get("id"):
+                self._inline_edits.add(full_data)
+            else:
+                insert_or_update_session(full_data)
             
             return points
             
         except Exception as e:
             raise Exception(f"Failed to update session: {e}")
 
+    def flush_inline_edits(self) -> int:
+        """Write pending inline edits now and return how many sessions were written."""
+        try:
+            return self._inline_edits.flush()
+        except Exception as e:
+            raise Exception(f"Failed to update session: {e}")
+
+    def close(self):
+        """Flush pending inline edits, stop the background writer and drop the analytics cache."""
+        try:
+            self._inline_edits.close()
+            if self._analytics is not None:
+                self._analytics.close()
+                self._analytics = None
+        except Exception as e:
+            raise Exception(f"Failed to update session: {e}")
+
     def find_or_create_item(self, language_code: str, item_type: str, work_item: str) -> Tuple[int, List[Dict[str, Any]]]:
         """Find or create an item, returning item_id and any suggestions."""
         try:
@@ -114,13 +283,25 @@ class SessionService:
         except Exception as e:
             raise Exception(f"Failed to find or create item: {e}")
 
-    def search_items(self, language_code: str, item_type: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search for existing items by language and type."""
+    def search_items(
+        self, language_code: str, item_type: str, limit: int = 20, query: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Search for existing items by language and type, optionally matching a name prefix."""
         try:
-            return search_items(language_code, item_type, limit) or []
+            return search_items(language_code, item_type, query=query, limit=limit) or []
         except Exception as e:
             raise Exception(f"Failed to search items: {e}")
 
+    def search(
+        self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over item names, aliases and session notes/tags/topics."""
+        try:
+            self._inline_edits.flush()
+            return search(query, filters, limit)
+        except Exception as e:
+            raise Exception(f"Failed to search: {e}")
+
     def get_item_by_id(self, item_id: int) -> Optional[Dict[str, Any]]:
         """Get item details by ID."""
         try:
@@ -128,23 +309,49 @@ class SessionService:
         except Exception as e:
             raise Exception(f"Failed to get item: {e}")
 
-    def export_to_csv(self, file_path: str) -> int:
+    def export_to_csv(self, file_path: str, **filters: Any) -> int:
         """Export sessions to CSV file and return count of exported sessions."""
+        return self.export_sessions(file_path, "csv", **filters)
+
+    def export_sessions(
+        self,
+        file_path: str,
+        fmt: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        cancel: Optional[Callable[[], bool]] = None,
+        **filters: Any,
+    ) -> int:
+        """Stream sessions to CSV, JSONL or Parquet (by fmt or extension) and return the count."""
         try:
-            sessions = self.get_sessions(100000)  # Get all sessions
-            
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(TableConfig.HEADERS)
-                
-                for session in sessions:
-                    row = self._format_session_for_export(session)
-                    writer.writerow(row)
-            
-            return len(sessions)
-            
+            self._inline_edits.flush()
+            return export_sessions(file_path, fmt, progress=progress, cancel=cancel, **filters)
+        except ExportCancelled:
+            raise
         except Exception as e:
-            raise Exception(f"Failed to export CSV: {e}")
+            raise Exception(f"Failed to export sessions: {e}")
+
+    def import_sessions(
+        self,
+        file_path: str,
+        fmt: Optional[str] = None,
+        reject_path: Optional[str] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        cancel: Optional[Callable[[], bool]] = None,
+    ) -> Dict[str, Any]:
+        """Import sessions from CSV or XLSX in one transaction; return counts and rejects."""
+        try:
+            self._inline_edits.flush()
+            return import_sessions(file_path, fmt, reject_path=reject_path, progress=progress,
+                                   cancel=cancel)
+        except ImportCancelled:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to import sessions: {e}")
+
+    def _session_cache(self) -> SessionFrameCache:
+        if self._analytics is None:
+            self._analytics = SessionFrameCache()
+        return self._analytics
 
     def _calculate_points(self, hours: float, difficulty: str, status: str) -> float:
         """Calculate points based on hours, difficulty, and status."""
@@ -157,22 +364,3 @@ class SessionService:
         except Exception as e:
             # Fallback to simple calculation
             return float(hours)
-
-    def _format_session_for_export(self, session: tuple) -> List[str]:
-        """Format a session tuple for CSV export."""
-        return [
-            session[0],           # ID
-            session[1],           # Date
-            session[2],           # Language
-            session[3],           # Type
-            session[4],           # Work Item Name
-            "",                   # Target Time (separate query if needed)
-            session[5],           # Status
-            session[6],           # Hours
-            session[7],           # Notes
-            session[8],           # Tags
-            session[9],           # Difficulty
-            session[10],          # Topic
-            session[11],          # Points
-            session[12],          # Progress %
-        ]
\ No newline at end of file
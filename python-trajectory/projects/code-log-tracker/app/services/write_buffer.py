@@ -0,0 +1,118 @@
+# app/services/write_buffer.py
+"""
+Write-behind buffer for rapid session edits.
+
+Handles:
+- Merging edits to the same session that arrive within a short window
+- Writing each window's edits in one transaction (app.db.update_sessions)
+- Flushing on a background thread when the window closes, or on demand
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.db import update_sessions
+
+# Seconds an edit may wait for more edits to the same row before it is written
+INLINE_WRITE_WINDOW = 0.5
+
+
+class SessionWriteBuffer:
+    """
+    Collects session edits and writes them in batches.
+
+    add() only records the edit; later edits to the same session overwrite
+    earlier fields. The window opens with the first pending edit and is
+    flushed when it closes, so no edit waits longer than `window` seconds.
+    flush() writes immediately (call it before reading sessions back).
+    A failed background flush is raised by the next add() or flush().
+    """
+
+    def __init__(self, window: float = INLINE_WRITE_WINDOW,
+                 writer: Callable[[Iterable[Dict[str, Any]]], List[int]] = update_sessions):
+        self.window = window
+        self._writer = writer
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._deadline: Optional[float] = None
+        self._error: Optional[Exception] = None
+        self._closed = False
+        self._cond = threading.Condition()
+        # Held across a whole flush so batches are written in the order they were taken
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, session_data: Dict[str, Any]):
+        """Queue an edit to an existing session (session_data needs its id)."""
+        session_id = session_data.get("id")
+        if not session_id:
+            raise ValueError("Buffered session edits need the session id")
+        with self._cond:
+            self._raise_pending_error()
+            if self._closed:
+                raise RuntimeError("Write buffer is closed")
+            merged = self._pending.get(session_id)
+            self._pending[session_id] = {**merged, **session_data} if merged else dict(session_data)
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.window
+                self._start_flusher()
+                self._cond.notify()
+
+    def pending(self) -> int:
+        """Number of sessions with unwritten edits."""
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write every pending edit now and return the number of sessions written."""
+        with self._flush_lock:
+            with self._cond:
+                self._raise_pending_error()
+                batch, self._pending = self._pending, {}
+                self._deadline = None
+            if batch:
+                self._writer(list(batch.values()))
+            return len(batch)
+
+    def close(self):
+        """Flush what is pending and stop the background flusher."""
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify()
+            if self._thread is not None:
+                self._thread.join()
+                self._thread = None
+
+    def _raise_pending_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _start_flusher(self):
+        # One long-lived thread keeps a single pooled connection for all flushes
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="session-write-buffer",
+                                            daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and self._deadline is None:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            try:
+                self.flush()
+            except Exception as e:
+                with self._cond:
+                    self._error = e
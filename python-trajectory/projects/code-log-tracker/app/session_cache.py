@@ -0,0 +1,344 @@
+# app/session_cache.py
+"""
+Columnar in-memory cache of the session history for analytics.
+
+Sessions, archived ones included (the cache's connection attaches the
+archive database once it exists and reads the all_sessions view), are
+loaded once into a pandas DataFrame: language, type, status and
+difficulty as categoricals, dates as datetime64 and hours/points as
+float32. Totals and per-period/per-group sums then run as vectorized
+operations on the frame instead of re-querying.
+
+Staleness is detected on the cache's own connection: PRAGMA data_version
+changes whenever another connection commits, which is every write the app
+makes. When it does, the change_log rows since the cached position (see
+app.change_log) name the sessions inserted, updated or deleted and the
+items touched. New sessions are appended; changed and deleted ones are
+dropped and re-read from all_sessions (a session moved to the archive
+reads back from there), as are the sessions of items whose language or
+type changed. A reset ChangeSet (no change_log, or one trimmed past the
+cached position) or changes to more than CACHE_PATCH_FRACTION of the rows
+reload the frame.
+"""
+
+from __future__ import annotations
+
+import threading
+from functools import reduce
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app import query_trace
+from app.change_log import ChangeSet, change_log_seq, read_changes
+from app.db import ARCHIVE_SCHEMA, create_history_views, default_archive_path, get_manager
+
+try:
+    import numpy as np
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+except ImportError:  # Analytics cache is optional
+    np = None
+    pd = None
+
+# Rows fetched per fetchmany step while loading
+CACHE_LOAD_CHUNK = 50000
+
+CACHE_COLUMNS = ('id', 'date', 'item_id', 'language_code', 'type', 'status',
+                 'difficulty', 'hours_spent', 'points_awarded')
+CACHE_CATEGORIES = ('language_code', 'type', 'status', 'difficulty')
+
+_CACHE_SQL = """
+    SELECT s.id, s.date, s.item_id, i.language_code, i.type, s.status,
+           s.difficulty, s.hours_spent, s.points_awarded
+    FROM all_sessions s
+    JOIN items i ON s.item_id = i.id
+"""
+
+# Ids per statement when re-reading changed sessions
+CACHE_PATCH_CHUNK = 500
+# Above this share of changed rows (and one chunk), reloading beats patching
+CACHE_PATCH_FRACTION = 0.25
+
+CACHE_PERIODS = ('day', 'week', 'month', 'all')
+CACHE_GROUPS = ('language_code', 'type', 'status', 'difficulty', 'item_id')
+
+
+def _require_pandas():
+    if pd is None:
+        raise RuntimeError("The session cache requires pandas and numpy")
+
+
+class SessionFrameCache:
+    """
+    Sessions as a DataFrame, refreshed on demand. Safe to share between
+    threads; every call checks for changes first, which costs one PRAGMA
+    when nothing changed.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, archive_path: Optional[Path] = None):
+        _require_pandas()
+        manager = get_manager()
+        self.db_path = Path(db_path or manager.db_path)
+        if archive_path is None:
+            same = self.db_path == manager.db_path
+            archive_path = manager.archive_path if same else default_archive_path(self.db_path)
+        self.archive_path = Path(archive_path)
+        self._lock = threading.Lock()
+        self._con = None
+        self._history: Optional[Tuple[str, ...]] = None
+        self._frame: Optional["pd.DataFrame"] = None
+        self._version: Optional[int] = None
+        self._seq = 0
+        # (language_code, type) per item, to tell which item updates move sessions between groups
+        self._items: Dict[int, Tuple[str, str]] = {}
+        self.loads = 0
+        self.appends = 0
+        self.updates = 0
+
+    # ---- Cache state ----
+    def frame(self) -> "pd.DataFrame":
+        """The current sessions frame (do not modify it in place)"""
+        with self._lock:
+            self._refresh()
+            return self._frame
+
+    def refresh(self) -> str:
+        """Bring the cache up to date; returns 'fresh', 'append', 'update' or 'load'"""
+        with self._lock:
+            return self._refresh()
+
+    def invalidate(self):
+        """Drop the cached frame; the next call reloads it"""
+        with self._lock:
+            self._frame = None
+
+    def close(self):
+        with self._lock:
+            self._frame = None
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+    # ---- Aggregations ----
+    def totals(self, **filters) -> Dict:
+        """sessions, hours, points and avg_hours over the filtered sessions"""
+        df = self._filtered(**filters)
+        # Accumulate in float64; the float32 columns only bound per-row precision
+        hours = float(df['hours_spent'].to_numpy().sum(dtype='float64'))
+        points = float(df['points_awarded'].to_numpy().sum(dtype='float64'))
+        sessions = len(df)
+        return {'sessions': sessions, 'hours': round(hours, 2), 'points': round(points, 2),
+                'avg_hours': round(hours / sessions, 2) if sessions else 0.0}
+
+    def series(self, period: str = 'week', group_by: Optional[str] = None, **filters) -> List[Dict]:
+        """
+        Hours, points and session counts per day/week/month (weeks start on
+        Monday), like db.get_stats_series; period='all' gives totals.
+        group_by splits each bucket by one of CACHE_GROUPS.
+        """
+        if period not in CACHE_PERIODS:
+            raise ValueError(f"Unknown period '{period}', expected one of {CACHE_PERIODS}")
+        if group_by is not None and group_by not in CACHE_GROUPS:
+            raise ValueError(f"Unknown group_by '{group_by}', expected one of {CACHE_GROUPS}")
+
+        df = self._filtered(**filters)
+        keys = {}
+        if period != 'all':
+            keys['period'] = _period_start(df['date'], period)
+        if group_by:
+            keys[group_by] = df[group_by]
+        values = pd.DataFrame({
+            'hours': df['hours_spent'].astype('float64'),
+            'points': df['points_awarded'].astype('float64'),
+            'sessions': np.ones(len(df), dtype='int64'),
+            **keys,
+        })
+        if not keys:
+            grouped = values[['hours', 'points', 'sessions']].sum().to_frame().T
+            grouped.insert(0, 'period', None)
+        else:
+            grouped = values.groupby(list(keys), observed=True, sort=True).sum().reset_index()
+            if 'period' in grouped:
+                grouped['period'] = grouped['period'].dt.strftime('%Y-%m-%d')
+            else:
+                grouped.insert(0, 'period', None)
+
+        series = []
+        for row in grouped.itertuples(index=False):
+            entry = {'period': row.period}
+            if group_by:
+                value = getattr(row, group_by)
+                entry[group_by] = int(value) if group_by == 'item_id' else value
+            entry.update({'hours': round(float(row.hours), 2),
+                          'points': round(float(row.points), 2),
+                          'sessions': int(row.sessions)})
+            series.append(entry)
+        return series
+
+    def _filtered(self, language_code: Optional[str] = None, item_type: Optional[str] = None,
+                  status: Optional[str] = None, difficulty: Optional[str] = None,
+                  item_id: Optional[int] = None, date_from: Optional[str] = None,
+                  date_to: Optional[str] = None) -> "pd.DataFrame":
+        df = self.frame()
+        mask = np.ones(len(df), dtype=bool)
+        for column, value in (('language_code', language_code), ('type', item_type),
+                              ('status', status), ('difficulty', difficulty), ('item_id', item_id)):
+            if value is not None:
+                mask &= (df[column] == value).to_numpy()
+        if date_from:
+            mask &= (df['date'] >= pd.Timestamp(date_from)).to_numpy()
+        if date_to:
+            mask &= (df['date'] <= pd.Timestamp(date_to)).to_numpy()
+        return df if mask.all() else df[mask]
+
+    # ---- Loading ----
+    def _connection(self):
+        if self._con is None:
+            # Dedicated connection: data_version only moves for other connections' commits
+            self._con = query_trace.connect(self.db_path, get_manager().tracer,
+                                            check_same_thread=False)
+            self._con.execute("PRAGMA query_only = ON")
+            self._history = None
+        return self._con
+
+    def _attach_history(self, con):
+        """Attach the archive once it exists and (re)create the all_sessions view over it"""
+        if self._history is not None and (
+                ARCHIVE_SCHEMA in self._history or not self.archive_path.exists()):
+            return
+        # The temp views are writes as far as query_only is concerned
+        con.execute("PRAGMA query_only = OFF")
+        try:
+            attached = any(row[1] == ARCHIVE_SCHEMA for row in con.execute("PRAGMA database_list"))
+            if not attached and self.archive_path.exists():
+                con.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(self.archive_path),))
+            self._history = create_history_views(con)
+        finally:
+            con.execute("PRAGMA query_only = ON")
+
+    def _refresh(self) -> str:
+        con = self._connection()
+        version = con.execute("PRAGMA data_version").fetchone()[0]
+        if self._frame is not None and version == self._version:
+            return 'fresh'
+
+        self._attach_history(con)
+        # One read transaction so the change_log position and rows agree
+        con.execute("BEGIN")
+        try:
+            if self._frame is None:
+                outcome = self._reload(con)
+            else:
+                changes = read_changes(con, self._seq)
+                outcome = self._reload(con) if changes.reset else self._apply(con, changes)
+        finally:
+            con.execute("COMMIT")
+        self._version = version
+        return outcome
+
+    def _reload(self, con) -> str:
+        self._seq = change_log_seq(con)
+        items = con.execute("SELECT id, language_code, type FROM items")
+        self._items = {row[0]: tuple(row[1:]) for row in items}
+        self._frame = self._load(con)
+        self.loads += 1
+        return 'load'
+
+    def _apply(self, con, changes: ChangeSet) -> str:
+        """Patch the frame with changes; returns the refresh outcome"""
+        sessions = changes.sessions
+        items = self._changed_items(con, changes.items)
+        if not sessions and not items:
+            self._seq = changes.seq
+            return 'fresh'
+        if len(sessions) > max(len(self._frame) * CACHE_PATCH_FRACTION, CACHE_PATCH_CHUNK):
+            return self._reload(con)
+
+        frame = self._frame
+        appended = not (items or changes.updated.get('session') or changes.deleted.get('session'))
+        if not appended:
+            stale = frame['id'].isin(list(sessions))
+            if items:
+                stale |= frame['item_id'].isin(items)
+            frame = frame[~stale.to_numpy()]
+        parts = [self._load(con, f"WHERE s.{column} IN ({','.join('?' * len(chunk))})", chunk)
+                 for column, ids in (('id', sorted(sessions)), ('item_id', sorted(items)))
+                 for chunk in _chunks(ids, CACHE_PATCH_CHUNK)]
+        # A changed session of a changed item comes back from both reads
+        added = reduce(_append_frames, parts).drop_duplicates('id')
+        self._frame = _append_frames(frame, added)
+        self._seq = changes.seq
+        if appended:
+            self.appends += 1
+            return 'append'
+        self.updates += 1
+        return 'update'
+
+    def _changed_items(self, con, ids) -> List[int]:
+        """Items among ids whose language or type differs from the cached one (or that are gone)"""
+        changed = []
+        for chunk in _chunks(sorted(ids), CACHE_PATCH_CHUNK):
+            rows = con.execute(f"SELECT id, language_code, type FROM items "
+                               f"WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            current = {row[0]: tuple(row[1:]) for row in rows}
+            for item_id in chunk:
+                if item_id in self._items and current.get(item_id) != self._items[item_id]:
+                    changed.append(item_id)
+                if item_id in current:
+                    self._items[item_id] = current[item_id]
+                else:
+                    self._items.pop(item_id, None)
+        return changed
+
+    @staticmethod
+    def _load(con, where: str = "", params: Tuple = ()) -> "pd.DataFrame":
+        cur = con.cursor()
+        try:
+            cur.execute(f"{_CACHE_SQL} {where} ORDER BY s.id", params)
+            rows = []
+            while True:
+                chunk = cur.fetchmany(CACHE_LOAD_CHUNK)
+                if not chunk:
+                    break
+                rows.extend(chunk)
+        finally:
+            cur.close()
+        return _to_frame(rows)
+
+
+def _to_frame(rows: List[Tuple]) -> "pd.DataFrame":
+    """Typed frame from _CACHE_SQL rows"""
+    columns = list(zip(*rows)) if rows else [()] * len(CACHE_COLUMNS)
+    data = dict(zip(CACHE_COLUMNS, columns))
+    frame = pd.DataFrame({
+        'id': np.asarray(data['id'], dtype='int64'),
+        'date': pd.to_datetime(pd.Series(data['date'], dtype='object'), format='%Y-%m-%d',
+                               errors='coerce'),
+        'item_id': np.asarray(data['item_id'], dtype='int64'),
+        **{c: pd.Categorical(data[c]) for c in CACHE_CATEGORIES},
+        'hours_spent': np.asarray(data['hours_spent'], dtype='float64').astype('float32'),
+        'points_awarded': np.nan_to_num(
+            np.asarray(data['points_awarded'], dtype='float64')).astype('float32'),
+    })
+    return frame
+
+
+def _chunks(ids: List[int], size: int) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _append_frames(frame: "pd.DataFrame", added: "pd.DataFrame") -> "pd.DataFrame":
+    """Concatenate keeping the categorical columns categorical"""
+    combined = pd.concat([frame, added], ignore_index=True)
+    for column in CACHE_CATEGORIES:
+        combined[column] = union_categoricals([frame[column], added[column]])
+    return combined
+
+
+def _period_start(dates: "pd.Series", period: str) -> "pd.Series":
+    if period == 'day':
+        return dates
+    if period == 'week':
+        return dates - pd.to_timedelta(dates.dt.weekday, unit='D')
+    return dates.dt.to_period('M').dt.start_time
@@ -5,5 +5,6 @@ Dashboard widgets package.
 
 from .dashboard_table import DashboardTable
 from .compact_form import CompactForm
+from .session_table_model import SessionTableModel
 
-__all__ = ["DashboardTable", "CompactForm"]
+__all__ = ["DashboardTable", "CompactForm", "SessionTableModel"]
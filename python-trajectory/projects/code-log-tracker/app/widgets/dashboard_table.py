@@ -4,7 +4,7 @@ Clean UI-only dashboard table with 14 columns ready for data connection.
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+from typing import List, Optional
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
@@ -13,6 +13,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
 
+from app.records import SessionRecord
+
 
 class DashboardTable(QWidget):
     """A clean table with 14 columns ready for data connection."""
@@ -26,8 +28,8 @@ class DashboardTable(QWidget):
             "Date", "Language", "Type", "Work Item Name", "Topic", "Difficulty",
             "Status", "Tags", "Hours", "Target Time", "Points", "Progress %", "ID", "Notes"
         ]
-        self.data: List[Dict[str, Any]] = []
-        self.filtered_data: List[Dict[str, Any]] = []
+        self.data: List[SessionRecord] = []
+        self.filtered_data: List[SessionRecord] = []
         self.setup_table()
 
     def setup_table(self):
@@ -91,10 +93,11 @@ class DashboardTable(QWidget):
         """Handle cell edits."""
         self.cellChanged.emit(row, col)
     
-    def load_data(self, data: List[Dict[str, Any]]):
-        """Load data into table."""
+    def load_data(self, data: List[SessionRecord]):
+        """Load session records into the table (shared, not copied)."""
         self.data = data
-        self.filtered_data = data.copy()
+        # Filtering builds a new list; until then both views share the rows
+        self.filtered_data = data
         self._refresh_table()
     
     def _refresh_table(self):
@@ -131,7 +134,7 @@ class DashboardTable(QWidget):
                 
                 self.table.setItem(row_idx, col_idx, item)
     
-    def get_selected_row_data(self) -> Optional[Dict[str, Any]]:
+    def get_selected_row_data(self) -> Optional[SessionRecord]:
         """Get selected row data."""
         current_row = self.table.currentRow()
         if 0 <= current_row < len(self.filtered_data):
@@ -0,0 +1,288 @@
+# app/widgets/session_table_model.py
+"""
+Virtualized session table model.
+
+Rows come from a paged source - fetch_page(cursor) -> (rows, next_cursor),
+the shape of the keyset session pages - and are pulled in as the view
+scrolls via canFetchMore/fetchMore. Only a bounded LRU set of pages is
+kept in memory; an evicted page is fetched again from its remembered
+cursor when it scrolls back into view, on the executor when there is
+one (its rows show blank until the page arrives). Cells are formatted
+in data(), so nothing is built for rows that are never painted.
+
+Rows are SessionRecords as the services return them; columns are
+TableConfig headers, each mapped to its record field.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from app.config.table_config import TableConfig
+from app.records import SessionRecord
+
+PageFetcher = Callable[[Optional[str]], Tuple[List[SessionRecord], Optional[str]]]
+
+# Row pages kept in memory at once
+DEFAULT_CACHED_PAGES = 20
+
+# Display format per key; other values are shown as text
+CELL_FORMATS: Dict[str, str] = {
+    "hours_spent": "{:.2f}",
+    "points_awarded": "{:.1f}",
+    "progress_pct": "{:.1f}%",
+    "target_hours": "{:.1f}",
+}
+
+_NUMERIC_KEYS = {"id", *CELL_FORMATS}
+
+
+def static_page_source(rows: List[SessionRecord], page_size: int = 200) -> PageFetcher:
+    """Page fetcher over rows already in memory (e.g. search results)."""
+    def fetch_page(cursor: Optional[str]) -> Tuple[List[SessionRecord], Optional[str]]:
+        start = int(cursor or 0)
+        end = start + page_size
+        return rows[start:end], (str(end) if end < len(rows) else None)
+    return fetch_page
+
+
+class SessionTableModel(QAbstractTableModel):
+    """Lazily fetched, page-cached table model over session records."""
+
+    def __init__(self, headers: Optional[Sequence[str]] = None,
+                 cached_pages: int = DEFAULT_CACHED_PAGES,
+                 executor=None, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers or TableConfig.HEADERS)
+        self.cached_pages = max(1, cached_pages)
+        self.executor = executor
+
+        keys = [TableConfig.get_key_for_header(h) for h in self.headers]
+        self._column_keys = keys
+        self._column_pos = [SessionRecord._fields.index(key) for key in keys]
+        self._column_formats = [CELL_FORMATS.get(key) for key in keys]
+
+        self._fetch: Optional[PageFetcher] = None
+        self._generation = 0
+        self._fetch_key = f"fetch-more-{id(self)}"
+        self._reset_state()
+
+    def _reset_state(self):
+        self._page_cursors: List[Optional[str]] = []
+        self._page_starts: List[int] = []
+        self._pages: "OrderedDict[int, List[SessionRecord]]" = OrderedDict()
+        self._row_count = 0
+        self._next_cursor: Optional[str] = None
+        self._exhausted = True
+        self._fetching = False
+        # Evicted pages being fetched again -> the blank rows shown meanwhile
+        self._refetching: Dict[int, List[SessionRecord]] = {}
+
+    # ---- Source management ----
+    def set_source(self, fetch_page: Optional[PageFetcher],
+                   first_page: Optional[Tuple[List[tuple], Optional[str]]] = None):
+        """Switch to a new row source, optionally with its first page already fetched."""
+        self.beginResetModel()
+        self._generation += 1
+        if self.executor is not None:
+            self.executor.cancel(self._fetch_key)
+            for page_index in self._refetching:
+                self.executor.cancel(self._page_key(page_index))
+        self._fetch = fetch_page
+        self._reset_state()
+        self._exhausted = fetch_page is None
+        if first_page is not None:
+            self._store_page(None, *first_page)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_source(None)
+
+    # ---- Qt model API ----
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            value = self._row(index.row())[self._column_pos[column]]
+            return self._format(value, self._column_formats[column])
+        if role == Qt.EditRole:
+            return self._row(index.row())[self._column_pos[column]]
+        if role == Qt.TextAlignmentRole and self._column_keys[column] in _NUMERIC_KEYS:
+            return Qt.AlignRight | Qt.AlignVCenter
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted and not self._fetching
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        cursor = self._next_cursor
+        if self.executor is None:
+            self._append_page(cursor, *self._fetch(cursor))
+            return
+
+        # Fetch on a worker; a reset in the meantime makes the result stale
+        self._fetching = True
+        generation = self._generation
+        self.executor.submit(self._fetch, cursor, key=self._fetch_key).then(
+            lambda page: self._on_page_fetched(generation, cursor, page),
+            lambda message: self._on_fetch_failed(generation, message),
+        )
+
+    def update_rows(self, rows: Iterable[SessionRecord]) -> bool:
+        """
+        Replace cached rows that share an id with one of rows and repaint them.
+
+        Rows on pages not in memory are picked up when the page is fetched
+        again. Returns False if a row's date changed, i.e. it may belong
+        elsewhere in the date ordering and the caller should reload.
+        """
+        fresh = {row.id: row for row in rows}
+        in_place = True
+        for page_index, page in self._pages.items():
+            for offset, row in enumerate(page):
+                new = fresh.get(row.id)
+                if new is None or row.id is None:
+                    continue
+                page[offset] = new
+                in_place &= new.date == row.date
+                position = self._page_starts[page_index] + offset
+                self.dataChanged.emit(self.index(position, 0),
+                                      self.index(position, len(self.headers) - 1))
+        return in_place
+
+    # ---- Row access ----
+    def record(self, row: int) -> SessionRecord:
+        """The session record shown in a row (fields unformatted)."""
+        return self._row(row)
+
+    def _row(self, row: int) -> SessionRecord:
+        page_index = bisect_right(self._page_starts, row) - 1
+        return self._page(page_index)[row - self._page_starts[page_index]]
+
+    def _page(self, page_index: int) -> List[SessionRecord]:
+        rows = self._pages.get(page_index)
+        if rows is not None:
+            self._pages.move_to_end(page_index)
+            return rows
+        # Evicted: fetch it again from its cursor (one indexed keyset query)
+        cursor = self._page_cursors[page_index]
+        if self.executor is None:
+            return self._refill_page(page_index, self._fetch(cursor)[0])
+
+        # On a worker like fetchMore; blank rows until it lands and repaints
+        blanks = self._refetching.get(page_index)
+        if blanks is None:
+            blanks = [SessionRecord.blank()] * self._page_size(page_index)
+            self._refetching[page_index] = blanks
+            generation = self._generation
+            self.executor.submit(self._fetch, cursor, key=self._page_key(page_index)).then(
+                lambda page: self._on_page_refetched(generation, page_index, page),
+                lambda message: self._on_refetch_failed(generation, page_index, message),
+            )
+        return blanks
+
+    def _page_key(self, page_index: int) -> str:
+        return f"{self._fetch_key}-page-{page_index}"
+
+    def _refill_page(self, page_index: int, rows: List[SessionRecord]) -> List[SessionRecord]:
+        expected = self._page_size(page_index)
+        rows = (list(rows) + [SessionRecord.blank()] * expected)[:expected]
+        self._cache(page_index, rows)
+        return rows
+
+    def _page_size(self, page_index: int) -> int:
+        if page_index + 1 < len(self._page_starts):
+            return self._page_starts[page_index + 1] - self._page_starts[page_index]
+        return self._row_count - self._page_starts[page_index]
+
+    # ---- Page bookkeeping ----
+    def _on_page_fetched(self, generation: int, cursor: Optional[str], page):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        self._append_page(cursor, *page)
+
+    def _on_fetch_failed(self, generation: int, message: str):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        self._exhausted = True
+        print(f"Error fetching sessions: {message}")
+
+    def _on_page_refetched(self, generation: int, page_index: int, page):
+        if generation != self._generation:
+            return
+        self._refetching.pop(page_index, None)
+        rows = self._refill_page(page_index, page[0])
+        first = self._page_starts[page_index]
+        self.dataChanged.emit(self.index(first, 0),
+                              self.index(first + len(rows) - 1, len(self.headers) - 1))
+
+    def _on_refetch_failed(self, generation: int, page_index: int, message: str):
+        if generation != self._generation:
+            return
+        self._refetching.pop(page_index, None)
+        # Keep the blanks until the page is evicted, rather than retry on every paint
+        self._refill_page(page_index, [])
+        print(f"Error fetching sessions: {message}")
+
+    def _append_page(self, cursor: Optional[str], rows: List[SessionRecord],
+                     next_cursor: Optional[str]):
+        if not rows:
+            self._exhausted = True
+            return
+        start = self._row_count
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._store_page(cursor, rows, next_cursor)
+        self.endInsertRows()
+
+    def _store_page(self, cursor: Optional[str], rows: List[SessionRecord],
+                    next_cursor: Optional[str]):
+        if rows:
+            page_index = len(self._page_cursors)
+            self._page_cursors.append(cursor)
+            self._page_starts.append(self._row_count)
+            self._row_count += len(rows)
+            self._cache(page_index, list(rows))
+        self._next_cursor = next_cursor
+        self._exhausted = next_cursor is None or not rows
+
+    def _cache(self, page_index: int, rows: List[SessionRecord]):
+        self._pages[page_index] = rows
+        self._pages.move_to_end(page_index)
+        while len(self._pages) > self.cached_pages:
+            self._pages.popitem(last=False)
+
+    @staticmethod
+    def _format(value: Any, fmt: Optional[str]) -> str:
+        if value is None:
+            return ""
+        if fmt:
+            try:
+                return fmt.format(float(value))
+            except (TypeError, ValueError):
+                pass
+        return str(value)
@@ -5,6 +5,7 @@ Clean UI-only PySide6 dashboard ready for emitter connections:
 - Placeholder data removed
 - Ready to connect to external emitters/controllers
 - All UI styling and layout preserved
+- Database calls run off the GUI thread (app.services.db_executor)
 
 Run:  python clean_ui_pyside6.py
 Requires: PySide6
@@ -15,13 +16,21 @@ from __future__ import annotations
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QSplitter, QFrame, QStatusBar,
-    QTableWidget, QTableWidgetItem, QLineEdit, QComboBox, QSpinBox,
+    QTableView, QAbstractItemView, QLineEdit, QComboBox, QSpinBox,
     QSizePolicy, QDateEdit, QDoubleSpinBox, QGridLayout, QGroupBox,
-    QCompleter
+    QCompleter, QFileDialog, QMessageBox
 )
 from PySide6.QtCore import Qt, QTimer, QDate, Signal
 from PySide6.QtGui import QStandardItemModel, QStandardItem
 
+from app import backup
+from app.change_feed import ChangeFeed
+from app.query_trace import get_tracer
+from app.widgets.session_table_model import SessionTableModel, static_page_source
+
+# Rows per page pulled into the table as it scrolls
+TABLE_PAGE_SIZE = 200
+
 # ---------------------------
 # Embedded CompactForm (UI-only)
 # ---------------------------
@@ -394,8 +403,8 @@ class CompactForm(QWidget):
 # Clean DashboardTable (UI-only)
 # ---------------------------
 class DashboardTable(QWidget):
-    """A clean table with 14 columns ready for data connection."""
-    def __init__(self, parent=None):
+    """A clean, virtualized table with 14 columns; rows are paged in as it scrolls."""
+    def __init__(self, executor=None, parent=None):
         super().__init__(parent)
         self.columns = [
             "Date", "Language", "Type", "Work Item Name", "Topic", "Difficulty",
@@ -407,8 +416,12 @@ class DashboardTable(QWidget):
         root.setSpacing(0)
 
         # Table
-        self.table = QTableWidget(0, len(self.columns))
-        self.table.setHorizontalHeaderLabels(self.columns)
+        self.model = SessionTableModel(self.columns, executor=executor, parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().setDefaultSectionSize(24)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(False)
         self.table.verticalHeader().setVisible(False)
@@ -428,12 +441,17 @@ class DashboardWindow(QMainWindow):
 
         # Import simplified services
         from simple_db import SimpleSessionService, SimpleLanguageService, init_simple_db
+        from app.services.db_executor import DbExecutor
         
         # Initialize simple database and services
         init_simple_db()
         self.session_service = SimpleSessionService()
         self.language_service = SimpleLanguageService()
         self.editing_session_id = None
+        
+        # All database calls run on worker threads; results come back as signals
+        self.db = DbExecutor(self)
+        self._reload_task = None
 
         self._create_toolbar()
         self._create_status_bar()
@@ -456,28 +474,58 @@ class DashboardWindow(QMainWindow):
         self.add_btn = QPushButton("➕ Add")
         self.save_btn = QPushButton("💾 Save")
         self.cancel_btn = QPushButton("↩️ Cancel")
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search items, notes, tags…")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setFixedSize(260, 34)
         self.clear_filters_btn = QPushButton("🔍 Clear Filters")
         self.delete_btn = QPushButton("🗑️ Delete")
+        self.backup_btn = QPushButton("🗄️ Backup")
+        self.restore_btn = QPushButton("♻️ Restore")
 
-        for b in (self.add_btn, self.save_btn, self.cancel_btn, self.clear_filters_btn, self.delete_btn):
+        for b in (self.add_btn, self.save_btn, self.cancel_btn, self.clear_filters_btn,
+                  self.delete_btn, self.backup_btn, self.restore_btn):
             b.setFixedHeight(34)
 
         hl.addWidget(self.add_btn)
         hl.addWidget(self.save_btn)
         hl.addWidget(self.cancel_btn)
         hl.addStretch(1)
+        hl.addWidget(self.search_box)
         hl.addWidget(self.clear_filters_btn)
         hl.addWidget(self.delete_btn)
+        hl.addWidget(self.backup_btn)
+        hl.addWidget(self.restore_btn)
 
     # ---- Status bar ----
     def _create_status_bar(self):
         self.status = QStatusBar()
         self.setStatusBar(self.status)
         self.records_label = QLabel("📊 Records: 0")
+        self.hours_label = QLabel("")
         self.status_label = QLabel("")
+        self.status.addPermanentWidget(self.hours_label)
         self.status.addPermanentWidget(self.records_label)
         self.status.addWidget(self.status_label, 1)
 
+        # Query stats readout, only when TRACKER_DB_TRACE is set
+        self.tracer = get_tracer()
+        if self.tracer is not None:
+            self.query_stats_label = QLabel("")
+            self.status.addPermanentWidget(self.query_stats_label)
+            self.query_stats_timer = QTimer(self)
+            self.query_stats_timer.setInterval(1000)
+            self.query_stats_timer.timeout.connect(self._update_query_stats)
+            self.query_stats_timer.start()
+
+    def _update_query_stats(self):
+        """Show statement count, p95 latency and slow queries from the tracer."""
+        summary = self.tracer.summary()
+        self.query_stats_label.setText(
+            f"🗄️ {summary['calls']} queries · p95 ≤{summary['p95_ms']:g} ms"
+            f" · {summary['slow']} slow"
+        )
+
     # ---- Central layout ----
     def _build_layout(self):
         central = QWidget()
@@ -491,7 +539,7 @@ class DashboardWindow(QMainWindow):
         splitter.setChildrenCollapsible(False)
 
         # Top: table
-        self.table = DashboardTable()
+        self.table = DashboardTable(executor=self.db)
         splitter.addWidget(self.table)
 
         # Bottom: compact form
@@ -513,6 +561,35 @@ class DashboardWindow(QMainWindow):
         self.cancel_btn.clicked.connect(self._cancel_edit)
         self.delete_btn.clicked.connect(self._delete_session)
         self.clear_filters_btn.clicked.connect(self._clear_filters)
+        self.backup_btn.clicked.connect(self._backup_now)
+        self.restore_btn.clicked.connect(self._restore_backup)
+        
+        # Scheduled snapshots: check hourly, back up when the newest is a day old
+        from simple_db import DB_PATH
+        self.backups = backup.BackupScheduler(DB_PATH)
+        self.backup_timer = QTimer(self)
+        self.backup_timer.setInterval(60 * 60 * 1000)
+        self.backup_timer.timeout.connect(self._run_scheduled_backup)
+        self.backup_timer.start()
+        QTimer.singleShot(0, self._run_scheduled_backup)
+        
+        # Writes from other processes: poll the change feed and patch the changed rows
+        self.changes = ChangeFeed(DB_PATH)
+        self._own_writes = set()
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(1000)
+        self.change_timer.timeout.connect(self._poll_changes)
+        self.change_timer.start()
+        
+        # Search reloads once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self._reload_table)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        
+        # Busy indicator while the database works
+        self.db.busyChanged.connect(self._on_busy_changed)
         
         # Form data change tracking
         for field_name, widget in self.form.inputs.items():
@@ -526,7 +603,8 @@ class DashboardWindow(QMainWindow):
                 widget.dateChanged.connect(self._on_form_changed)
         
         # Table selection
-        self.table.table.itemSelectionChanged.connect(self._on_selection_changed)
+        self.table.table.selectionModel().currentRowChanged.connect(
+            lambda *_: self._on_selection_changed())
         
         # Initially disable editing buttons
         self.save_btn.setEnabled(False)
@@ -534,62 +612,69 @@ class DashboardWindow(QMainWindow):
         self.delete_btn.setEnabled(False)
     
     def _load_initial_data(self):
-        """Load languages and table data."""
-        try:
-            # Load languages into form
-            languages = self.language_service.get_languages()
-            language_combo = self.form.inputs.get("language")
-            if language_combo:
-                language_combo.clear()
-                for code, name, _color in languages:
-                    language_combo.addItem(name, code)
-            
-            # Load table data
-            self._reload_table()
-            
-        except Exception as e:
-            print(f"Error loading initial data: {e}")
+        """Load languages and table data in the background."""
+        self.db.submit(self.language_service.get_languages, key="languages").then(
+            self._populate_languages,
+            lambda message: print(f"Error loading initial data: {message}"),
+        )
+        self._reload_table()
+    
+    def _populate_languages(self, languages):
+        """Fill the language combo once languages arrive."""
+        language_combo = self.form.inputs.get("language")
+        if language_combo:
+            language_combo.clear()
+            for code, name, _color in languages:
+                language_combo.addItem(name, code)
     
     def _reload_table(self):
-        """Reload table data from database."""
-        try:
-            sessions = self.session_service.get_sessions()
-            
-            # Clear and populate table
-            self.table.table.setRowCount(len(sessions))
-            
-            for row_idx, session in enumerate(sessions):
-                # Map session tuple to table columns  
-                session_data = [
-                    session[1],  # Date
-                    session[2],  # Language
-                    session[3],  # Type  
-                    session[4],  # Work Item Name
-                    session[5],  # Topic
-                    session[6],  # Difficulty
-                    session[7],  # Status
-                    session[8],  # Tags
-                    f"{float(session[9]):.2f}",  # Hours
-                    f"{float(session[10]):.1f}",  # Target Time
-                    f"{float(session[11]):.1f}",  # Points
-                    f"{float(session[12]):.1f}%",  # Progress %
-                    str(session[0]),  # ID
-                    session[13]   # Notes
-                ]
-                
-                # Fill table row
-                for col_idx, value in enumerate(session_data):
-                    item = QTableWidgetItem(str(value))
-                    self.table.table.setItem(row_idx, col_idx, item)
-            
-            self.records_label.setText(f"📊 Records: {len(sessions)}")
-            
-        except Exception as e:
-            print(f"Error loading sessions: {e}")
+        """Reload table data from database without blocking the window."""
+        query = self.search_box.text().strip()
+        task = self.db.submit(self._load_first_page, query, key="reload")
+        
+        # Same reload already in flight: it will fill the table when it lands
+        if task is self._reload_task:
+            return
+        self._reload_task = task
+        task.then(self._populate_table, lambda message: print(f"Error loading sessions: {message}"))
+    
+    def _load_first_page(self, query: str):
+        """Worker-thread body of a reload: (page source, first page, total rows, hour totals)."""
+        service = self.session_service
+        # Totals come from the daily_stats rollup, so they cost the same however long the history
+        overall = service.get_stats_series("all")
+        today = QDate.currentDate()
+        monday = today.addDays(1 - today.dayOfWeek()).toString("yyyy-MM-dd")
+        week = service.get_stats_series("all", start=monday)
+        hours = (overall[0]["hours"] if overall else 0.0, week[0]["hours"] if week else 0.0)
+        if query:
+            rows = service.search_sessions(query)
+            fetch_page = static_page_source(rows, TABLE_PAGE_SIZE)
+            total = len(rows)
+        else:
+            fetch_page = lambda cursor: service.get_sessions_page(TABLE_PAGE_SIZE, cursor)
+            total = overall[0]["sessions"] if overall else 0
+        return fetch_page, fetch_page(None), total, hours
+    
+    def _refresh_after_write(self):
+        """Reload with a fresh query; an in-flight reload may predate the write."""
+        self.db.cancel("reload")
+        self._reload_table()
+    
+    def _populate_table(self, loaded):
+        """Point the table model at a fresh source; further pages load as it scrolls."""
+        fetch_page, first_page, total, (total_hours, week_hours) = loaded
+        self.table.model.set_source(fetch_page, first_page)
+        self.records_label.setText(f"📊 Records: {total}")
+        self.hours_label.setText(f"⏱️ {week_hours:.1f}h this week · {total_hours:.1f}h total")
+    
+    def _on_busy_changed(self, busy: bool):
+        """Show a working indicator while database calls are in flight."""
+        self.setCursor(Qt.BusyCursor if busy else Qt.ArrowCursor)
     
     def _on_selection_changed(self):
         """Handle table selection changes."""
-        current_row = self.table.table.currentRow()
+        current_row = self.table.table.currentIndex().row()
         if current_row >= 0:
             self.delete_btn.setEnabled(True)
             self._populate_form_from_table(current_row)
@@ -599,55 +684,34 @@ class DashboardWindow(QMainWindow):
     
     def _populate_form_from_table(self, row_idx: int):
         """Populate form with data from selected table row."""
-        # Get data from table
-        if row_idx < self.table.table.rowCount():
-            date_item = self.table.table.item(row_idx, 0)
-            lang_item = self.table.table.item(row_idx, 1)
-            type_item = self.table.table.item(row_idx, 2)
-            work_item = self.table.table.item(row_idx, 3)
-            topic_item = self.table.table.item(row_idx, 4)
-            diff_item = self.table.table.item(row_idx, 5)
-            status_item = self.table.table.item(row_idx, 6)
-            tags_item = self.table.table.item(row_idx, 7)
-            hours_item = self.table.table.item(row_idx, 8)
-            target_item = self.table.table.item(row_idx, 9)
-            id_item = self.table.table.item(row_idx, 12)
-            notes_item = self.table.table.item(row_idx, 13)
-            
-            # Populate form
-            if date_item:
-                date = QDate.fromString(date_item.text(), "yyyy-MM-dd")
-                self.form.inputs["date"].setDate(date)
-            if lang_item:
-                self.form.inputs["language"].setCurrentText(lang_item.text())
-            if type_item:
-                self.form.inputs["type"].setCurrentText(type_item.text())
-            if work_item:
-                self.form.inputs["work_item"].setCurrentText(work_item.text())
-            if status_item:
-                self.form.inputs["status"].setCurrentText(status_item.text())
-            if topic_item:
-                self.form.inputs["topic"].setCurrentText(topic_item.text())
-            if diff_item:
-                self.form.inputs["difficulty"].setCurrentText(diff_item.text())
-            if hours_item:
-                try:
-                    self.form.inputs["hours"].setValue(float(hours_item.text()))
-                except ValueError:
-                    pass
-            if target_item:
-                try:
-                    self.form.inputs["target_time"].setValue(float(target_item.text()))
-                except ValueError:
-                    pass
-            if tags_item:
-                self.form.inputs["tags"].setCurrentText(tags_item.text())
-            if notes_item:
-                self.form.inputs["notes"].setText(notes_item.text())
-            
-            # Set editing mode
-            if id_item:
-                self.editing_session_id = int(id_item.text())
+        if not 0 <= row_idx < self.table.model.rowCount():
+            return
+        values = self.table.model.record(row_idx)
+        
+        def text(key):
+            value = values.get(key)
+            return "" if value is None else str(value)
+        
+        # Populate form
+        if values.get("date"):
+            self.form.inputs["date"].setDate(QDate.fromString(text("date"), "yyyy-MM-dd"))
+        self.form.inputs["language"].setCurrentText(text("language_code"))
+        self.form.inputs["type"].setCurrentText(text("type"))
+        self.form.inputs["work_item"].setCurrentText(text("canonical_name"))
+        self.form.inputs["status"].setCurrentText(text("status"))
+        self.form.inputs["topic"].setCurrentText(text("topic"))
+        self.form.inputs["difficulty"].setCurrentText(text("difficulty"))
+        for key, field in (("hours_spent", "hours"), ("target_hours", "target_time")):
+            try:
+                self.form.inputs[field].setValue(float(values.get(key) or 0))
+            except (TypeError, ValueError):
+                pass
+        self.form.inputs["tags"].setCurrentText(text("tags"))
+        self.form.inputs["notes"].setText(text("notes"))
+        
+        # Set editing mode
+        if values.get("id") is not None:
+            self.editing_session_id = int(values["id"])
     
     def _on_form_changed(self):
         """Handle form data changes."""
@@ -691,30 +755,44 @@ class DashboardWindow(QMainWindow):
                 self.status_label.setText("Hours must be greater than 0")
                 return
             
-            # Find or create item and save session
-            item_id, suggestions = self.session_service.find_or_create_item(
-                db_data['language_code'], db_data['type'], db_data['canonical_name']
-            )
-            db_data['item_id'] = item_id
-            
-            session_id = self.session_service.save_session(db_data, self.editing_session_id)
-            
-            # Success feedback
-            if self.editing_session_id:
-                self.status_label.setText(f"Session #{session_id} updated")
-            else:
-                self.status_label.setText(f"Session #{session_id} saved")
-            
-            # Refresh and reset
-            self._reload_table()
-            self.form.clear_form()
-            self.editing_session_id = None
+            # Find or create item and save session on a worker
+            editing = self.editing_session_id
             self.save_btn.setEnabled(False)
-            self.cancel_btn.setEnabled(False)
+            self.status_label.setText("Saving…")
+            self.db.submit(self._write_session, db_data, editing).then(
+                lambda session_id: self._on_session_saved(session_id, editing),
+                self._on_save_failed,
+            )
             
         except Exception as e:
             self.status_label.setText(f"Save failed: {e}")
     
+    def _write_session(self, db_data, editing_session_id):
+        """Worker-thread body of a save: resolve the item, then write the session."""
+        item_id, _suggestions = self.session_service.find_or_create_item(
+            db_data['language_code'], db_data['type'], db_data['canonical_name']
+        )
+        return self.session_service.save_session({**db_data, 'item_id': item_id},
+                                                 editing_session_id)
+    
+    def _on_session_saved(self, session_id, editing_session_id):
+        """Success feedback, then refresh and reset."""
+        self._own_writes.add(session_id)
+        if editing_session_id:
+            self.status_label.setText(f"Session #{session_id} updated")
+        else:
+            self.status_label.setText(f"Session #{session_id} saved")
+        
+        self._refresh_after_write()
+        self.form.clear_form()
+        self.editing_session_id = None
+        self.save_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(False)
+    
+    def _on_save_failed(self, message):
+        self.status_label.setText(f"Save failed: {message}")
+        self.save_btn.setEnabled(True)
+    
     def _cancel_edit(self):
         """Cancel current edit."""
         self.form.clear_form()
@@ -725,28 +803,123 @@ class DashboardWindow(QMainWindow):
     
     def _delete_session(self):
         """Delete selected session."""
-        current_row = self.table.table.currentRow()
+        current_row = self.table.table.currentIndex().row()
         if current_row >= 0:
-            # Get session ID from table
-            id_item = self.table.table.item(current_row, self.table.columns.index("ID"))
-            if id_item:
-                session_id = int(id_item.text())
-                try:
-                    self.session_service.delete_session(session_id)
-                    self.status_label.setText(f"Session #{session_id} deleted")
-                    self._reload_table()
-                    self.form.clear_form()
-                    self.editing_session_id = None
-                    self.delete_btn.setEnabled(False)
-                    self.save_btn.setEnabled(False)
-                    self.cancel_btn.setEnabled(False)
-                except Exception as e:
-                    self.status_label.setText(f"Delete failed: {e}")
+            # Get session ID from the model
+            session_id = self.table.model.record(current_row).id
+            if session_id is not None:
+                self.delete_btn.setEnabled(False)
+                self.db.submit(self.session_service.delete_session, session_id).then(
+                    lambda _result: self._on_session_deleted(session_id),
+                    lambda message: self.status_label.setText(f"Delete failed: {message}"),
+                )
+    
+    def _on_session_deleted(self, session_id):
+        self._own_writes.add(session_id)
+        self.status_label.setText(f"Session #{session_id} deleted")
+        self._refresh_after_write()
+        self.form.clear_form()
+        self.editing_session_id = None
+        self.delete_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(False)
+    
+    def _backup_now(self):
+        """Take a snapshot in the background."""
+        self.backup_btn.setEnabled(False)
+        self.status_label.setText("Backing up…")
+        self.db.submit(backup.create_snapshot, self.backups.db_path, key="backup").then(
+            self._on_backup_done, self._on_backup_failed
+        )
+    
+    def _run_scheduled_backup(self):
+        self.db.submit(self.backups.run_pending, key="scheduled-backup").then(
+            lambda path: path and self._on_backup_done(path), self._on_backup_failed
+        )
+    
+    def _on_backup_done(self, path):
+        self.backup_btn.setEnabled(True)
+        self.status_label.setText(f"Backup saved: {path.name}")
+    
+    def _on_backup_failed(self, message):
+        self.backup_btn.setEnabled(True)
+        self.status_label.setText(f"Backup failed: {message}")
+    
+    def _restore_backup(self):
+        """Pick a snapshot and restore it after confirmation."""
+        start_dir = backup.default_backup_dir(self.backups.db_path)
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Restore backup", str(start_dir), "Snapshots (*.db.gz *.db)"
+        )
+        if not path:
+            return
+        answer = QMessageBox.question(
+            self, "Restore backup",
+            "Replace all current data with this snapshot?\n"
+            "The current data is saved as a 'pre-restore' snapshot first.",
+        )
+        if answer != QMessageBox.Yes:
+            return
+        self.restore_btn.setEnabled(False)
+        self.status_label.setText("Restoring…")
+        self.db.submit(backup.restore_snapshot, path, self.backups.db_path).then(
+            self._on_restore_done, self._on_restore_failed
+        )
+    
+    def _on_restore_done(self, safety):
+        self.restore_btn.setEnabled(True)
+        saved = f" (previous data in {safety.name})" if safety else ""
+        self.status_label.setText(f"Backup restored{saved}")
+        self._refresh_after_write()
+    
+    def _on_restore_failed(self, message):
+        self.restore_btn.setEnabled(True)
+        self.status_label.setText(f"Restore failed: {message}")
+    
+    def _poll_changes(self):
+        self.db.submit(self.changes.poll, key="change-feed").then(
+            self._on_external_changes,
+            lambda message: print(f"Error polling for changes: {message}"),
+        )
+    
+    def _on_external_changes(self, changes):
+        """Refresh what other processes changed; our own writes are already shown."""
+        if changes is None:
+            return
+        if changes.reset:
+            self._refresh_after_write()
+            return
+        own, self._own_writes = self._own_writes, self._own_writes - changes.sessions
+        inserted = changes.inserted.get("session", set()) - own
+        deleted = changes.deleted.get("session", set()) - own
+        updated = changes.updated.get("session", set()) - own
+        if not (inserted or deleted or updated):
+            return
+        changed = len(inserted | deleted | updated)
+        self.status_label.setText(f"{changed} session(s) changed elsewhere")
+        if inserted or deleted:
+            self._refresh_after_write()
+            return
+        self.db.submit(self.session_service.get_sessions_by_ids, updated).then(
+            lambda rows: self.table.model.update_rows(rows) or self._refresh_after_write(),
+            lambda message: print(f"Error loading changed sessions: {message}"),
+        )
     
     def _clear_filters(self):
         """Clear all filters and reload."""
+        self.search_timer.stop()
+        self.search_box.blockSignals(True)
+        self.search_box.clear()
+        self.search_box.blockSignals(False)
         self._reload_table()
         self.status_label.setText("Filters cleared")
+    
+    def closeEvent(self, event):
+        """Let in-flight database work finish before the window goes away."""
+        self.change_timer.stop()
+        self.db.shutdown()
+        self.changes.close()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     import sys
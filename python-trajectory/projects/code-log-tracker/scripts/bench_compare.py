@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare two pytest-benchmark JSON files (baseline vs current).
+
+Prints the median time of every benchmark in both runs with the ratio, and
+exits non-zero when any benchmark got slower than the allowed threshold.
+The JSON files come from `pytest tests/benchmarks/bench_data_layer.py
+--benchmark-json=PATH`; commit a baseline and compare later runs to it.
+
+Run:  python scripts/bench_compare.py BASELINE CURRENT [--threshold 1.25]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict
+
+
+def load_medians(path: Path) -> Dict[str, float]:
+    """Benchmark name -> median seconds"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {bench["name"]: bench["stats"]["median"] for bench in data.get("benchmarks", [])}
+
+
+def describe(path: Path) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        info = json.load(f).get("commit_info") or {}
+    commit = (info.get("id") or "")[:10]
+    return f"{path.name} ({commit}{'+dirty' if info.get('dirty') else ''})" if commit else path.name
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="fail when current/baseline median exceeds this "
+                             "(default: %(default)s)")
+    args = parser.parse_args()
+
+    baseline = load_medians(args.baseline)
+    current = load_medians(args.current)
+    print(f"baseline: {describe(args.baseline)}")
+    print(f"current:  {describe(args.current)}\n")
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+
+    regressions = []
+    for name in sorted(baseline.keys() | current.keys()):
+        old, new = baseline.get(name), current.get(name)
+        if old is None or new is None:
+            print(f"{name:<40} {_ms(old):>12} {_ms(new):>12} {'-':>8}")
+            continue
+        ratio = new / old if old else float("inf")
+        flag = "  <-- slower" if ratio > args.threshold else ""
+        print(f"{name:<40} {_ms(old):>12} {_ms(new):>12} {ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold:.2f}x baseline")
+        return 1
+    return 0
+
+
+def _ms(seconds) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.3f} ms"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
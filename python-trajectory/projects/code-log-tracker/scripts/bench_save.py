@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Per-save latency benchmark for app/db.py.
+
+Compares the pooled connection manager against reconnecting for every call
+(the old connect()-per-function behaviour, reproduced by dropping the pool
+after each save). Runs against a throwaway database.
+
+Run:  python scripts/bench_save.py [--saves 500]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import db  # noqa: E402
+
+
+def run(saves: int, reconnect: bool) -> list:
+    """Time `saves` calls to insert_or_update_session, returning milliseconds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = db.configure_database(Path(tmp) / "bench.db")
+        db.init_db()
+        item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Benchmark item')
+
+        timings = []
+        for i in range(saves):
+            if reconnect:
+                manager.close_all()
+            start = time.perf_counter()
+            db.insert_or_update_session({
+                'item_id': item_id,
+                'date': f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                'hours_spent': 1.0,
+                'notes': f"bench {i}",
+            })
+            timings.append((time.perf_counter() - start) * 1000)
+        manager.close_all()
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--saves", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Saving {args.saves} sessions per mode")
+    for label, reconnect in (("reconnect per call", True), ("pooled", False)):
+        timings = run(args.saves, reconnect)
+        p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+        print(f"  {label:<20} median {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Online backups of the tracker database.
+
+Snapshots are taken with the SQLite backup API while the app keeps running,
+verified with PRAGMA integrity_check, gzip-compressed and rotated. Restore
+verifies the snapshot and snapshots the current database before copying.
+
+Run:  python scripts/export_backup.py backup  [--db PATH] [--dir DIR] [--keep 7] [--no-compress]
+      python scripts/export_backup.py schedule [--every HOURS] [--check MINUTES] ...
+      python scripts/export_backup.py list    [--db PATH] [--dir DIR]
+      python scripts/export_backup.py verify  SNAPSHOT
+      python scripts/export_backup.py restore SNAPSHOT [--db PATH] [--yes]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import backup, db  # noqa: E402
+
+
+def _progress(copied: int, total: int):
+    print(f"\r  {copied:,}/{total:,} pages", end="", flush=True)
+
+
+def cmd_backup(args) -> int:
+    path = backup.create_snapshot(args.db, args.dir, keep=args.keep, compress=not args.no_compress,
+                                  pages=args.pages, progress=_progress)
+    print(f"\nSnapshot written and verified: {path} ({path.stat().st_size:,} bytes)")
+    return 0
+
+
+def cmd_schedule(args) -> int:
+    scheduler = backup.BackupScheduler(
+        args.db, args.dir, interval_hours=args.every, keep=args.keep, check_seconds=args.check * 60,
+        on_done=lambda path: print(f"Snapshot written and verified: {path}", flush=True),
+        on_error=lambda e: print(f"Backup failed: {e}", file=sys.stderr, flush=True),
+    )
+    print(f"Backing up {args.db} every {args.every:g}h (Ctrl+C to stop)")
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+    return 0
+
+
+def cmd_list(args) -> int:
+    snapshots = backup.list_snapshots(args.db, args.dir)
+    if not snapshots:
+        print("No snapshots")
+    for snapshot in snapshots:
+        label = f"  [{snapshot['label']}]" if snapshot['label'] else ""
+        archive = "  +archive" if snapshot['archive'] else ""
+        print(f"{snapshot['created']:%Y-%m-%d %H:%M:%S}  {snapshot['size']:>12,}  "
+              f"{snapshot['path'].name}{label}{archive}")
+    return 0
+
+
+def cmd_verify(args) -> int:
+    report = backup.verify_snapshot(args.snapshot)
+    if not report['ok']:
+        print(f"{args.snapshot.name}: FAILED integrity check: {report['integrity']}")
+        return 1
+    archived = f", {report['archived']} archived" if report['archived'] is not None else ""
+    print(f"{args.snapshot.name}: ok, {report['tables']} tables, "
+          f"{report['sessions']} sessions{archived}")
+    return 0
+
+
+def cmd_restore(args) -> int:
+    if not args.yes:
+        answer = input(f"Replace the contents of {args.db} with {args.snapshot.name}? [y/N] ")
+        if answer.strip().lower() not in ("y", "yes"):
+            print("Cancelled")
+            return 1
+    safety = backup.restore_snapshot(args.snapshot, args.db, args.dir, progress=_progress)
+    print(f"\nRestored {args.snapshot.name} into {args.db}")
+    if safety:
+        print(f"Previous contents saved as {safety}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", type=Path, default=db.DB_PATH,
+                        help="database file (default: %(default)s)")
+    common.add_argument("--dir", type=Path,
+                        help="snapshot directory (default: backups/ next to the database)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("backup", parents=[common], help="take one snapshot")
+    run.add_argument("--keep", type=int, default=backup.BACKUP_KEEP,
+                     help="snapshots to keep (0 = all)")
+    run.add_argument("--no-compress", action="store_true",
+                     help="keep the snapshot as a plain .db file")
+    run.add_argument("--pages", type=int, default=backup.BACKUP_PAGES_PER_STEP,
+                     help="pages copied per step")
+    run.set_defaults(handler=cmd_backup)
+
+    schedule = commands.add_parser("schedule", parents=[common], help="keep taking snapshots")
+    schedule.add_argument("--every", type=float, default=backup.BACKUP_INTERVAL_HOURS,
+                          help="hours between snapshots")
+    schedule.add_argument("--check", type=float, default=5.0, help="minutes between checks")
+    schedule.add_argument("--keep", type=int, default=backup.BACKUP_KEEP,
+                          help="snapshots to keep (0 = all)")
+    schedule.set_defaults(handler=cmd_schedule)
+
+    listing = commands.add_parser("list", parents=[common], help="list snapshots, newest first")
+    listing.set_defaults(handler=cmd_list)
+
+    verify = commands.add_parser("verify", help="run an integrity check on a snapshot")
+    verify.add_argument("snapshot", type=Path)
+    verify.set_defaults(handler=cmd_verify)
+
+    restore = commands.add_parser("restore", parents=[common],
+                                  help="restore a snapshot into the database")
+    restore.add_argument("snapshot", type=Path)
+    restore.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    restore.set_defaults(handler=cmd_restore)
+
+    args = parser.parse_args()
+    try:
+        return args.handler(args)
+    except backup.BackupError as e:
+        print(f"\nBackup error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Apply versioned schema migrations to a tracker database.
+
+Backfills run in bounded batches, each in its own short transaction with
+a saved checkpoint, so the app can keep using the database meanwhile and
+an interrupted run resumes where it stopped.
+
+Run:  python scripts/migrate.py [--db PATH] [--status] [--target N]
+                                [--batch-size N] [--max-batches N]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import db, migrations  # noqa: E402
+
+
+def print_status():
+    for m in migrations.migration_status():
+        line = f"{m['version']:>4}  {m['name']:<24} {m['state']}"
+        checkpoint = m['checkpoint']
+        if checkpoint:
+            line += f"  (backfill step {checkpoint['step'] + 1}"
+            line += f", after {checkpoint['cursor']})" if checkpoint['cursor'] else ")"
+        if not m['known']:
+            line += "  [unknown to this code]"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, default=db.DB_PATH,
+                        help="database file (default: %(default)s)")
+    parser.add_argument("--status", action="store_true", help="show migration state and exit")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--batch-size", type=int, default=migrations.MIGRATION_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, help="stop after this many backfill batches")
+    args = parser.parse_args()
+
+    manager = db.configure_database(args.db)
+    try:
+        if args.status:
+            print_status()
+            return 0
+
+        # Baseline tables first (idempotent), then the versioned steps
+        with db.transaction() as con:
+            db._create_schema(con.cursor())
+        done = migrations.migrate(
+            target=args.target,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            progress=lambda m, message: print(f"[{m.version} {m.name}] {message}"),
+        )
+        print(f"Completed: {', '.join(map(str, done)) or 'nothing to do'}")
+        print_status()
+        return 0
+    except migrations.MigrationError as e:
+        print(f"Migration refused: {e}", file=sys.stderr)
+        return 1
+    finally:
+        manager.close_all()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
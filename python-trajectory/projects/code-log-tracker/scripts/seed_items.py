@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic data generator for the tracker database.
+
+Builds realistic items (exercises and projects named after the topics and
+skills in each language pack), a share of them with aliases, and sessions
+spread over a date range with skewed item popularity, streaky activity,
+quarter-hour durations, notes and tags drawn from pack keywords. The same
+seed and end date always produce the same data. Sessions are written through
+bulk_insert_sessions in batches, so 10M rows stream in constant memory.
+
+Run:  python scripts/seed_items.py --db PATH [--sessions 10000] [--items N]
+                                   [--seed 42] [--days 730] [--batch 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import db  # noqa: E402
+
+EXERCISE_SUFFIXES = ["practice", "drills", "kata", "exercises", "challenge", "basics", "deep dive"]
+PROJECT_PATTERNS = ["{topic} dashboard", "{topic} toolkit", "Personal {topic} app",
+                    "{skill} playground", "{topic} capstone", "{skill} service"]
+STATUSES = [("Completed", 0.35), ("In Progress", 0.45), ("Planned", 0.1), ("Blocked", 0.1)]
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced", "Expert"]
+NOTE_TEMPLATES = ["Worked through {kw} and {kw2}", "Reviewed {kw}; need more practice with {kw2}",
+                  "Fixed a bug around {kw}", "Read docs on {kw}",
+                  "Refactored {kw} code, added tests for {kw2}"]
+
+# Share of items that get an alias, and of sessions that continue the previous day's item
+ALIAS_SHARE = 0.1
+STREAK_SHARE = 0.3
+
+
+def language_vocab() -> List[Tuple[str, List[str], List[str], List[str]]]:
+    """(language_code, topics, skills, keywords) for every active language"""
+    vocab = []
+    for code, _name, _color in db.get_languages():
+        pack = db.load_language_pack(code)
+        topics = sorted(pack.get('topics') or {}) or ["Basics"]
+        skills = sorted(pack.get('skills') or {}) or ["Fundamentals"]
+        keywords = sorted({kw for info in (pack.get('skills') or {}).values()
+                           for kw in (info or {}).get('keywords', [])})
+        keywords = keywords or [s.lower() for s in skills]
+        vocab.append((code, topics, skills, keywords))
+    return vocab
+
+
+def generate_items(rng: random.Random, count: int) -> List[Dict]:
+    """Distinct item definitions: language_code, type, canonical_name, keywords, alias"""
+    vocab = language_vocab()
+    items = []
+    bases: Counter = Counter()
+    while len(items) < count:
+        code, topics, skills, keywords = rng.choice(vocab)
+        if rng.random() < 0.75:
+            item_type = 'Exercise'
+            name = f"{rng.choice(skills)} {rng.choice(EXERCISE_SUFFIXES)}"
+        else:
+            item_type = 'Project'
+            name = rng.choice(PROJECT_PATTERNS).format(topic=rng.choice(topics),
+                                                       skill=rng.choice(skills))
+        # Small packs run out of distinct names; later uses become "part N"
+        bases[(code, item_type, name)] += 1
+        part = bases[(code, item_type, name)]
+        if part > 1:
+            name = f"{name} part {part}"
+        alias = None
+        if rng.random() < ALIAS_SHARE:
+            words = name.split()
+            if len(words) > 2:
+                alias = ''.join(w[0] for w in words).upper() + " " + words[-1]
+            else:
+                alias = f"{name} notes"
+        items.append({
+            'language_code': code, 'type': item_type, 'canonical_name': name,
+            'topic': rng.choice(topics), 'keywords': rng.sample(keywords, min(4, len(keywords))),
+            'alias': alias,
+        })
+    return items
+
+
+def generate_sessions(rng: random.Random, items: List[Dict], count: int,
+                      days: int = 730, end: Optional[date] = None) -> Iterator[Dict]:
+    """Yield count session rows for bulk_insert_sessions, oldest first"""
+    end = end or date.today()
+    start = end - timedelta(days=days)
+    # Zipf-ish popularity: a few items get most of the logs
+    order = items[:]
+    rng.shuffle(order)
+    cum_weights = list(accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(order))))
+    statuses, status_weights = zip(*STATUSES)
+    per_day = max(1, count // max(days, 1))
+
+    previous = None
+    for n in range(count):
+        day = start + timedelta(days=min(days, n // per_day))
+        if previous is not None and rng.random() < STREAK_SHARE:
+            item = previous
+        else:
+            item = rng.choices(order, cum_weights=cum_weights)[0]
+        previous = item
+        kw, kw2 = rng.choice(item['keywords']), rng.choice(item['keywords'])
+        yield {
+            'language_code': item['language_code'],
+            'type': item['type'],
+            'canonical_name': item['canonical_name'],
+            'date': day.isoformat(),
+            'hours_spent': rng.randint(1, 16) * 0.25,
+            'status': rng.choices(statuses, status_weights)[0],
+            'difficulty': rng.choice(DIFFICULTIES),
+            'notes': rng.choice(NOTE_TEMPLATES).format(kw=kw, kw2=kw2),
+            'tags': ", ".join(rng.sample(item['keywords'], min(2, len(item['keywords'])))),
+            'topic': item['topic'],
+        }
+
+
+def seed(sessions: int, items: Optional[int] = None, seed_value: int = 42, days: int = 730,
+         batch: int = 100000, end: Optional[date] = None, progress=None) -> Dict:
+    """Fill the configured database; returns counts and timings"""
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+    item_defs = generate_items(rng, items or max(10, sessions // 20))
+
+    rows = generate_sessions(rng, item_defs, sessions, days, end)
+    inserted = 0
+    while True:
+        chunk = [row for _, row in zip(range(batch), rows)]
+        if not chunk:
+            break
+        inserted += db.bulk_insert_sessions(chunk)['inserted']
+        if progress:
+            progress(inserted, sessions)
+
+    # Aliases for the items that were actually logged
+    aliased = 0
+    con = db.connect()
+    for item in item_defs:
+        if not item['alias']:
+            continue
+        row = con.execute("SELECT id FROM items WHERE language_code=? AND type=? AND slug=?",
+                          (item['language_code'], item['type'],
+                           db.slugify(item['canonical_name']))).fetchone()
+        if row:
+            db.add_item_alias(row[0], item['alias'])
+            aliased += 1
+
+    return {
+        'sessions': inserted,
+        'items': con.execute("SELECT COUNT(*) FROM items").fetchone()[0],
+        'aliases': aliased,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", type=Path, required=True, help="database file to create or extend")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--items", type=int, help="distinct items (default: sessions / 20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730, help="date range ending today")
+    parser.add_argument("--batch", type=int, default=100000,
+                        help="sessions per bulk insert transaction")
+    args = parser.parse_args()
+
+    manager = db.configure_database(args.db)
+    try:
+        db.init_db()
+        result = seed(args.sessions, args.items, args.seed, args.days, args.batch,
+                      progress=lambda done, total: print(f"  {done:,}/{total:,} sessions",
+                                                         flush=True))
+    finally:
+        manager.close_all()
+    print(f"Seeded {result['sessions']:,} sessions over {result['items']:,} items "
+          f"({result['aliases']:,} aliased) in {result['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,13 +11,35 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+from app.change_log import install_change_log
+from app.db import decode_cursor, encode_cursor, fts_match_query, stats_series
+from app.records import SESSION_RECORD_FIELDS, SessionRecord, fetch_records, record_factory
+from app.query_trace import connect as traced_connect, get_tracer
+
 # Database path
 DB_PATH = Path(__file__).resolve().parent / "clean_learning_tracker.db"
 
+# SimpleSessionService returns SessionRecords, the same rows app.db returns
+SESSION_FIELDS = SESSION_RECORD_FIELDS
+
+# Columns in SessionRecord order; this schema has no items, points or progress
+_SESSION_COLUMNS = """
+    {p}id, {p}date, {p}language, {p}type, {p}work_item, {p}status, {p}hours, {p}notes,
+    {p}tags, {p}difficulty, {p}topic, 0 AS points, 0 AS progress, NULL AS item_id, {p}target_time
+"""
+
+_SESSION_SELECT = f"SELECT {_SESSION_COLUMNS.format(p='')} FROM sessions"
+
 def connect():
     """Connect to SQLite database."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+    return traced_connect(DB_PATH, get_tracer())
+
+def _record_cursor(con) -> sqlite3.Cursor:
+    """Cursor whose rows come back as SessionRecords"""
+    cur = con.cursor()
+    cur.row_factory = record_factory()
+    return cur
 
 def init_simple_db():
     """Initialize simple database with minimal tables."""
@@ -41,6 +63,33 @@ def init_simple_db():
         created_at TEXT DEFAULT CURRENT_TIMESTAMP
     )""")
     
+    # Keyset paging walks (date, id) newest first
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date_id ON sessions(date DESC, id DESC)")
+    
+    # Full-text index for the dashboard search box, kept in sync by triggers
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sessions_fts'")
+    search_is_new = cur.fetchone() is None
+    cur.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS sessions_fts USING fts5(
+        work_item, topic, tags, notes,
+        content='sessions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""")
+    add = ("INSERT INTO sessions_fts(rowid, work_item, topic, tags, notes) "
+           "VALUES (NEW.id, NEW.work_item, NEW.topic, NEW.tags, NEW.notes);")
+    remove = ("INSERT INTO sessions_fts(sessions_fts, rowid, work_item, topic, tags, notes) "
+              "VALUES ('delete', OLD.id, OLD.work_item, OLD.topic, OLD.tags, OLD.notes);")
+    cur.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_sessions_fts_insert
+        AFTER INSERT ON sessions BEGIN {add} END""")
+    cur.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_sessions_fts_delete
+        AFTER DELETE ON sessions BEGIN {remove} END""")
+    cur.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_sessions_fts_update
+        AFTER UPDATE OF work_item, topic, tags, notes ON sessions BEGIN {remove} {add} END""")
+    if search_is_new:
+        cur.execute("INSERT INTO sessions_fts(sessions_fts) VALUES('rebuild')")
+    
+    # Change log behind the dashboard's change feed (writes from other processes)
+    install_change_log(cur, {'session': 'sessions'})
+    
     # Simple languages table
     cur.execute("""CREATE TABLE IF NOT EXISTS languages(
         code TEXT PRIMARY KEY,
@@ -60,24 +109,116 @@ def init_simple_db():
     for code, name in languages:
         cur.execute("INSERT OR IGNORE INTO languages (code, name) VALUES (?, ?)", (code, name))
     
+    # Daily rollup behind the dashboard's totals (see app.db.stats_series), kept
+    # current by triggers; points stay 0 like the session rows' points
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='daily_stats'")
+    stats_is_new = cur.fetchone() is None
+    cur.execute("""CREATE TABLE IF NOT EXISTS daily_stats(
+        date TEXT NOT NULL,
+        language_code TEXT NOT NULL,
+        difficulty TEXT NOT NULL DEFAULT '',
+        hours REAL NOT NULL DEFAULT 0,
+        points REAL NOT NULL DEFAULT 0,
+        session_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(date, language_code, difficulty)
+    ) WITHOUT ROWID""")
+    add = """
+        INSERT INTO daily_stats (date, language_code, difficulty, hours, session_count)
+        VALUES (substr(NEW.date, 1, 10), NEW.language, COALESCE(NEW.difficulty, ''), NEW.hours, 1)
+        ON CONFLICT(date, language_code, difficulty) DO UPDATE SET
+            hours = hours + excluded.hours, session_count = session_count + 1;
+    """
+    key = """date = substr(OLD.date, 1, 10) AND language_code = OLD.language
+             AND difficulty = COALESCE(OLD.difficulty, '')"""
+    remove = f"""
+        UPDATE daily_stats SET hours = hours - OLD.hours, session_count = session_count - 1
+        WHERE {key};
+        DELETE FROM daily_stats WHERE {key} AND session_count <= 0;
+    """
+    cur.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_stats_insert
+        AFTER INSERT ON sessions BEGIN {add} END""")
+    cur.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_stats_delete
+        AFTER DELETE ON sessions BEGIN {remove} END""")
+    cur.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_sessions_daily_stats_update
+        AFTER UPDATE OF date, language, difficulty, hours ON sessions BEGIN {remove} {add} END""")
+    if stats_is_new:
+        cur.execute("""
+            INSERT INTO daily_stats (date, language_code, difficulty, hours, session_count)
+            SELECT substr(date, 1, 10), language, COALESCE(difficulty, ''), SUM(hours), COUNT(*)
+            FROM sessions GROUP BY 1, 2, 3
+        """)
+    
     con.commit()
     con.close()
 
 class SimpleSessionService:
     """Simplified session service for clean UI."""
     
-    def get_sessions(self, limit: int = 1000) -> List[tuple]:
+    def get_sessions(self, limit: int = 1000) -> List[SessionRecord]:
         """Get all sessions."""
         con = connect()
-        cur = con.cursor()
+        result = fetch_records(con.cursor(),
+                               _SESSION_SELECT + " ORDER BY date DESC, id DESC LIMIT ?", (limit,))
+        con.close()
+        return result
+    
+    def get_sessions_page(
+        self, limit: int = 200, cursor: Optional[str] = None
+    ) -> Tuple[List[SessionRecord], Optional[str]]:
+        """One keyset page of sessions, newest first, and the next cursor (None at the end)."""
+        sql = _SESSION_SELECT
+        params: list = []
+        if cursor:
+            sql += " WHERE (date, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
+        sql += " ORDER BY date DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
         
-        cur.execute("""
-            SELECT id, date, language, type, work_item, topic, difficulty, 
-                   status, tags, hours, target_time, 0 as points, 0 as progress, notes
-            FROM sessions 
-            ORDER BY date DESC, id DESC 
+        con = connect()
+        rows = fetch_records(con.cursor(), sql, params)
+        con.close()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].date, rows[-1].id)
+    
+    def get_sessions_by_ids(self, session_ids) -> List[SessionRecord]:
+        """Current rows of specific sessions, newest first; missing ids are skipped."""
+        ids = sorted(set(session_ids))
+        rows = []
+        con = connect()
+        cur = _record_cursor(con)
+        for start in range(0, len(ids), 300):
+            chunk = ids[start:start + 300]
+            rows.extend(cur.execute(
+                f"{_SESSION_SELECT} WHERE id IN ({','.join('?' * len(chunk))})", chunk).fetchall())
+        con.close()
+        return sorted(rows, key=lambda row: (row.date, row.id), reverse=True)
+    
+    def count_sessions(self) -> int:
+        """Total number of sessions."""
+        con = connect()
+        count = con.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        con.close()
+        return count
+    
+    def search_sessions(self, query: str, limit: int = 1000) -> List[SessionRecord]:
+        """Sessions matching every word of query (as a prefix), best match first."""
+        match = fts_match_query(query)
+        if not match:
+            return self.get_sessions(limit)
+        
+        con = connect()
+        cur = _record_cursor(con)
+        
+        cur.execute(f"""
+            SELECT {_SESSION_COLUMNS.format(p='s.')}
+            FROM sessions_fts
+            JOIN sessions s ON s.id = sessions_fts.rowid
+            WHERE sessions_fts MATCH ?
+            ORDER BY bm25(sessions_fts, 2.0, 1.0, 1.5, 1.0), s.date DESC
             LIMIT ?
-        """, (limit,))
+        """, (match, limit))
         
         result = cur.fetchall()
         con.close()
@@ -143,6 +284,16 @@ class SimpleSessionService:
         con.commit()
         con.close()
     
+    def get_stats_series(self, period: str = "day", start: Optional[str] = None,
+                         end: Optional[str] = None, language_code: Optional[str] = None,
+                         group_by: Optional[str] = None) -> List[Dict]:
+        """Hours and session counts per day/week/month (or 'all') from the daily_stats rollup."""
+        con = connect()
+        series = stats_series(con, period, start, end, {'language_code': language_code or None},
+                              group_by, groups=('language_code', 'difficulty'))
+        con.close()
+        return series
+    
     def find_or_create_item(self, language_code: str, item_type: str, work_item: str) -> Tuple[int, List]:
         """Simple version - just return dummy item_id and no suggestions."""
         return 1, []
@@ -0,0 +1,120 @@
+# tests/benchmarks/bench_data_layer.py
+"""
+pytest-benchmark suite for the app/db.py data layer.
+
+Runs against a database filled by scripts/seed_items.py (fixed seed and
+end date, so every run measures the same data). Not collected by the
+default test run; invoke it explicitly and keep the JSON as a baseline:
+
+    pytest tests/benchmarks/bench_data_layer.py --benchmark-json=tests/benchmarks/current.json
+    python scripts/bench_compare.py tests/benchmarks/baseline.json tests/benchmarks/current.json
+
+TRACKER_BENCH_SESSIONS sets the scale (default 10000; the generator
+handles up to 10M).
+"""
+
+import os
+import random
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+from app import db  # noqa: E402
+from app.exporters import export_sessions  # noqa: E402
+import seed_items  # noqa: E402
+
+SESSIONS = int(os.environ.get("TRACKER_BENCH_SESSIONS", "10000"))
+SEED = 42
+END_DATE = date(2025, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def seeded_db(tmp_path_factory):
+    """Seeded database shared by every benchmark in the module"""
+    manager = db.configure_database(tmp_path_factory.mktemp("bench") / "bench.db")
+    db.init_db()
+    seed_items.seed(SESSIONS, seed_value=SEED, end=END_DATE)
+    con = db.connect()
+    items = con.execute(
+        "SELECT id, language_code, type, canonical_name FROM items ORDER BY id").fetchall()
+    busiest = con.execute("SELECT id FROM items ORDER BY total_logs DESC LIMIT 1").fetchone()[0]
+    yield {'items': items, 'busiest': busiest}
+    manager.close_all()
+    db.configure_database(db.DB_PATH)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(SEED)
+
+
+def test_find_or_create_item_existing(benchmark, seeded_db, rng):
+    items = seeded_db['items']
+
+    def lookup():
+        _, language_code, item_type, name = rng.choice(items)
+        return db.find_or_create_item(language_code, item_type, name)
+
+    item_id, is_new, _ = benchmark(lookup)
+    assert item_id is not None and not is_new
+
+
+def test_find_or_create_item_new(benchmark, seeded_db):
+    counter = iter(range(10 ** 9))
+
+    def create():
+        # Long names skip the near-match suggestions and always create
+        return db.find_or_create_item('python', 'Exercise',
+                                      f"Benchmark generated exercise number {next(counter)}")
+
+    _, is_new, _ = benchmark.pedantic(create, rounds=200, iterations=1)
+    assert is_new
+
+
+def test_insert_or_update_session(benchmark, seeded_db, rng):
+    items = seeded_db['items']
+
+    def save():
+        return db.insert_or_update_session({
+            'item_id': rng.choice(items)[0], 'date': f"2024-12-{rng.randint(1, 28):02d}",
+            'hours_spent': 1.0, 'notes': 'benchmark session', 'tags': 'bench',
+        })
+
+    assert benchmark.pedantic(save, rounds=300, iterations=1) > 0
+
+
+def test_update_item_summaries(benchmark, seeded_db):
+    benchmark(db.update_item_summaries, seeded_db['busiest'])
+
+
+def test_list_sessions(benchmark, seeded_db):
+    rows = benchmark(db.list_sessions, 200)
+    assert len(rows) == 200
+
+
+def test_list_sessions_deep_page(benchmark, seeded_db):
+    _, cursor = db.list_sessions_page(200)
+    for _ in range(20):
+        _, cursor = db.list_sessions_page(200, cursor)
+    rows, _ = benchmark(db.list_sessions_page, 200, cursor)
+    assert rows
+
+
+def test_search_items(benchmark, seeded_db):
+    benchmark(db.search_items, 'python', None, 'func')
+
+
+def test_full_text_search(benchmark, seeded_db):
+    benchmark(db.search, 'refactor tests', None, 50)
+
+
+def test_export_csv(benchmark, seeded_db, tmp_path):
+    count = benchmark.pedantic(export_sessions, args=(str(tmp_path / "export.csv"),),
+                               rounds=3, iterations=1)
+    assert count >= SESSIONS
@@ -0,0 +1,20 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make the `app` package importable when pytest runs from the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import db  # noqa: E402
+
+
+@pytest.fixture
+def tracker_db(tmp_path):
+    """Fresh, initialized tracker database for one test"""
+    manager = db.configure_database(tmp_path / "tracker.db")
+    db.init_db()
+    yield manager
+    manager.close_all()
+    db.configure_database(db.DB_PATH)
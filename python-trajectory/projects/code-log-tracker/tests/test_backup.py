@@ -0,0 +1,88 @@
+# tests/test_backup.py
+import gzip
+
+import pytest
+
+from app import backup, db
+
+
+def _add_sessions(count, start_day=1):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Backed up')
+    for day in range(start_day, start_day + count):
+        db.insert_or_update_session({'item_id': item_id, 'date': f'2024-02-{day:02d}',
+                                     'hours_spent': 1.0})
+
+
+def test_snapshots_are_verified_rotated_and_restored(tracker_db, tmp_path):
+    _add_sessions(3)
+    backup_dir = tmp_path / "snapshots"
+    first = backup.create_snapshot(tracker_db.db_path, backup_dir, keep=1, pages=1)
+    assert first.name.endswith(".db.gz") and not list(backup_dir.glob("*.part"))
+    report = backup.verify_snapshot(first)
+    assert report['ok'] and report['integrity'] == 'ok' and report['sessions'] == 3
+
+    # Same second as `first` would collide, so rename it into the past
+    first.rename(first.with_name("tracker-20000101-000000.db.gz"))
+    _add_sessions(2, start_day=10)
+    second = backup.create_snapshot(tracker_db.db_path, backup_dir, keep=1)
+    assert [s['path'] for s in backup.list_snapshots(tracker_db.db_path, backup_dir)] == [second]
+
+    _add_sessions(4, start_day=20)
+    safety = backup.restore_snapshot(second, tracker_db.db_path, backup_dir)
+    assert db.connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 5
+    labels = {s['label'] for s in backup.list_snapshots(tracker_db.db_path, backup_dir)}
+    assert labels == {None, 'pre-restore'}
+    assert backup.verify_snapshot(safety)['sessions'] == 9
+
+
+def test_damaged_snapshots_are_rejected(tracker_db, tmp_path):
+    plain = tmp_path / "tracker-20240101-000000.db"
+    plain.write_bytes(b"not a database" * 100)
+    assert backup.verify_snapshot(plain)['ok'] is False
+    with pytest.raises(backup.BackupError):
+        backup.restore_snapshot(plain, tracker_db.db_path)
+
+    truncated = tmp_path / "tracker-20240101-000000.db.gz"
+    truncated.write_bytes(gzip.compress(bytes(range(256)) * 100)[:50])
+    with pytest.raises(backup.BackupError):
+        backup.verify_snapshot(truncated)
+
+
+def test_snapshots_carry_the_archive(tracker_db, tmp_path):
+    from datetime import date
+    backup_dir = tmp_path / "snapshots"
+    _add_sessions(3)
+    before_archive = backup.create_snapshot(tracker_db.db_path, backup_dir, keep=0, compress=False)
+    assert backup.verify_snapshot(before_archive)['archived'] is None
+    before_archive = before_archive.rename(before_archive.with_name("tracker-20000101-000000.db"))
+
+    db.archive_sessions(older_than_days=(date.today() - date(2024, 2, 3)).days)
+    snapshot = backup.create_snapshot(tracker_db.db_path, backup_dir, keep=0)
+    companion = backup.archive_snapshot_path(snapshot)
+    assert companion.name.endswith(".archive.db.gz")
+    report = backup.verify_snapshot(snapshot)
+    assert (report['ok'], report['sessions'], report['archived']) == (True, 1, 2)
+    snapshots = backup.list_snapshots(tracker_db.db_path, backup_dir)
+    assert [s['archive'] for s in snapshots] == [companion, None]
+    with pytest.raises(backup.BackupError):
+        backup.restore_snapshot(companion, tracker_db.db_path, backup_dir)
+
+    # Restoring brings back both halves; an archive-less snapshot empties the archive
+    _add_sessions(2, start_day=10)
+    db.archive_sessions(older_than_days=(date.today() - date(2024, 2, 12)).days)
+    safety = backup.restore_snapshot(snapshot, tracker_db.db_path, backup_dir)
+    assert backup.verify_snapshot(safety)['archived'] == 5
+    # The next restore's safety snapshot may land in the same second
+    for path in (safety, backup.archive_snapshot_path(safety)):
+        suffix = path.name.split("pre-restore")[1]
+        path.rename(path.with_name("tracker-20000102-000000-pre-restore" + suffix))
+    con = db.connect()
+    assert con.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+    assert con.execute("SELECT COUNT(*) FROM all_sessions").fetchone()[0] == 3
+    backup.restore_snapshot(before_archive, tracker_db.db_path, backup_dir)
+    assert con.execute("SELECT COUNT(*) FROM archive.sessions").fetchone()[0] == 0
+    assert con.execute("SELECT COUNT(*) FROM all_sessions").fetchone()[0] == 3
+
+    # Rotation removes a snapshot's archive with it
+    backup.rotate_snapshots(tracker_db.db_path, backup_dir, keep=0)
+    assert sorted(p.name for p in backup_dir.iterdir() if 'pre-restore' not in p.name) == []
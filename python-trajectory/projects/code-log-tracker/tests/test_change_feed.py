@@ -0,0 +1,64 @@
+# tests/test_change_feed.py
+import subprocess
+import sys
+
+import pytest
+
+from app import db
+from app.change_feed import ChangeFeed
+
+
+@pytest.fixture
+def feed(tracker_db):
+    feed = ChangeFeed()
+    yield feed
+    feed.close()
+
+
+def _save(item_id, date, hours=1.0, **extra):
+    return db.insert_or_update_session({'item_id': item_id, 'date': date, 'hours_spent': hours,
+                                        **extra})
+
+
+def test_feed_reports_net_session_and_item_changes(feed):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Closures')
+    assert feed.poll().inserted == {'item': {item_id}}
+    assert feed.poll() is None
+
+    received = []
+    unsubscribe = feed.subscribe(received.append)
+    first = _save(item_id, '2024-04-01')
+    second = _save(item_id, '2024-04-02')
+    _save(item_id, '2024-04-03', 2.0, id=first)
+    changes = feed.poll()
+    assert received == [changes]
+    assert changes.inserted['session'] == {first, second} and not changes.updated['session']
+    assert changes.updated['item'] == {item_id}
+
+    _save(item_id, '2024-04-04', 3.0, id=first)
+    db.connect().execute("DELETE FROM sessions WHERE id = ?", (second,))
+    db.connect().commit()
+    changes = feed.poll()
+    assert (changes.updated['session'], changes.deleted['session']) == ({first}, {second})
+    assert changes.sessions == {first, second}
+
+    unsubscribe()
+    _save(item_id, '2024-04-05')
+    assert feed.poll() and len(received) == 2
+
+
+def test_feed_sees_other_processes_and_resets_when_trimmed(feed, tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Context managers')
+    session_id = _save(item_id, '2024-05-01')
+    since = feed.current_seq()
+    feed.poll()
+
+    script = (f"import sqlite3; con = sqlite3.connect({str(tracker_db.db_path)!r}); "
+              f"con.execute('UPDATE sessions SET notes = 1 WHERE id = {session_id}'); con.commit()")
+    subprocess.run([sys.executable, "-c", script], check=True)
+    assert feed.poll().updated['session'] == {session_id}
+
+    assert not feed.changes_since(since).reset
+    db.connect().execute("DELETE FROM change_log WHERE seq <= ?", (since + 1,))
+    db.connect().commit()
+    assert feed.changes_since(since).reset
@@ -0,0 +1,534 @@
+# tests/test_db.py
+import threading
+
+import pytest
+
+from app import db
+from app.records import SessionRecord
+from app.services.session_service import SessionService
+
+
+def _save(item_id, date, hours=1.0, **extra):
+    return db.insert_or_update_session({'item_id': item_id, 'date': date, 'hours_spent': hours,
+                                        **extra})
+
+
+def test_connection_is_reused_per_thread(tracker_db):
+    assert db.connect() is db.connect()
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(db.connect()))
+    t.start()
+    t.join()
+    assert other[0] is not db.connect()
+
+
+def test_pragma_profile_applied(tracker_db):
+    con = db.connect()
+    assert con.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert con.execute("PRAGMA cache_size").fetchone()[0] == db.DEFAULT_PRAGMAS['cache_size']
+
+
+def test_transaction_rolls_back_nested_work(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'List comprehensions')
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            _save(item_id, '2024-01-01', 2.0)
+            raise RuntimeError("boom")
+
+    assert db.list_sessions() == []
+    assert db.get_item_by_id(item_id)['total_hours'] == 0
+
+
+def test_save_and_delete_update_summaries(tracker_db):
+    service = SessionService()
+    item_id, _ = service.find_or_create_item('python', 'Exercise', 'Decorators')
+
+    session_id = service.save_session({'item_id': item_id, 'date': '2024-01-01',
+                                       'hours_spent': 1.5})
+    _save(item_id, '2024-01-02', 2.0)
+
+    item = db.get_item_by_id(item_id)
+    assert item['total_logs'] == 2
+    assert item['total_hours'] == pytest.approx(3.5)
+
+    service.delete_session(session_id)
+    assert db.get_item_by_id(item_id)['total_hours'] == pytest.approx(2.0)
+
+
+def test_edit_of_deleted_session_changes_nothing(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Context managers')
+    session_id = _save(item_id, '2024-01-01', 1.0, tags='py')
+    SessionService().delete_session(session_id)
+    before = db.get_item_by_id(item_id)
+
+    with pytest.raises(ValueError):
+        _save(item_id, '2024-01-02', 3.0, id=session_id, tags='py')
+    assert db.update_sessions([{'id': session_id, 'item_id': item_id,
+                                'date': '2024-01-02', 'hours_spent': 3.0}]) == [None]
+
+    assert db.get_item_by_id(item_id) == before
+    con = db.connect()
+    assert con.execute("SELECT COUNT(*) FROM session_tags").fetchone()[0] == 0
+    assert con.execute("SELECT COUNT(*) FROM daily_stats").fetchone()[0] == 0
+
+
+def _assert_matches_full_recompute(item_id):
+    incremental = db.get_item_by_id(item_id)
+    db.update_item_summaries(item_id)
+    full = db.get_item_by_id(item_id)
+    assert incremental == full
+
+
+def test_streaks_extend_in_order(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Generators')
+    for day in ('2024-03-01', '2024-03-02', '2024-03-03', '2024-03-05'):
+        _save(item_id, day)
+
+    cur = db.connect().execute("SELECT longest_streak_days FROM items WHERE id=?", (item_id,))
+    assert cur.fetchone()[0] == 3
+    _assert_matches_full_recompute(item_id)
+
+
+def test_out_of_order_edit_and_delete_fall_back_to_rebuild(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Closures')
+    first = _save(item_id, '2024-03-01', 1.0)
+    _save(item_id, '2024-03-03', 1.0)
+    _save(item_id, '2024-03-02', 0.5)  # fills the gap out of order
+
+    longest = "SELECT longest_streak_days FROM items WHERE id=?"
+    assert db.connect().execute(longest, (item_id,)).fetchone()[0] == 3
+
+    # Move the first session to a different day, then delete it
+    _save(item_id, '2024-02-20', 2.0, id=first)
+    assert db.connect().execute(longest, (item_id,)).fetchone()[0] == 2
+    _assert_matches_full_recompute(item_id)
+
+    SessionService().delete_session(first)
+    item = db.get_item_by_id(item_id)
+    assert item['total_logs'] == 2
+    assert item['total_hours'] == pytest.approx(1.5)
+    _assert_matches_full_recompute(item_id)
+
+
+def test_recompute_all_summaries_matches_per_item_recompute(tracker_db):
+    from datetime import date, timedelta
+    today = date.today()
+    active, _, _ = db.find_or_create_item('python', 'Project', 'Streak tracker')
+    db.connect().execute("UPDATE items SET target_hours=50 WHERE id=?", (active,))
+    for back in (0, 1, 2, 5, 9):
+        _save(active, (today - timedelta(days=back)).isoformat(), 1.5)
+    stale, _, _ = db.find_or_create_item('python', 'Exercise', 'Old exercise')
+    for day in ('2023-05-01', '2023-05-02', '2023-05-01'):
+        _save(stale, day)
+    unused, _, _ = db.find_or_create_item('python', 'Exercise', 'Never logged')
+
+    fields = ("SELECT id, total_logs, total_hours, last_logged_at, longest_streak_days, "
+              "current_streak_days, substr(projected_finish_date, 1, 10) FROM items ORDER BY id")
+    con = db.connect()
+    for item_id in (active, stale, unused):
+        db.update_item_summaries(item_id)
+    expected = con.execute(fields).fetchall()
+    days = con.execute("SELECT * FROM item_active_days ORDER BY item_id, day").fetchall()
+
+    con.execute("UPDATE items SET total_logs=99, total_hours=99, longest_streak_days=99, "
+                "current_streak_days=99")
+    con.execute("DELETE FROM item_active_days")
+    assert db.recompute_all_summaries()['items'] == 3
+    assert con.execute(fields).fetchall() == expected
+    assert con.execute("SELECT * FROM item_active_days ORDER BY item_id, day").fetchall() == days
+    assert db.get_item_by_id(active)['current_streak_days'] == 3
+
+
+def test_bulk_insert_resolves_items_and_defers_summaries(tracker_db):
+    existing_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Recursion')
+    rows = [
+        {'language_code': 'python', 'type': 'Exercise', 'canonical_name': 'Recursion',
+         'date': f'2024-01-{day:02d}', 'hours_spent': 1.0}
+        for day in range(1, 11)
+    ] + [
+        {'language_code': 'git', 'type': 'Project', 'canonical_name': 'Rebase workflow',
+         'date': '2024-02-01', 'hours_spent': 2.5, 'status': 'Completed',
+         'notes': 'interactive squash'},
+        {'item_id': existing_id, 'date': '2024-02-02', 'hours_spent': 0.5},
+    ]
+    seen = []
+    con = db.connect()
+    schema_version = con.execute("PRAGMA schema_version").fetchone()[0]
+
+    report = SessionService().bulk_insert_sessions(iter(rows), chunk_size=4, progress=seen.append)
+
+    assert report['inserted'] == 12
+    assert report['items_created'] == 1
+    assert report['items_touched'] == 2
+    assert seen == [4, 8, 12]
+
+    item = db.get_item_by_id(existing_id)
+    assert item['total_logs'] == 11
+    assert item['total_hours'] == pytest.approx(10.5)
+    assert db.connect().execute(
+        "SELECT longest_streak_days FROM items WHERE id=?", (existing_id,)).fetchone()[0] == 10
+    assert con.execute("SELECT DISTINCT project_name FROM sessions ORDER BY 1").fetchall() == [
+        (None,), ('Rebase workflow',)]
+
+    # Insert triggers were held without DDL, and their set-based stand-ins did the same work
+    assert con.execute("PRAGMA schema_version").fetchone()[0] == schema_version
+    assert con.execute("SELECT COUNT(*) FROM trigger_holds").fetchone()[0] == 0
+    assert con.execute(
+        "SELECT SUM(session_count), SUM(hours) FROM daily_stats").fetchone() == (12, 13.0)
+    assert [hit['kind'] for hit in db.search('squash')] == ['session']
+    assert con.execute(
+        "SELECT op, COUNT(*) FROM change_log WHERE entity = 'session' GROUP BY op"
+    ).fetchall() == [('insert', 12)]
+
+
+def test_bulk_insert_is_atomic(tracker_db):
+    rows = [
+        {'language_code': 'python', 'type': 'Exercise', 'canonical_name': 'Sets',
+         'date': '2024-01-01', 'hours_spent': 1.0},
+        {'language_code': 'python', 'type': 'Exercise', 'canonical_name': 'Sets',
+         'hours_spent': 1.0},
+    ]
+    with pytest.raises(Exception):
+        db.bulk_insert_sessions(rows)
+    assert db.list_sessions() == []
+    assert db.connect().execute("SELECT COUNT(*) FROM trigger_holds").fetchone()[0] == 0
+
+
+def test_alias_lookup_and_merge(tracker_db):
+    target_id, _, _ = db.find_or_create_item('python', 'Project', 'Tracker app rewrite')
+    db.add_item_alias(target_id, 'Learning tracker v2')
+
+    found_id, is_new, _ = db.find_or_create_item('python', 'Project', 'learning tracker V2!')
+    assert (found_id, is_new) == (target_id, False)
+    # Aliases are scoped to the item's language and type
+    assert db.find_or_create_item('javascript', 'Project', 'Learning tracker v2')[1] is True
+
+    source_id, _, _ = db.find_or_create_item('python', 'Project', 'Desktop logger prototype')
+    _save(source_id, '2024-05-01', 3.0)
+    db.merge_items(source_id, target_id)
+
+    assert db.find_or_create_item('python', 'Project', 'Desktop logger prototype')[0] == target_id
+    assert db.get_item_by_id(target_id)['total_hours'] == pytest.approx(3.0)
+    assert db.get_item_by_id(source_id)['total_hours'] == 0
+
+
+def test_daily_stats_follow_session_writes(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Iterators')
+    first = _save(item_id, '2024-01-01', 1.0, difficulty='Beginner')
+    _save(item_id, '2024-01-03', 2.0, difficulty='Advanced')
+    _save(item_id, '2024-02-10', 0.5, difficulty='Beginner')
+
+    weekly = db.get_stats_series('week')
+    assert [(w['period'], w['hours'], w['sessions']) for w in weekly] == [
+        ('2024-01-01', 3.0, 2), ('2024-02-05', 0.5, 1)]
+
+    _save(item_id, '2024-01-02', 4.0, id=first, difficulty='Beginner')
+    SessionService().delete_session(first + 2)
+
+    by_difficulty = db.get_stats_series('all', group_by='difficulty')
+    assert [(d['difficulty'], d['hours']) for d in by_difficulty] == [
+        ('Advanced', 2.0), ('Beginner', 4.0)]
+    assert db.get_stats_series('month', start='2024-02-01') == []
+
+    stored = db.connect().execute(
+        "SELECT SUM(hours), SUM(points), SUM(session_count) FROM daily_stats").fetchone()
+    actual = db.connect().execute(
+        "SELECT SUM(hours_spent), SUM(points_awarded), COUNT(*) FROM sessions").fetchone()
+    assert stored == pytest.approx(actual)
+
+
+def test_keyset_pages_cover_every_session_once(tracker_db, tmp_path):
+    py_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Sorting')
+    js_id, _, _ = db.find_or_create_item('javascript', 'Project', 'Todo app')
+    for n in range(25):
+        _save(py_id if n % 2 else js_id, f'2024-01-{1 + n // 4:02d}', 1.0,
+              status='Completed' if n % 3 == 0 else 'In Progress')
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = db.list_sessions_page(4, cursor)
+        seen.extend(rows)
+        if cursor is None:
+            break
+    assert len({row[0] for row in seen}) == 25
+    assert seen == db.list_sessions(100)
+
+    python_rows = list(db.iter_sessions(page_size=3, language_code='python', date_to='2024-01-03'))
+    assert python_rows and all(r[2] == 'python' and r[1] <= '2024-01-03' for r in python_rows)
+    completed = list(db.iter_sessions(page_size=2, status='Completed', item_type='Project'))
+    assert all(r[5] == 'Completed' and r[3] == 'Project' for r in completed)
+
+    with pytest.raises(ValueError):
+        db.list_sessions_page(cursor='not-a-cursor')
+
+    assert SessionService().export_to_csv(str(tmp_path / 'out.csv')) == 25
+
+    # init_db narrows the page index of databases created with the wider one
+    con = db.connect()
+    con.execute("DROP INDEX idx_sessions_page")
+    con.execute("CREATE INDEX idx_sessions_page ON sessions(date DESC, id DESC, status, item_id)")
+    db.init_db()
+    columns = [row[2] for row in con.execute("PRAGMA index_info(idx_sessions_page)")]
+    assert columns == ['date', 'id']
+
+
+def test_session_rows_are_records_sharing_repeated_strings(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Slicing')
+    for day in (1, 1, 2):
+        _save(item_id, f'2024-02-0{day}', 1.0, tags='py')
+
+    first, second, third = db.list_sessions(10)
+    assert isinstance(first, SessionRecord) and first == tuple(first)
+    assert first.id == first[0] and first.get('language_code') == 'python'
+    assert first.get('nope', 1) == 1
+    assert first.as_dict(['date', 'hours_spent']) == {'date': '2024-02-02', 'hours_spent': 1.0}
+    # One string object per distinct value within a query
+    assert second.date is third.date and first.canonical_name is third.canonical_name
+    assert second.tags is first.tags
+    assert db.sessions_by_id([third.id, first.id]) == [first, third]
+
+
+def test_full_text_search_follows_edits(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Decorators deep dive')
+    db.add_item_alias(item_id, 'Function wrappers')
+    other_id, _, _ = db.find_or_create_item('javascript', 'Project', 'Weather widget')
+    session_id = _save(item_id, '2024-03-01', notes='Wrote a caching decorator', tags='functools')
+    _save(other_id, '2024-03-02', notes='Fetch API and promises', status='Completed')
+
+    hits = db.search('deco')
+    assert {(h['kind'], h['id']) for h in hits} == {('item', item_id), ('session', session_id)}
+    assert '[' in hits[0]['snippet']
+    assert [h['id'] for h in db.search('wrap')] == [item_id]
+    assert [h['id'] for h in db.search('promis', {'status': 'Completed'})] == [session_id + 1]
+    assert db.search('promis', {'language_code': 'python'}) == []
+    assert db.search('***') == []
+    with pytest.raises(ValueError):
+        db.search('deco', {'colour': 'red'})
+
+    _save(item_id, '2024-03-01', id=session_id, notes='Memoization with lru_cache',
+          tags='functools')
+    assert db.search('caching') == []
+    assert [h['id'] for h in db.search('memo lru')] == [session_id]
+    SessionService().delete_session(session_id)
+    assert db.search('functools') == []
+
+    assert [i['id'] for i in db.search_items('python', query='deep div')] == [item_id]
+
+
+def test_streaming_export_formats_progress_and_cancel(tracker_db, tmp_path):
+    import csv
+    import json
+
+    from app.config.table_config import TableConfig
+    from app.exporters import ExportCancelled, export_sessions
+
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Iterators')
+    for n in range(23):
+        _save(item_id, f'2024-02-{1 + n:02d}', 0.5, notes=f'note {n}',
+              status='Completed' if n % 2 else 'In Progress')
+
+    steps = []
+    out = tmp_path / 'sessions.csv'
+    assert export_sessions(str(out), chunk_size=5,
+                           progress=lambda done, total: steps.append((done, total))) == 23
+    assert steps == [(5, 23), (10, 23), (15, 23), (20, 23), (23, 23)]
+    with open(out, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == TableConfig.HEADERS
+    assert (rows[0]['Date'], rows[0]['Work Item Name'], rows[0]['Notes']) == (
+        '2024-02-23', 'Iterators', 'note 22')
+
+    jsonl = tmp_path / 'done.jsonl'
+    assert SessionService().export_sessions(str(jsonl), status='Completed') == 11
+    records = [json.loads(line) for line in jsonl.read_text(encoding='utf-8').splitlines()]
+    assert all(r['status'] == 'Completed' and r['language_code'] == 'python' for r in records)
+
+    calls = []
+    with pytest.raises(ExportCancelled):
+        export_sessions(str(tmp_path / 'partial.csv'), chunk_size=5,
+                        cancel=lambda: calls.append(1) or len(calls) > 2)
+    assert not (tmp_path / 'partial.csv').exists() and not (tmp_path / 'partial.csv.part').exists()
+
+    with pytest.raises(ValueError):
+        export_sessions(str(tmp_path / 'sessions.xml'))
+
+
+def test_tag_tables_follow_writes_and_answer_tag_queries(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Tag practice')
+    first = db.insert_or_update_session({'item_id': item_id, 'date': '2024-01-01',
+                                         'hours_spent': 1.0, 'tags': 'SQL, testing'})
+    second = db.insert_or_update_session({'item_id': item_id, 'date': '2024-01-03',
+                                          'hours_spent': 2.0, 'tags': 'sql'})
+    db.bulk_insert_sessions([{'item_id': item_id, 'date': '2024-01-09', 'hours_spent': 0.5,
+                              'tags': 'testing; docs, Testing'}])
+
+    def ids(match, *tags):
+        return {row[0] for row in db.sessions_with_tags(tags, match)[0]}
+
+    third = max(ids('any', 'docs'))
+    assert ids('all', 'sql', 'Testing') == {first}
+    assert ids('any', 'sql', 'docs') == {first, second, third}
+    assert ids('all', 'sql', 'unknown') == set()
+
+    # Edits re-point the junction rows, deletes drop them
+    db.insert_or_update_session({'id': first, 'item_id': item_id, 'date': '2024-01-01',
+                                 'hours_spent': 1.0, 'tags': 'docs'})
+    assert ids('any', 'testing') == {third}
+    db.connect().execute("DELETE FROM sessions WHERE id=?", (second,))
+    assert ids('any', 'sql') == set()
+
+    assert db.get_tag_hours_by_week() == [
+        {'week': '2024-01-01', 'tag': 'docs', 'hours': 1.0, 'sessions': 1},
+        {'week': '2024-01-08', 'tag': 'docs', 'hours': 0.5, 'sessions': 1},
+        {'week': '2024-01-08', 'tag': 'testing', 'hours': 0.5, 'sessions': 1},
+    ]
+    assert db.get_tag_hours_by_week('2024-01-08', tags=['TESTING'])[0]['tag'] == 'testing'
+
+
+def test_inline_edits_coalesce_into_one_write(tracker_db):
+    import time
+    from app.services import write_buffer
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Inline edits')
+    session_id = _save(item_id, '2024-02-01', 1.0)
+    row = {'id': session_id, 'item_id': item_id, 'date': '2024-02-01', 'hours_spent': 1.0}
+
+    batches = []
+    edits = write_buffer.SessionWriteBuffer(
+        window=60, writer=lambda rows: batches.append(rows) or db.update_sessions(rows))
+    service = SessionService(inline_edits=edits)
+    service.update_session_inline({**row, 'notes': 'first'})
+    service.update_session_inline({**row, 'notes': 'second', 'hours_spent': 2.5})
+    points = service.update_session_inline({**row, 'notes': 'second', 'hours_spent': 2.5,
+                                            'tags': 'x'})
+    assert edits.pending() == 1
+
+    # Reads through the service see the edits; all three went out as one row
+    rows = {r[0]: r for r in service.get_sessions()}
+    assert rows[session_id][7] == 'second' and rows[session_id][6] == 2.5
+    assert rows[session_id][11] == pytest.approx(points)
+    assert len(batches) == 1 and len(batches[0]) == 1
+    assert db.get_item_by_id(item_id)['total_hours'] == 2.5
+
+    # The window closing flushes on its own
+    buffer = write_buffer.SessionWriteBuffer(window=0.05)
+    buffer.add({**row, 'hours_spent': 4.0})
+    deadline = time.monotonic() + 5
+    while buffer.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.close()
+    service.close()
+    assert db.get_item_by_id(item_id)['total_hours'] == 4.0
+
+
+def test_archived_sessions_stay_in_history(tracker_db, tmp_path):
+    from datetime import date, timedelta
+    recent = (date.today() - timedelta(days=3)).isoformat()
+    item_id, _, _ = db.find_or_create_item('python', 'Project', 'Archive me')
+    for day in range(1, 8):
+        _save(item_id, f'2024-03-{day:02d}', 1.0, tags='old', project_name='Tracker')
+    hot = _save(item_id, recent, 2.0, tags='old, new', project_name='Tracker')
+
+    con = db.connect()
+    summary = "SELECT total_logs, total_hours, last_logged_at FROM items WHERE id = ?"
+    before = con.execute(summary, (item_id,)).fetchone()
+    stats = db.get_stats_series('all')
+    tag_hours = db.get_tag_hours_by_week(tags=['old'])
+
+    moved = []
+    report = db.archive_sessions(older_than_days=30, batch_size=3, progress=moved.append)
+    assert (report['archived'], report['batches'], moved) == (7, 3, [3, 6, 7])
+    assert tracker_db.archive_path == tmp_path / "tracker.archive.db"
+    assert con.execute("SELECT id FROM sessions").fetchall() == [(hot,)]
+    assert con.execute("SELECT COUNT(*) FROM archive.session_tags").fetchone()[0] == 7
+    assert [r.id for r in db.list_sessions(10)] == [hot]
+
+    db.recompute_all_summaries()
+    assert con.execute(summary, (item_id,)).fetchone() == before
+    assert db.get_stats_series('all') == stats
+    assert db.get_tag_hours_by_week(tags=['old']) == tag_hours
+    assert db.count_sessions() == 8
+    exported = [row for chunk in db.iter_session_chunks(['id', 'date'], chunk_size=3)
+                for row in chunk]
+    assert exported[0] == (hot, recent)
+    assert [d for _, d in exported[1:]] == [f'2024-03-{d:02d}' for d in range(7, 0, -1)]
+
+    # A fresh connection re-attaches the archive; a second run has nothing to move
+    tracker_db.close_all()
+    assert db.count_sessions() == 8
+    assert SessionService().archive_sessions(30)['archived'] == 0
+    assert not db.connect().execute("SELECT 1 FROM config WHERE key = 'archive_pending'").fetchone()
+
+    # A run interrupted between copy and delete leaves a hot session in both databases
+    con = db.connect()
+    con.execute("INSERT INTO config (key, value_json) VALUES ('archive_pending', '\"2024-01-01\"')")
+    con.execute("INSERT INTO archive.sessions (id, item_id, date, hours_spent) "
+                "VALUES (?, ?, ?, 2.0)", (hot, item_id, recent))
+    assert db.count_sessions() == 8
+    assert con.execute("SELECT COUNT(*), SUM(hours_spent) FROM all_sessions").fetchone() == (8, 9.0)
+    assert db.get_tag_hours_by_week(tags=['old']) == tag_hours
+    db.init_db()
+    assert con.execute("SELECT COUNT(*) FROM archive.sessions WHERE id = ?",
+                       (hot,)).fetchone()[0] == 0
+    assert not con.execute("SELECT 1 FROM config WHERE key = 'archive_pending'").fetchone()
+
+
+def test_duplicate_sessions_are_skipped_and_removed(tracker_db):
+    from datetime import date
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Window functions')
+    service = SessionService()
+    first = service.save_session({'item_id': item_id, 'date': '2024-06-01', 'hours_spent': 1.5,
+                                  'notes': 'Read  the docs', 'tags': 'sql, Testing'})
+    # Same content up to spacing, case and tag order: the caller hears
+    # about it before anything is written
+    again = {'item_id': item_id, 'date': '2024-06-01', 'hours_spent': 1.5,
+             'notes': 'read the docs', 'tags': 'testing;SQL'}
+    with pytest.raises(db.DuplicateSessionError) as caught:
+        service.save_session(again)
+    assert caught.value.session_id == first
+    assert db.get_item_by_id(item_id)['total_hours'] == 1.5
+    assert service.save_session(again, allow_duplicate=True) != first
+    assert db.get_item_by_id(item_id)['total_hours'] == 3.0
+
+    # Imports skip rows already logged, one per logged copy, but keep repeats within the rows
+    rows = [
+        {'item_id': item_id, 'date': '2024-06-01', 'hours_spent': 1.5,
+         'notes': 'read the docs', 'tags': 'sql'},
+        {'item_id': item_id, 'date': '2024-06-01', 'hours_spent': 1.5,
+         'notes': 'Read the docs', 'tags': 'SQL,testing'},
+        {'item_id': item_id, 'date': '2024-06-02', 'hours_spent': 1.0},
+        {'item_id': item_id, 'date': '2024-06-02', 'hours_spent': 1.0},
+    ]
+    stats = db.bulk_insert_sessions(rows, chunk_size=3)
+    assert (stats['inserted'], stats['duplicates']) == (3, 1)
+    stats = db.bulk_insert_sessions(rows, chunk_size=3)
+    assert (stats['inserted'], stats['duplicates']) == (0, 4)
+
+    # Duplicates written without hashes (older code, other tools), then partly archived
+    con = db.connect()
+    raw = ("INSERT INTO sessions (item_id, date, hours_spent, notes, tags, points_awarded) "
+           "VALUES (?, ?, 1.5, 'read the docs', 'sql, Testing', 1.5)")
+    for day in ('2023-01-01', '2023-01-01', '2023-01-01', '2024-06-01'):
+        con.execute(raw, (item_id, day))
+    db.archive_sessions(older_than_days=(date.today() - date(2024, 1, 1)).days)
+    con.execute(raw, (item_id, '2023-01-01'))
+    # A merge re-hashes the sessions it moves
+    other, _, _ = db.find_or_create_item('python', 'Exercise', 'Recursive CTEs')
+    _save(other, '2024-06-02', 1.0)
+    db.merge_items(other, item_id)
+    db.recompute_all_summaries()
+
+    schema_version = con.execute("PRAGMA schema_version").fetchone()[0]
+    report = SessionService().dedupe_sessions()
+    assert con.execute("PRAGMA schema_version").fetchone()[0] == schema_version
+    assert (report['hashed'], report['removed']) == (5, 7)
+    item = db.get_item_by_id(item_id)
+    assert (item['total_logs'], item['total_hours']) == (4, 5.5)
+    summary = con.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone()
+    db.recompute_all_summaries()
+    assert con.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone() == summary
+    assert con.execute("SELECT SUM(hours), SUM(session_count) FROM daily_stats").fetchone() == \
+        con.execute("SELECT SUM(hours_spent), COUNT(*) FROM all_sessions").fetchone()
+    assert con.execute("SELECT COUNT(*) FROM archive.sessions").fetchone()[0] == 1
+    assert db.dedupe_sessions(batch_size=2)['removed'] == 0
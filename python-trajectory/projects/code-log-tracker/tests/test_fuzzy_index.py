@@ -0,0 +1,73 @@
+# tests/test_fuzzy_index.py
+import sys
+import threading
+
+from app import db
+from app.fuzzy_index import TrigramIndex
+
+
+def test_ranks_by_similarity_and_ignores_unrelated():
+    index = TrigramIndex()
+    index.add(1, "Binary search tree", ["binary-search-tree"])
+    index.add(2, "Binary search", ["binary-search", "bsearch"])
+    index.add(3, "Stack and queue", ["stack-and-queue"])
+
+    results = index.search("binary-serch-tree")
+
+    assert [r['id'] for r in results] == [1, 2]
+    assert results[0]['similarity'] > results[1]['similarity']
+
+
+def test_remove_and_alias_terms():
+    index = TrigramIndex()
+    index.add(1, "JSON parsing", ["json-parsing", "parse-json"])
+    assert index.search("parse-jsn")[0]['id'] == 1
+
+    index.remove(1)
+    assert index.search("parse-jsn") == []
+    assert len(index) == 0
+
+
+def test_search_while_items_are_added():
+    index = TrigramIndex()
+    index.add(0, "Binary search", ["binary-search"])
+    errors = []
+    done = threading.Event()
+
+    def search():
+        try:
+            while not done.is_set():
+                assert index.search("binary-search", limit=50)[0]['id'] == 0
+        except Exception as exc:
+            errors.append(exc)
+
+    # Switch threads often, so searches land between the steps of add/remove
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    searchers = [threading.Thread(target=search) for _ in range(4)]
+    for thread in searchers:
+        thread.start()
+    try:
+        for item_id in range(1, 3000):
+            index.add(item_id, f"Binary search {item_id}", [f"binary-search-{item_id}"])
+            if item_id % 2:
+                index.remove(item_id)
+    finally:
+        done.set()
+        for thread in searchers:
+            thread.join()
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(index) == 1500
+
+
+def test_find_or_create_item_returns_ranked_suggestions(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Dictionary methods')
+    db.find_or_create_item('python', 'Exercise', 'File handling')
+
+    new_id, is_new, suggestions = db.find_or_create_item('python', 'Exercise', 'Dictionary method')
+
+    assert (new_id, is_new) == (None, False)
+    assert [s['id'] for s in suggestions] == [item_id]
+    assert suggestions[0]['similarity_hint'].endswith('% similar')
@@ -0,0 +1,111 @@
+# tests/test_importers.py
+import csv
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from app import db  # noqa: E402
+from app.importers import ImportCancelled, import_sessions  # noqa: E402
+from app.services.session_service import SessionService  # noqa: E402
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def _count_sessions():
+    return db.connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def test_import_normalizes_valid_rows_and_reports_rejects(tracker_db, tmp_path):
+    existing, _, _ = db.find_or_create_item('python', 'Exercise', 'List comprehensions')
+    header = ["Date", "Type", "Work Item Name", "Notes", "Status", "Hours", "Tags", "Language",
+              "Difficulty", "Points"]
+    path = _write_csv(tmp_path / "old.csv", header, [
+        ["2024-03-01", "exercise", "List comprehensions", "warm-up", "completed", "1.5",
+         "py, lists", "Python", "", "99"],
+        ["03/02/2024", "Project", " Budget app ", "", "", "2", "", "JavaScript", "advanced", ""],
+        ["", "", "", "", "", "", "", "", "", ""],
+        ["not a date", "Exercise", "Loops", "", "", "1", "", "python", "", ""],
+        ["2024-03-03", "Exercise", "Loops", "", "", "30", "", "python", "", ""],
+        ["2024-03-04", "Homework", "Loops", "", "", "1", "", "python", "", ""],
+        ["2024-03-05", "Exercise", "Loops", "", "Someday", "1", "", "cobol", "", ""],
+        ["2024-03-06", "Exercise", "", "", "", "1", "", "python", "", ""],
+    ])
+    report = import_sessions(path, chunk_size=3, reject_path=str(tmp_path / "rejects.csv"))
+
+    assert (report['read'], report['inserted'], report['rejected'],
+            report['items_created']) == (8, 2, 5, 1)
+    assert [(r['row'], r['reason']) for r in report['rejects']] == [
+        (5, "invalid date"), (6, "hours outside 0-24"), (7, "unknown type"),
+        (8, "unknown language"), (9, "missing work item name")]
+    assert report['rejects'][0]['values']['Work Item Name'] == "Loops"
+    with open(tmp_path / "rejects.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:3] == ['row', 'reason', 'Date'] and len(rows) == 6
+
+    first, second = sorted(db.list_sessions(10), key=lambda r: r.date)
+    assert (first.item_id, first.status, first.difficulty, first.hours_spent, first.tags) == (
+        existing, 'Completed', 'Beginner', 1.5, 'py, lists')
+    assert first.points_awarded == pytest.approx(1.5 * 1.2)
+    assert (second.date, second.canonical_name, second.type, second.language_code,
+            second.difficulty, second.status) == (
+        '2024-03-02', 'Budget app', 'Project', 'javascript', 'Advanced', 'In Progress')
+
+
+def test_import_round_trips_an_export_without_duplicates_and_is_atomic(tracker_db, tmp_path):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Generators')
+    for day in range(1, 6):
+        db.insert_or_update_session({'item_id': item_id, 'date': f'2024-05-0{day}',
+                                     'hours_spent': 0.5 * day, 'status': 'Completed',
+                                     'tags': 'gen', 'notes': f'day {day}'})
+    service = SessionService()
+    exported = str(tmp_path / "sessions.csv")
+    assert service.export_to_csv(exported) == 5
+
+    # Importing the same sessions again adds nothing
+    report = service.import_sessions(exported)
+    assert (report['inserted'], report['duplicates'], report['rejected'],
+            report['items_created']) == (0, 5, 0, 0)
+    assert db.get_item_by_id(item_id)['total_logs'] == 5
+
+    con = db.connect()
+    service.delete_session(
+        con.execute("SELECT id FROM sessions WHERE date = '2024-05-05'").fetchone()[0])
+    report = service.import_sessions(exported)
+    assert (report['inserted'], report['duplicates']) == (1, 4)
+    assert db.get_item_by_id(item_id)['total_hours'] == pytest.approx(7.5)
+
+    with pytest.raises(ImportCancelled):
+        service.import_sessions(exported, cancel=lambda: True)
+    with pytest.raises(Exception, match="Missing columns: Hours"):
+        service.import_sessions(_write_csv(tmp_path / "bad.csv",
+                                           ["Date", "Type", "Work Item Name", "Language"],
+                                           [["2024-01-01", "Exercise", "X", "python"]]))
+    with pytest.raises(Exception, match="Unsupported import format"):
+        service.import_sessions(str(tmp_path / "sessions.json"))
+    assert _count_sessions() == 5
+
+
+def test_rejects_keep_source_columns_named_row_or_reason(tracker_db, tmp_path):
+    header = ["Date", "Type", "Work Item Name", "Hours", "Language", "row", "reason"]
+    path = _write_csv(tmp_path / "extra.csv", header, [
+        ["2024-03-01", "Exercise", "Loops", "1", "python", "a", "b"],
+        ["2024-03-02", "Exercise", "Loops", "99", "python", "c", "d"],
+    ])
+    report = import_sessions(path, reject_path=str(tmp_path / "rejects.csv"))
+
+    assert (report['inserted'], report['rejected']) == (1, 1)
+    reject = report['rejects'][0]
+    assert (reject['row'], reject['reason']) == (3, "hours outside 0-24")
+    assert (reject['values']['row'], reject['values']['reason']) == ("c", "d")
+    with open(tmp_path / "rejects.csv", newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [
+            ['row', 'reason', *header],
+            ['3', "hours outside 0-24",
+             "2024-03-02", "Exercise", "Loops", "99", "python", "c", "d"]]
@@ -0,0 +1,52 @@
+# tests/test_language_packs.py
+import json
+import os
+
+import pytest
+
+from app import db
+from app.keyword_matcher import KeywordMatcher
+from app.services.language_service import LanguageService
+
+
+def test_keyword_matcher_finds_overlapping_phrases():
+    matcher = KeywordMatcher(["list", "list comprehension", "comp", "for"])
+    assert matcher.find("A List Comprehension for loops") == {
+        "list", "list comprehension", "comp", "for"}
+    assert matcher.find("dictionaries") == set()
+
+
+def test_pack_cache_reloads_when_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "RULES_PATH", tmp_path)
+    pack_file = tmp_path / "rust.json"
+    pack_file.write_text(json.dumps({"topics": {"Ownership": {"default_difficulty": "Advanced"}}}))
+
+    first = db.load_language_pack("rust")
+    assert db.load_language_pack("rust") is first
+    # The cached pack is shared, so callers cannot change it
+    with pytest.raises(TypeError):
+        first["topics"]["Ownership"]["default_difficulty"] = "Beginner"
+
+    pack_file.write_text(json.dumps({"topics": {"Lifetimes": {"default_difficulty": "Expert"}}}))
+    stat = pack_file.stat()
+    os.utime(pack_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert list(db.load_language_pack("rust")["topics"]) == ["Lifetimes"]
+
+    # Missing packs fall back to the in-memory default without touching disk
+    assert "Basics" in db.load_language_pack("haskell")["topics"]
+    assert not (tmp_path / "haskell.json").exists()
+
+
+def test_suggestions_from_text():
+    service = LanguageService()
+    service.load_language_pack("python")
+
+    text = "Web Development: build a REST API with Flask routes"
+    assert service.pack_matcher.matcher.find(text) == {
+        "web development", "web", "rest", "api", "flask", "routes"}
+    assert service.get_suggestions_from_text(text) == {
+        "topic": "Web Development", "difficulty": "Intermediate"}
+    # python.json topics have no keywords: without a topic name only skills match
+    assert service.get_suggestions_from_text("Build a REST API with Flask routes") == {
+        "difficulty": "Intermediate"}
+    assert service.get_suggestions_from_text("   ") == {}
@@ -0,0 +1,89 @@
+# tests/test_migrations.py
+import pytest
+
+from app import db, migrations
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """Database with the baseline schema only, as left by an older release"""
+    manager = db.configure_database(tmp_path / "old.db")
+    with db.transaction() as con:
+        db._create_schema(con.cursor())
+    yield manager
+    manager.close_all()
+    db.configure_database(db.DB_PATH)
+
+
+def _columns(table):
+    return {row[1] for row in db.connect().execute(f"PRAGMA table_info({table})")}
+
+
+def test_backfill_resumes_from_checkpoint(baseline_db):
+    con = db.connect()
+    con.execute("""INSERT INTO items (language_code, type, canonical_name, slug, target_hours)
+                   VALUES ('python', 'Project', 'Portfolio site', 'portfolio-site', 20)""")
+    con.execute("""INSERT INTO items (language_code, type, canonical_name, slug)
+                   VALUES ('python', 'Exercise', 'Loops', 'loops')""")
+    con.executemany("INSERT INTO sessions (item_id, date, hours_spent, tags) VALUES (?, ?, ?, ?)",
+                    [(1 + n % 2, f'2024-01-{1 + n:02d}', 1.0, 'sql, Testing' if n % 3 else '')
+                     for n in range(9)])
+
+    messages = []
+    assert migrations.migrate(batch_size=2, max_batches=3,
+                              progress=lambda m, msg: messages.append(msg)) == []
+    assert messages[0] == "schema applied"
+    status = {s['version']: s for s in migrations.migration_status()}
+    assert status[1]['state'] == 'backfilling'
+    assert status[1]['checkpoint'] == {'step': 0, 'cursor': '6'}
+    assert {'project_name', 'project_progress_pct'} <= _columns('sessions')
+
+    # Resuming never re-runs the schema step (ALTER TABLE would fail if it did)
+    assert migrations.migrate(batch_size=2) == [1, 2, 3, 4]
+    assert migrations.migrate() == []
+    rows = con.execute(
+        "SELECT item_id, project_name, project_progress_pct FROM sessions").fetchall()
+    assert {(r[1], r[2]) for r in rows if r[0] == 1} == {('Portfolio site', 25.0)}
+    assert {r[1] for r in rows if r[0] == 2} == {None}
+
+    # Tags backfilled from the existing strings
+    assert con.execute("SELECT name FROM tags ORDER BY name").fetchall() == [('sql',), ('Testing',)]
+    assert con.execute("SELECT COUNT(*) FROM session_tags").fetchone()[0] == 12
+
+    # Every session hashed, without the hashes showing up as edits in the change log
+    hashes = con.execute("SELECT content_hash FROM sessions ORDER BY id").fetchall()
+    assert len({h for (h,) in hashes}) == 9
+    assert hashes[0][0] == db.session_content_hash(1, '2024-01-01', 1.0, None, '')
+    assert con.execute("SELECT COUNT(*) FROM change_log").fetchone()[0] == 0
+
+
+def test_refuses_unknown_or_renamed_versions(baseline_db):
+    migrations.migrate()
+    con = db.connect()
+    con.execute("UPDATE schema_version SET name='something else' WHERE version=1")
+    con.execute("UPDATE schema_version SET state='backfilling', "
+                "checkpoint='{\"step\": 0, \"cursor\": null}'")
+    with pytest.raises(migrations.MigrationError):
+        migrations.migrate()
+
+    con.execute("UPDATE schema_version SET name='projects', state='done'")
+    con.execute("INSERT INTO schema_version (version, name, state, started_at) "
+                "VALUES (999, 'future', 'done', '')")
+    with pytest.raises(migrations.MigrationError):
+        migrations.migrate()
+
+
+def test_project_sessions_track_project_progress(tracker_db):
+    item_id, _, _ = db.find_or_create_item('python', 'Project', 'Blog engine')
+    db.connect().execute("INSERT INTO projects (name, target_hours) VALUES ('Blog engine', 10)")
+    db.insert_or_update_session({'item_id': item_id, 'date': '2024-01-01', 'hours_spent': 2.0})
+    session_id = db.insert_or_update_session({'item_id': item_id, 'date': '2024-01-02',
+                                              'hours_spent': 3.0})
+    db.bulk_insert_sessions([{'item_id': item_id, 'date': '2024-01-03', 'hours_spent': 1.0}])
+
+    row = db.connect().execute(
+        "SELECT project_name, project_progress_pct FROM sessions WHERE id=?",
+        (session_id,)).fetchone()
+    assert row == ('Blog engine', 50.0)
+    assert db.connect().execute(
+        "SELECT COUNT(*) FROM sessions WHERE project_name='Blog engine'").fetchone()[0] == 3
@@ -0,0 +1,48 @@
+# tests/test_query_trace.py
+import pytest
+
+from app import db
+from app.query_trace import QueryTracer, TracedConnection, explain
+
+
+@pytest.fixture
+def traced_db(tmp_path):
+    tracer = QueryTracer(slow_ms=float('inf'))
+    manager = db.configure_database(tmp_path / "traced.db", tracer=tracer)
+    db.init_db()
+    tracer.reset()
+    yield tracer
+    manager.close_all()
+    db.configure_database(db.DB_PATH)
+
+
+def test_statements_are_counted_timed_and_rows_tallied(traced_db):
+    assert isinstance(db.connect(), TracedConnection)
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Traced loops')
+    for day in range(1, 6):
+        db.insert_or_update_session({'item_id': item_id, 'date': f'2024-01-0{day}',
+                                     'hours_spent': 1.0})
+    db.list_sessions(3)
+    db.list_sessions(10)
+
+    stats = {s['sql']: s for s in traced_db.stats()}
+    page = next(s for sql, s in stats.items()
+                if sql.startswith("SELECT s.id, s.date") and 'LIMIT ?' in sql)
+    assert page['calls'] == 2
+    assert page['rows'] == 4 + 5     # limit + 1 look-ahead row, then all five
+    assert sum(count for _, count in page['histogram']) == 2
+    assert page['p95_ms'] >= page['p50_ms'] > 0
+    summary = traced_db.summary()
+    assert summary['calls'] >= 10 and summary['slow'] == 0
+
+
+def test_slow_statements_are_logged_with_their_plan(traced_db):
+    traced_db.slow_ms = 0
+    db.connect().execute("SELECT id FROM sessions WHERE date >= ?", ('2024-01-01',)).fetchall()
+    entry = traced_db.slow_queries()[-1]
+    assert entry['sql'] == "SELECT id FROM sessions WHERE date >= ?"
+    assert entry['statement'] == "SELECT id FROM sessions WHERE date >= '2024-01-01'"
+    assert any('idx_sessions' in line for line in entry['plan'])
+
+    # Plans are skipped for statements that have none
+    assert explain(db.connect(), "BEGIN") is None
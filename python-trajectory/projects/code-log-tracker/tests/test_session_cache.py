@@ -0,0 +1,112 @@
+# tests/test_session_cache.py
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from app import db  # noqa: E402
+from app.session_cache import SessionFrameCache  # noqa: E402
+
+
+def _save(item_id, date, hours=1.0, **extra):
+    return db.insert_or_update_session({'item_id': item_id, 'date': date, 'hours_spent': hours,
+                                        **extra})
+
+
+@pytest.fixture
+def cache(tracker_db):
+    cache = SessionFrameCache()
+    yield cache
+    cache.close()
+
+
+def test_frame_is_typed_and_aggregates_match_the_rollup(cache):
+    py_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Generators')
+    js_id, _, _ = db.find_or_create_item('javascript', 'Project', 'Dashboard')
+    _save(py_id, '2024-01-01', 1.0, difficulty='Beginner')
+    _save(py_id, '2024-01-03', 2.0, difficulty='Advanced', status='Completed')
+    _save(js_id, '2024-02-10', 0.5, difficulty='Beginner')
+
+    frame = cache.frame()
+    assert str(frame['date'].dtype).startswith('datetime64')
+    categories = ('language_code', 'type', 'status', 'difficulty')
+    assert {str(frame[c].dtype) for c in categories} == {'category'}
+    assert frame['hours_spent'].dtype == 'float32'
+
+    for period in ('day', 'week', 'month', 'all'):
+        for group_by in (None, 'language_code', 'difficulty'):
+            expected = db.get_stats_series(period, group_by=group_by)
+            actual = cache.series(period, group_by=group_by)
+            assert [{**row, 'hours': pytest.approx(row['hours']),
+                     'points': pytest.approx(row['points'])}
+                    for row in expected] == actual
+    assert cache.totals(language_code='python') == {
+        'sessions': 2, 'hours': 3.0,
+        'points': pytest.approx(cache.series('all', language_code='python')[0]['points']),
+        'avg_hours': 1.5}
+
+
+def test_cache_appends_new_sessions_and_patches_edits(cache):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Decorators')
+    first = _save(item_id, '2024-03-01', 1.0)
+    assert cache.refresh() == 'load'
+    assert cache.refresh() == 'fresh'
+
+    second = _save(item_id, '2024-03-02', 2.0, status='Completed')
+    assert cache.refresh() == 'append'
+    assert cache.totals()['hours'] == 3.0
+    assert str(cache.frame()['status'].dtype) == 'category'
+
+    _save(item_id, '2024-03-05', 4.0, id=first)
+    assert cache.refresh() == 'update'
+    assert cache.totals(date_from='2024-03-02') == {
+        'sessions': 2, 'hours': 6.0, 'points': pytest.approx(cache.totals()['points']),
+        'avg_hours': 3.0}
+
+    # Swapping two sessions' hours leaves every count and sum as it was
+    _save(item_id, '2024-03-05', 2.0, id=first)
+    _save(item_id, '2024-03-02', 4.0, id=second, status='Completed')
+    assert cache.refresh() == 'update'
+    frame = cache.frame().sort_values('id')
+    assert list(frame['hours_spent']) == [2.0, 4.0]
+    assert [row['hours'] for row in cache.series('day')] == [4.0, 2.0]
+
+    # An item moving to another language takes its sessions along
+    with db.transaction() as con:
+        con.execute("UPDATE items SET language_code = 'javascript' WHERE id = ?", (item_id,))
+    assert cache.refresh() == 'update'
+    assert cache.series('all', group_by='language_code') == [
+        {'period': None, 'language_code': 'javascript', 'hours': 6.0,
+         'points': pytest.approx(cache.totals()['points']), 'sessions': 2}]
+    assert str(cache.frame()['language_code'].dtype) == 'category'
+    assert (cache.loads, cache.appends, cache.updates) == (1, 1, 3)
+
+
+def test_cache_keeps_archived_sessions(cache):
+    item_id, _, _ = db.find_or_create_item('python', 'Exercise', 'Closures')
+    _save(item_id, '2024-01-01', 1.0)
+    _save(item_id, '2024-01-02', 2.0)
+    recent = _save(item_id, date.today().isoformat(), 4.0)
+    assert cache.totals()['hours'] == 7.0
+
+    # The archive appears after the cache's connection opened
+    assert db.archive_sessions(older_than_days=30)['archived'] == 2
+    assert cache.refresh() == 'update'
+    assert cache.totals() == {'sessions': 3, 'hours': 7.0,
+                              'points': pytest.approx(cache.totals()['points']),
+                              'avg_hours': pytest.approx(7 / 3, abs=0.01)}
+    assert [row['hours'] for row in cache.series('month')] == [3.0, 4.0]
+
+    _save(item_id, date.today().isoformat(), 1.0, id=recent)
+    assert cache.refresh() == 'update'
+    assert cache.totals()['hours'] == 4.0
+
+    # Merging moves archived sessions too
+    target, _, _ = db.find_or_create_item('python', 'Exercise', 'Scopes')
+    db.merge_items(item_id, target)
+    cache.refresh()
+    assert [(row['item_id'], row['sessions'])
+            for row in cache.series('all', group_by='item_id')] == [(target, 3)]
+    assert sorted(cache.frame()['id']) == sorted(
+        row[0] for row in db.connect().execute("SELECT id FROM all_sessions"))
@@ -0,0 +1,55 @@
+# tests/test_simple_db.py
+import sqlite3
+
+import pytest
+
+import simple_db
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(simple_db, "DB_PATH", tmp_path / "clean.db")
+    simple_db.init_simple_db()
+    return simple_db.SimpleSessionService()
+
+
+def _session(date, language, hours, difficulty='Beginner'):
+    return {'date': date, 'language_code': language, 'type': 'Exercise', 'canonical_name': 'Loops',
+            'difficulty': difficulty, 'status': 'In Progress', 'hours_spent': hours}
+
+
+def test_stats_series_follows_every_write(service):
+    first = service.save_session(_session('2024-01-01', 'python', 1.0))
+    service.save_session(_session('2024-01-02', 'python', 2.0, 'Advanced'))
+    service.save_session(_session('2024-01-10', 'sql', 0.5))
+
+    assert service.get_stats_series('all') == [
+        {'period': None, 'hours': 3.5, 'points': 0.0, 'sessions': 3}]
+    assert [(row['period'], row['hours']) for row in service.get_stats_series('week')] == [
+        ('2024-01-01', 3.0), ('2024-01-08', 0.5)]
+
+    service.save_session(_session('2024-01-10', 'sql', 4.0), editing_session_id=first)
+    service.delete_session(first + 1)
+    assert service.get_stats_series('all', group_by='language_code') == [
+        {'period': None, 'language_code': 'sql', 'hours': 4.5, 'points': 0.0, 'sessions': 2}]
+    assert service.get_stats_series('day', start='2024-01-05', language_code='python') == []
+    with pytest.raises(ValueError):
+        service.get_stats_series('all', group_by='item_id')
+
+
+def test_rollup_is_filled_for_an_existing_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(simple_db, "DB_PATH", tmp_path / "clean.db")
+    simple_db.init_simple_db()
+    con = sqlite3.connect(tmp_path / "clean.db")
+    # As created before the rollup existed
+    for op in ('insert', 'delete', 'update'):
+        con.execute(f"DROP TRIGGER trg_sessions_daily_stats_{op}")
+    con.execute("DROP TABLE daily_stats")
+    con.execute("""INSERT INTO sessions (date, language, type, work_item, hours)
+                   VALUES ('2024-02-01', 'git', 'Exercise', 'Rebase', 1.5)""")
+    con.commit()
+    con.close()
+
+    simple_db.init_simple_db()
+    assert simple_db.SimpleSessionService().get_stats_series('month') == [
+        {'period': '2024-02-01', 'hours': 1.5, 'points': 0.0, 'sessions': 1}]